@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+""" Measure how many lines per second the tool dialog's console can take in.
+
+    $ QT_QPA_PLATFORM=offscreen python3 scripts/benchmark_console.py --lines 200000
+"""
+import argparse
+import pathlib
+import sys
+import time
+
+ROOT_PATH = pathlib.Path(__file__).absolute().parent.parent
+sys.path.insert(0, str(ROOT_PATH))
+
+
+def benchmark(line_count: int, line_length: int) -> float:
+    from xappt_qt.gui.application import get_application
+    from xappt_qt.gui.dialogs.tool_ui_dialog import ToolUI
+
+    app = get_application()
+    ui = ToolUI()
+    ui.show()
+    app.processEvents()
+
+    line = "x" * line_length
+    start = time.perf_counter()
+    for i in range(line_count):
+        if i % 10 == 0:
+            ui.write_stderr(line)
+        else:
+            ui.write_stdout(line)
+    while ui.console.flush_timer.isActive():
+        app.processEvents()
+    ui.console.flush()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+
+    ui.close()
+    return line_count / elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lines', type=int, default=100000, help='Number of lines to write')
+    parser.add_argument('--length', type=int, default=80, help='Number of characters per line')
+    options = parser.parse_args()
+
+    rate = benchmark(options.lines, options.length)
+    print(f"{options.lines} lines: {rate:,.0f} lines/sec")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+""" Check that the cold-start imports of each entry point stay within budget.
+
+Each scenario imports an entry point in a fresh interpreter with `-X importtime`, and
+fails if a module that should only load on first use was imported, or if the time
+spent importing outside of xappt (which imports every plugin package when it is
+imported) exceeds the budget. Times are the best of `--repeat` runs.
+
+    $ python3 scripts/check_import_time.py
+    $ python3 scripts/check_import_time.py --scale 2.0  # on a slow machine
+"""
+import argparse
+import os
+import pathlib
+import subprocess
+import sys
+
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+ROOT_PATH = pathlib.Path(__file__).absolute().parent.parent
+
+# modules that are only needed once a tool uses them
+DEFERRED_MODULES = (
+    "asyncio",
+    "markdown",
+    "webbrowser",
+    "xappt_qt.gui.widgets.table_edit",
+    "xappt_qt.gui.widgets.tool_page.converters.convert_",
+)
+
+
+class Scenario(NamedTuple):
+    name: str
+    module: str
+    env: Dict[str, str]
+    forbidden: Sequence[str]
+    budget_ms: float
+
+
+SCENARIOS = (
+    Scenario("terminal", "xappt_qt.main", {'XAPPT_QT_NO_GUI': "1"},
+             DEFERRED_MODULES + ("PyQt5", "xappt_qt.browser", "xappt_qt.launcher"), 80.0),
+    Scenario("tool host", "xappt_qt.tool_host", {'XAPPT_QT_NO_GUI': "1"},
+             DEFERRED_MODULES + ("PyQt5", ), 80.0),
+    Scenario("gui", "xappt_qt.main", {'QT_QPA_PLATFORM': "offscreen"},
+             DEFERRED_MODULES + ("xappt_qt.browser", "xappt_qt.launcher"), 250.0),
+)
+
+
+class ImportRecord(NamedTuple):
+    name: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        records.append(ImportRecord(name, int(self_us), int(cumulative_us)))
+    return records
+
+
+def measure(scenario: Scenario) -> Tuple[float, List[ImportRecord]]:
+    env = dict(os.environ)
+    env.pop('XAPPT_QT_NO_GUI', None)
+    env.update(scenario.env)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (str(ROOT_PATH), env.get('PYTHONPATH'))))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {scenario.module}"],
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {scenario.module} failed:\n{result.stderr}")
+    records = parse_importtime(result.stderr)
+    total = sum(record.cumulative_us for record in records if record.name == scenario.module)
+    upstream = sum(record.cumulative_us for record in records if record.name == "xappt")
+    return (total - upstream) / 1000.0, records
+
+
+def check(scenario: Scenario, repeat: int, scale: float) -> bool:
+    timings = []
+    records: List[ImportRecord] = []
+    for _ in range(repeat):
+        elapsed, records = measure(scenario)
+        timings.append(elapsed)
+
+    ok = True
+    names = [record.name for record in records]
+    loaded = sorted({name for name in names for prefix in scenario.forbidden
+                     if name == prefix or name.startswith(prefix if prefix.endswith("_") else f"{prefix}.")})
+    if len(loaded):
+        ok = False
+        print(f"FAIL {scenario.name}: imported on startup: {', '.join(loaded)}")
+
+    best = min(timings)
+    budget = scenario.budget_ms * scale
+    if best > budget:
+        ok = False
+        print(f"FAIL {scenario.name}: {best:.1f}ms over the budget of {budget:.1f}ms")
+        slowest = sorted((r for r in records if r.name.startswith("xappt_qt")), key=lambda r: r.self_us)[-5:]
+        for record in reversed(slowest):
+            print(f"    {record.self_us / 1000.0:7.1f}ms {record.name}")
+    if ok:
+        print(f"ok   {scenario.name}: {best:.1f}ms of {budget:.1f}ms, {len(records)} modules")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per scenario, the fastest one counts')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply every budget by this factor')
+    options = parser.parse_args()
+
+    results = [check(scenario, max(1, options.repeat), options.scale) for scenario in SCENARIOS]
+    return 0 if all(results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,4 @@
-from PyInstaller.utils.hooks import collect_data_files
+from PyInstaller.utils.hooks import collect_data_files, collect_submodules
 
 INCLUDE_EXTENSIONS = (
     "**/*.png",
@@ -11,6 +11,9 @@ INCLUDE_EXTENSIONS = (
 hiddenimports = [
     'xappt_qt.resources.icons',
     'xappt_qt.launcher',
+    'xappt_qt.launch_server',
 ]
+# widgets and parameter converters are imported by name on first use
+hiddenimports += collect_submodules("xappt_qt.gui.widgets")
 
 datas = collect_data_files("xappt_qt", includes=INCLUDE_EXTENSIONS)
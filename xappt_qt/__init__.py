@@ -2,7 +2,12 @@ import os
 
 from xappt_qt.__version__ import __version__, __build__
 
-from xappt_qt.plugins.interfaces.qt import QtInterface
+import xappt_qt.plugins
+
+from xappt_qt.utilities.display import gui_available
+
+if gui_available():
+    from xappt_qt.plugins.interfaces.qt import QtInterface
 
 # suppress "qt.qpa.xcb: QXcbConnection: XCB error: 3 (BadWindow)"
 os.environ['QT_LOGGING_RULES'] = '*.debug=false;qt.qpa.*=false'
@@ -11,3 +16,11 @@ version = tuple(map(int, __version__.split('.'))) + (__build__, )
 version_str = f"{__version__}-{__build__}"
 
 executable = None
+
+
+def __getattr__(name: str):
+    # without a display the Qt interface isn't imported up front, PyQt5 is only loaded if it's used
+    if name == "QtInterface":
+        from xappt_qt.plugins.interfaces.qt import QtInterface
+        return QtInterface
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
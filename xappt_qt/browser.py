@@ -3,6 +3,7 @@ import os
 import platform
 import sys
 
+from typing import Dict, List, Optional
 
 from PyQt5 import QtWidgets, QtGui, QtCore
 
@@ -10,9 +11,10 @@ import xappt
 
 from xappt_qt.gui.application import get_application
 from xappt_qt.gui.ui.browser import Ui_Browser
+from xappt_qt.gui.utilities.instance_server import InstanceServer, forward_request, plugin_environment
 from xappt_qt.gui.utilities.tray_icon import TrayIcon
 from xappt_qt.constants import *
-from xappt_qt.gui.tab_pages import ToolsTabPage, OptionsTabPage, AboutTabPage
+from xappt_qt.gui.tab_pages import ToolsTabPage, OptionsTabPage, HistoryTabPage, AboutTabPage
 
 from xappt_qt.utilities import singleton
 
@@ -34,10 +36,12 @@ class XapptBrowser(xappt.ConfigMixin, QtWidgets.QMainWindow, Ui_Browser):
         self.tools = ToolsTabPage(on_info=self.tray_icon.info, on_warn=self.tray_icon.warn,
                                   on_error=self.tray_icon.critical)
         self.options = OptionsTabPage()
+        self.history = HistoryTabPage(on_warn=self.tray_icon.warn)
         self.about = AboutTabPage()
 
         self.tabWidget.addTab(self.tools, self.tools.windowTitle())
         self.tabWidget.addTab(self.options, self.options.windowTitle())
+        self.tabWidget.addTab(self.history, self.history.windowTitle())
         self.tabWidget.addTab(self.about, self.about.windowTitle())
         self.tabWidget.setCurrentIndex(0)
 
@@ -51,6 +55,9 @@ class XapptBrowser(xappt.ConfigMixin, QtWidgets.QMainWindow, Ui_Browser):
 
         self.init_tray_icon()
 
+        self.instance_server = InstanceServer(self.on_remote_request, self)
+        self.instance_server.listen()
+
     def init_config(self):
         self.add_config_item('window-geo',
                              saver=self.save_window_geo,
@@ -77,7 +84,7 @@ class XapptBrowser(xappt.ConfigMixin, QtWidgets.QMainWindow, Ui_Browser):
 
         for category, plugin_list in self.tools.loaded_plugins.items():
             for plugin in plugin_list:
-                self.tray_icon.add_menu_item(plugin.name(), on_activate=self.run_tool, data=plugin, group=category)
+                self.tray_icon.add_menu_item(plugin.name, on_activate=self.run_tool, data=plugin, group=category)
 
         self.tray_icon.add_menu_item(None)
         self.tray_icon.add_menu_item("Show", on_activate=self.show, is_visible=self.isHidden)
@@ -108,6 +115,8 @@ class XapptBrowser(xappt.ConfigMixin, QtWidgets.QMainWindow, Ui_Browser):
         self.activateWindow()
 
     def on_quit(self):
+        self.instance_server.close()
+        self.tools.shutdown()
         self.tray_icon.destroy()
         self.save_config()
         self.app.quit()
@@ -116,17 +125,38 @@ class XapptBrowser(xappt.ConfigMixin, QtWidgets.QMainWindow, Ui_Browser):
         plugin = kwargs.get('data')
         if plugin is None:
             return
-        assert issubclass(plugin, xappt.BaseTool)
-        self.tools.launch_tool(plugin)
+        self.tools.launch_tool(plugin.name)
+
+    def on_remote_request(self, args: List[str], cwd: Optional[str], environment: Optional[Dict[str, str]]) -> Dict:
+        """ Handle a launch forwarded by another invocation of `xappt-qt`. Launches of
+        tools this process may not see the same way are declined, the sender runs those. """
+        if not len(args):
+            self.on_activate()
+            return {'activated': True}
+        tool_name = args[0]
+        if environment is not None and plugin_environment(environment) != plugin_environment(dict(os.environ)):
+            return {'declined': "the plugin environment differs from the browser's"}
+        try:
+            xappt.plugin_manager.get_tool_plugin(tool_name)
+        except ValueError:
+            return {'declined': f"Tool {tool_name} not found."}
+        pid = self.tools.launch_tool(tool_name, args[1:], cwd=cwd, environment=environment)
+        if pid is None:
+            return {'error': f"Could not launch {tool_name}."}
+        return {'pid': pid}
 
     def on_options_changed(self):
         settings = self.options.settings()
         self.tools.settings_changed(settings)
         self.options.settings_changed(settings)
+        self.history.settings_changed(settings)
         self.about.settings_changed(settings)
 
 
 def main(args) -> int:
+    # bring the running browser to the front instead
+    if forward_request([], os.getcwd()) is not None:
+        return 0
     try:
         _ = singleton.SingleInstance(flavor_id='browser')
     except singleton.SingleInstanceException:
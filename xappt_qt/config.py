@@ -5,6 +5,62 @@ console_auto_scroll = True
 console_color_stdout = "palette(window-text)"
 console_color_stderr = "#f55"
 
+# console output is queued and flushed to the document at most this many times per second
+console_refresh_rate = 30
+# lines waiting to be drawn beyond this count are dropped from the display (but not from the copy buffer)
+console_max_pending_lines = 10000
+# lines kept in memory and in the console document, older lines are moved to a temporary file
+console_scrollback_lines = 100000
+# "text" draws the console with a QTextEdit, "list" uses a QListView that only lays out visible lines
+console_backend = "text"
+
+# progress bars are repainted at most this many times per second, whatever the rate of updates
+progress_refresh_rate = 10
+
+# build the next tool of a chain in the background, so clicking Next doesn't have to wait for it
+prebuild_next_tool = True
+
+# the number of queued tool runs that may execute at the same time
+job_max_concurrent = 2
+
+# stream the output of every tool session to a log file in the app's config folder
+session_log_enabled = False
+# start a new part once the log file reaches this size, 0 disables rotation
+session_log_max_bytes = 10 * 1024 * 1024
+# compress rotated parts with gzip
+session_log_compress = True
+# the number of log files from previous sessions to keep per tool, 0 keeps everything
+session_log_backup_count = 20
+
+# the number of functions listed in the console when a profiled run finishes
+profile_summary_count = 25
+# the number of saved profiles to keep per tool, 0 keeps everything
+profile_backup_count = 20
+
+# the number of allocation sites listed in the console when a run is profiled for memory
+memory_profile_summary_count = 15
+# the number of stack frames kept for each traced allocation
+memory_profile_frames = 1
+
+# record the durations, exit code and peak memory of every tool run in the app's config folder
+run_history_enabled = True
+# the number of runs kept in the history, older runs are removed first, 0 keeps everything
+run_history_max_records = 100000
+
+# skip runs of tools marked `cacheable` when their inputs haven't changed, and restore their outputs instead
+result_cache_enabled = True
+# stored outputs beyond this size are evicted, least recently used first, 0 keeps everything
+result_cache_max_bytes = 2 * 1024 * 1024 * 1024
+# fingerprint input files by their contents instead of their size and modification time
+result_cache_hash_inputs = False
+
+# keep a process that has imported the tools ready, and fork tools from it when the browser launches them (Linux)
+launch_server_enabled = True
+# hand tools launched from the command line to the browser when it's running, instead of starting a new process
+forward_launches_to_browser = True
+# milliseconds after the last key press in the tools tab search before the tools are searched
+tool_search_delay = 150
+
 
 def load_settings():
     import json
@@ -20,6 +76,52 @@ def load_settings():
         console_word_wrap = settings_raw.get('console_word_wrap', False)
         global console_auto_scroll
         console_auto_scroll = settings_raw.get('console_auto_scroll', True)
+        global console_refresh_rate
+        console_refresh_rate = settings_raw.get('console_refresh_rate', 30)
+        global console_max_pending_lines
+        console_max_pending_lines = settings_raw.get('console_max_pending_lines', 10000)
+        global console_scrollback_lines
+        console_scrollback_lines = settings_raw.get('console_scrollback_lines', 100000)
+        global console_backend
+        console_backend = settings_raw.get('console_backend', "text")
+        global progress_refresh_rate
+        progress_refresh_rate = settings_raw.get('progress_refresh_rate', 10)
+        global prebuild_next_tool
+        prebuild_next_tool = settings_raw.get('prebuild_next_tool', True)
+        global job_max_concurrent
+        job_max_concurrent = settings_raw.get('job_max_concurrent', 2)
+        global session_log_enabled
+        session_log_enabled = settings_raw.get('session_log_enabled', False)
+        global session_log_max_bytes
+        session_log_max_bytes = settings_raw.get('session_log_max_bytes', 10 * 1024 * 1024)
+        global session_log_compress
+        session_log_compress = settings_raw.get('session_log_compress', True)
+        global session_log_backup_count
+        session_log_backup_count = settings_raw.get('session_log_backup_count', 20)
+        global profile_summary_count
+        profile_summary_count = settings_raw.get('profile_summary_count', 25)
+        global profile_backup_count
+        profile_backup_count = settings_raw.get('profile_backup_count', 20)
+        global memory_profile_summary_count
+        memory_profile_summary_count = settings_raw.get('memory_profile_summary_count', 15)
+        global memory_profile_frames
+        memory_profile_frames = settings_raw.get('memory_profile_frames', 1)
+        global run_history_enabled
+        run_history_enabled = settings_raw.get('run_history_enabled', True)
+        global run_history_max_records
+        run_history_max_records = settings_raw.get('run_history_max_records', 100000)
+        global result_cache_enabled
+        result_cache_enabled = settings_raw.get('result_cache_enabled', True)
+        global result_cache_max_bytes
+        result_cache_max_bytes = settings_raw.get('result_cache_max_bytes', 2 * 1024 * 1024 * 1024)
+        global result_cache_hash_inputs
+        result_cache_hash_inputs = settings_raw.get('result_cache_hash_inputs', False)
+        global launch_server_enabled
+        launch_server_enabled = settings_raw.get('launch_server_enabled', True)
+        global forward_launches_to_browser
+        forward_launches_to_browser = settings_raw.get('forward_launches_to_browser', True)
+        global tool_search_delay
+        tool_search_delay = settings_raw.get('tool_search_delay', 150)
 
 
 load_settings()
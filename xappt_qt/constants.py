@@ -9,6 +9,9 @@ __all__ = [
     'APP_TITLE_ENV',
     'APP_ICON_ENV',
     'APP_STYLESHEET_ENV',
+    'APP_NO_GUI_ENV',
+    'APP_PROFILE_ENV',
+    'APP_MEMORY_PROFILE_ENV',
     'APP_INTERFACE_NAME',
     'APP_PACKAGE_NAME',
     'APP_TITLE',
@@ -20,6 +23,9 @@ __all__ = [
 APP_TITLE_ENV = "XAPPT_QT_TITLE"
 APP_ICON_ENV = "XAPPT_QT_ICON"
 APP_STYLESHEET_ENV = "XAPPT_QT_STYLESHEET"
+APP_NO_GUI_ENV = "XAPPT_QT_NO_GUI"
+APP_PROFILE_ENV = "XAPPT_QT_PROFILE"
+APP_MEMORY_PROFILE_ENV = "XAPPT_QT_PROFILE_MEMORY"
 
 os.environ.setdefault(APP_TITLE_ENV, "Xappt QT")
 
@@ -0,0 +1,146 @@
+import glob
+import os
+
+from typing import Any, List, Optional, Tuple
+
+from PyQt5 import QtGui, QtWidgets
+
+import xappt
+
+
+class BatchDialog(QtWidgets.QDialog):
+    """ Pick one of a tool's parameters and the list of values to run the tool with.
+
+    The values are converted and validated by the parameter when the dialog is accepted,
+    the dialog stays open and lists the values that are not valid. """
+
+    FILE_UIS = ("file-open", "folder-select")
+    MAX_ERRORS_SHOWN = 10
+
+    def __init__(self, tool: xappt.BaseTool, workers: int = 1, parent: Optional[QtWidgets.QWidget] = None):
+        super().__init__(parent=parent)
+        self.tool = tool
+        self._converted_values: List[Tuple[str, Any]] = []
+        self.setWindowTitle(f"Batch {tool.name()}")
+        self.setMinimumWidth(500)
+        self.setup_ui()
+        self.spinWorkers.setValue(workers)
+        self.connect_signals()
+
+    # noinspection PyAttributeOutsideInit
+    def setup_ui(self):
+        layout = QtWidgets.QFormLayout()
+        self.setLayout(layout)
+
+        self.cmbParameter = QtWidgets.QComboBox()
+        file_index = -1
+        for param in self.tool.parameters():
+            if param.hidden:
+                continue
+            if file_index < 0 and param.options.get("ui") in self.FILE_UIS:
+                file_index = self.cmbParameter.count()
+            self.cmbParameter.addItem(param.name)
+        if file_index >= 0:  # file parameters are the most likely to be batched
+            self.cmbParameter.setCurrentIndex(file_index)
+        layout.addRow("Parameter", self.cmbParameter)
+
+        glob_layout = QtWidgets.QHBoxLayout()
+        self.txtGlob = QtWidgets.QLineEdit()
+        self.txtGlob.setPlaceholderText("e.g. /path/to/shots/**/*.mov")
+        self.btnAddMatches = QtWidgets.QPushButton("Add Matches")
+        self.btnAddMatches.setAutoDefault(False)
+        glob_layout.addWidget(self.txtGlob)
+        glob_layout.addWidget(self.btnAddMatches)
+        layout.addRow("Pattern", glob_layout)
+
+        self.txtValues = QtWidgets.QPlainTextEdit()
+        self.txtValues.setPlaceholderText("One value per line")
+        self.txtValues.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
+        layout.addRow("Values", self.txtValues)
+
+        self.spinWorkers = QtWidgets.QSpinBox()
+        self.spinWorkers.setRange(1, 64)
+        self.spinWorkers.setToolTip("The number of runs that execute at the same time")
+        layout.addRow("Workers", self.spinWorkers)
+
+        self.lblCount = QtWidgets.QLabel()
+        layout.addRow("", self.lblCount)
+
+        self.buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+        layout.addRow(self.buttons)
+        self.update_count()
+
+    def connect_signals(self):
+        self.btnAddMatches.clicked.connect(self.on_add_matches)
+        self.txtGlob.returnPressed.connect(self.on_add_matches)
+        self.txtValues.textChanged.connect(self.update_count)
+        self.buttons.accepted.connect(self.accept)
+        self.buttons.rejected.connect(self.reject)
+
+    def on_add_matches(self):
+        pattern = os.path.expanduser(self.txtGlob.text().strip())
+        if not len(pattern):
+            return
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if not len(matches):
+            QtWidgets.QMessageBox.information(self, self.windowTitle(), f"Nothing matches {pattern}")
+            return
+        existing = set(self.values())
+        new_values = [m for m in matches if m not in existing]
+        text = self.txtValues.toPlainText().rstrip("\n")
+        self.txtValues.setPlainText("\n".join(([text] if len(text) else []) + new_values))
+
+    def update_count(self):
+        count = len(self.values())
+        self.lblCount.setText(f"{count} run{'s' if count != 1 else ''}")
+        self.buttons.button(QtWidgets.QDialogButtonBox.Ok).setEnabled(count > 0)
+
+    def accept(self):
+        converted, errors = self.convert_values()
+        if len(errors):
+            self.show_errors(errors)
+            return
+        self._converted_values = converted
+        super().accept()
+
+    def convert_values(self) -> Tuple[List[Tuple[str, Any]], List[Tuple[str, str]]]:
+        """ Each value converted by the parameter, and the values it rejected with the reason. """
+        param = self.parameter()
+        converted = []
+        errors = []
+        for text in self.values():
+            try:
+                converted.append((text, param.validate(text)))
+            except (xappt.ParameterValidationError, TypeError, ValueError) as err:
+                errors.append((text, str(err)))
+        return converted, errors
+
+    def show_errors(self, errors: List[Tuple[str, str]]):
+        lines = [f"{text}: {reason}" for text, reason in errors[:self.MAX_ERRORS_SHOWN]]
+        if len(errors) > self.MAX_ERRORS_SHOWN:
+            lines.append(f"... and {len(errors) - self.MAX_ERRORS_SHOWN} more")
+        count = len(errors)
+        message = f"{count} value{'s are' if count != 1 else ' is'} not valid for {self.parameter_name()}:\n\n"
+        QtWidgets.QMessageBox.critical(self, self.windowTitle(), message + "\n".join(lines))
+
+        # select the first bad value so it can be fixed
+        self.txtValues.moveCursor(QtGui.QTextCursor.Start)
+        self.txtValues.find(errors[0][0])
+        self.txtValues.setFocus()
+
+    def parameter(self) -> xappt.Parameter:
+        name = self.parameter_name()
+        return next(param for param in self.tool.parameters() if param.name == name)
+
+    def parameter_name(self) -> str:
+        return self.cmbParameter.currentText()
+
+    def values(self) -> List[str]:
+        return [line.strip() for line in self.txtValues.toPlainText().splitlines() if len(line.strip())]
+
+    def converted_values(self) -> List[Tuple[str, Any]]:
+        """ The text of each value and the value the parameter converted it to, once the dialog was accepted. """
+        return list(self._converted_values)
+
+    def workers(self) -> int:
+        return self.spinWorkers.value()
@@ -1,4 +1,5 @@
 import importlib.resources
+import time
 from itertools import chain
 from typing import Optional
 
@@ -8,7 +9,9 @@ import xappt
 
 from xappt_qt.gui.application import get_application
 from xappt_qt.gui.ui.tool_interface import Ui_ToolInterface
+from xappt_qt.gui.utilities.job_queue import JobQueue
 from xappt_qt.gui.widgets.console import ConsoleWidget
+from xappt_qt.gui.widgets.job_list import JobListWidget
 from xappt_qt.gui.widgets.tool_page.widget import ToolPage
 
 
@@ -26,6 +29,20 @@ class ToolUI(QtWidgets.QDialog, Ui_ToolInterface):
         self.console = ConsoleWidget()
         self.setup_console()
 
+        self.actionProfile = QtWidgets.QAction("Profile Runs", self)
+        self.actionProfile.setCheckable(True)
+        self.actionProfile.setToolTip("Profile the next runs, and print the slowest functions when they finish")
+        self.actionProfileMemory = QtWidgets.QAction("Profile Memory", self)
+        self.actionProfileMemory.setCheckable(True)
+        self.actionProfileMemory.setToolTip("Report the memory used by the next runs, and what each tool leaves behind")
+        self.console.context_actions.extend((self.actionProfile, self.actionProfileMemory))
+
+        self.job_list: Optional[JobListWidget] = None
+        self.setup_queue_buttons()
+
+        self._last_process_events = 0.0
+        self.pump_events = True  # turned off while a tool runs on a worker thread
+
     def set_tool_enabled(self, enabled: bool = True):
         self.toolContainer.setEnabled(enabled)
 
@@ -46,6 +63,40 @@ class ToolUI(QtWidgets.QDialog, Ui_ToolInterface):
         self.consoleContainer.layout().addWidget(self.console)
         self.hide_console()
 
+    # noinspection PyAttributeOutsideInit
+    def setup_queue_buttons(self):
+        self.spinPriority = QtWidgets.QSpinBox()
+        self.spinPriority.setRange(-99, 99)
+        self.spinPriority.setPrefix("Priority: ")
+        self.spinPriority.setToolTip("Queued runs with a higher priority start first")
+        self.btnQueue = QtWidgets.QPushButton("Queue")
+        self.btnQueue.setAutoDefault(False)
+        self.btnQueue.setToolTip("Queue a run with the current parameters")
+        self.btnBatch = QtWidgets.QPushButton("Batch...")
+        self.btnBatch.setAutoDefault(False)
+        self.btnBatch.setToolTip("Queue one run for each of a list of parameter values")
+        index = self.horizontalLayout.indexOf(self.btnRun)
+        self.horizontalLayout.insertWidget(index, self.btnBatch)
+        self.horizontalLayout.insertWidget(index, self.btnQueue)
+        self.horizontalLayout.insertWidget(index, self.spinPriority)
+
+    def setup_job_list(self, queue: JobQueue):
+        self.job_list = JobListWidget(queue)
+        self.splitter.addWidget(self.job_list)
+        self.splitter.setCollapsible(2, True)
+        self.hide_job_list()
+
+    def show_job_list(self):
+        sizes = self.splitter.sizes()
+        if sizes[2] > 0:
+            return
+        third_height = int(self.height() / 3)
+        self.splitter.setSizes([third_height, third_height if sizes[1] > 0 else 0, third_height])
+
+    def hide_job_list(self):
+        sizes = self.splitter.sizes()
+        self.splitter.setSizes([sizes[0] + sizes[2], sizes[1], 0])
+
     def clear_loaded_tool(self):
         layout: QtWidgets.QVBoxLayout = self.toolContainer.layout()
         while layout.count():
@@ -54,10 +105,16 @@ class ToolUI(QtWidgets.QDialog, Ui_ToolInterface):
             if widget is not None:
                 widget.deleteLater()
 
-    def load_tool(self, tool_instance: xappt.BaseTool):
+    @staticmethod
+    def build_tool_page(tool_instance: xappt.BaseTool) -> ToolPage:
+        """ Build the page of a tool without showing it, `load_tool` can use it later. """
+        return ToolPage(tool_instance)
+
+    def load_tool(self, tool_instance: xappt.BaseTool, widget: Optional[ToolPage] = None):
         self.clear_loaded_tool()
         self.current_tool = tool_instance
-        widget = ToolPage(self.current_tool)
+        if widget is None:
+            widget = self.build_tool_page(self.current_tool)
 
         layout: QtWidgets.QVBoxLayout = self.toolContainer.layout()
         layout.addWidget(self.wrap_widget(widget))
@@ -65,7 +122,8 @@ class ToolUI(QtWidgets.QDialog, Ui_ToolInterface):
         self.set_tab_order(widget)
 
     def set_tab_order(self, tool_widget: ToolPage):
-        ui_widgets = [self.btnHelp, self.btnRun, self.btnAdvance, self.btnRunAndAdvance]
+        ui_widgets = [self.btnHelp, self.spinPriority, self.btnQueue, self.btnBatch, self.btnRun, self.btnAdvance,
+                      self.btnRunAndAdvance]
         first_widget: Optional[QtWidgets.QWidget] = None
         last_widget: Optional[QtWidgets.QWidget] = None
         for widget in chain(tool_widget.ordered_widgets(), self.console.ordered_widgets(), ui_widgets):
@@ -98,22 +156,39 @@ class ToolUI(QtWidgets.QDialog, Ui_ToolInterface):
         return scroller
 
     def show_console(self):
-        if self.splitter.sizes()[1] > 0:
+        sizes = self.splitter.sizes()
+        if sizes[1] > 0:
             return
         half_height = int(self.height() * 0.5)
-        self.splitter.setSizes((half_height, half_height))
+        self.splitter.setSizes([half_height, half_height] + sizes[2:])
 
     def hide_console(self):
-        self.splitter.setSizes((self.height(), 0))
+        sizes = self.splitter.sizes()
+        self.splitter.setSizes([self.height(), 0] + sizes[2:])
+
+    def process_events(self):
+        """ Unless they are threaded, tools run on the GUI thread, so the event loop only
+        gets a chance to run when output is written. Limit this to the console's refresh
+        rate so that chatty tools don't spend most of their time repainting.
+
+        The console's flush timer can't fire while the tool blocks the GUI thread, so
+        queued output is flushed here, otherwise the last line written before a long
+        call wouldn't show until the call returns. """
+        if not self.pump_events:
+            return
+        self.console.flush()
+        now = time.monotonic()
+        if (now - self._last_process_events) * 1000.0 < self.console.flush_interval():
+            return
+        self._last_process_events = now
+        self.app.processEvents()
 
     def write_stdout(self, text: str):
         self.show_console()
-        for line in text.splitlines():
-            self.console.write_stdout(line)
-        self.app.processEvents()
+        self.console.write_stdout(text)
+        self.process_events()
 
     def write_stderr(self, text: str):
         self.show_console()
-        for line in text.splitlines():
-            self.console.write_stderr(line)
-        self.app.processEvents()
+        self.console.write_stderr(text)
+        self.process_events()
@@ -1,3 +1,4 @@
 from xappt_qt.gui.tab_pages.tools import ToolsTabPage
 from xappt_qt.gui.tab_pages.options import OptionsTabPage
+from xappt_qt.gui.tab_pages.history import HistoryTabPage
 from xappt_qt.gui.tab_pages.about import AboutTabPage
@@ -0,0 +1,179 @@
+import datetime
+
+from typing import Optional
+
+from PyQt5 import QtCore, QtWidgets
+
+from xappt_qt.gui.tab_pages.base import BaseTabPage
+from xappt_qt.utilities.memory import format_size
+from xappt_qt.utilities.progress import format_duration
+from xappt_qt.utilities.run_history import RunHistory, ToolStatistics
+
+
+def format_seconds(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return ""
+    if seconds < 1.0:
+        return f"{seconds * 1000.0:.0f}ms"
+    if seconds < 60.0:
+        return f"{seconds:.2f}s"
+    return format_duration(seconds)
+
+
+class NumericItem(QtWidgets.QTreeWidgetItem):
+    """ Sorts by the value stored in `QtCore.Qt.UserRole` instead of the text. """
+
+    def __lt__(self, other: QtWidgets.QTreeWidgetItem) -> bool:
+        column = self.treeWidget().sortColumn()
+        mine = self.data(column, QtCore.Qt.UserRole)
+        theirs = other.data(column, QtCore.Qt.UserRole)
+        if mine is None or theirs is None:
+            return super().__lt__(other)
+        return mine < theirs
+
+
+class HistoryTabPage(BaseTabPage):
+    """ Execute time percentiles of every tool that was run, and the recent runs of the
+    selected tool. """
+
+    STATS_COLUMNS = ("Tool", "Collection", "Runs", "Failed", "p50", "p90", "p99", "Slowest", "Last Run")
+    RUN_COLUMNS = ("Started", "Interface", "Exit Code", "Validate", "Execute", "Teardown", "Peak Memory",
+                   "Parameters", "Versions")
+    RECENT_RUN_COUNT = 200
+    ROLE_TOOL_KEY = QtCore.Qt.UserRole + 1  # (collection, tool) of a row, kept apart from the sort values
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.history = RunHistory()
+        self.setup_ui()
+        self.connect_signals()
+
+    # noinspection PyAttributeOutsideInit
+    def setup_ui(self):
+        self.setWindowTitle("History")
+        layout = QtWidgets.QVBoxLayout()
+        self.setLayout(layout)
+
+        splitter = QtWidgets.QSplitter(QtCore.Qt.Vertical)
+        layout.addWidget(splitter)
+
+        self.treeStats = QtWidgets.QTreeWidget()
+        self.treeStats.setRootIsDecorated(False)
+        self.treeStats.setUniformRowHeights(True)
+        self.treeStats.setSortingEnabled(True)
+        self.treeStats.setHeaderLabels(self.STATS_COLUMNS)
+        splitter.addWidget(self.treeStats)
+
+        self.treeRuns = QtWidgets.QTreeWidget()
+        self.treeRuns.setRootIsDecorated(False)
+        self.treeRuns.setUniformRowHeights(True)
+        self.treeRuns.setHeaderLabels(self.RUN_COLUMNS)
+        splitter.addWidget(self.treeRuns)
+
+        controls = QtWidgets.QHBoxLayout()
+        self.lblSummary = QtWidgets.QLabel()
+        controls.addWidget(self.lblSummary)
+        controls.addStretch()
+        self.btnRefresh = QtWidgets.QPushButton("Refresh")
+        controls.addWidget(self.btnRefresh)
+        self.btnClear = QtWidgets.QPushButton("Clear History")
+        controls.addWidget(self.btnClear)
+        layout.addLayout(controls)
+
+    def connect_signals(self):
+        self.treeStats.currentItemChanged.connect(self.on_current_tool_changed)
+        self.btnRefresh.clicked.connect(self.refresh)
+        self.btnClear.clicked.connect(self.on_clear)
+
+    def showEvent(self, event):
+        self.refresh()  # tools run in their own processes, the history changes behind our back
+        super().showEvent(event)
+
+    def refresh(self):
+        current = self.treeStats.currentItem()
+        selected = None if current is None else current.data(0, self.ROLE_TOOL_KEY)
+        try:
+            statistics = self.history.statistics()
+        except Exception as err:  # noqa, a locked or damaged database shouldn't break the browser
+            self.lblSummary.setText(f"The run history could not be read: {err}")
+            return
+        finally:
+            self.history.close()
+
+        self.treeStats.setSortingEnabled(False)
+        self.treeStats.clear()
+        for stats in statistics:
+            item = self.stats_item(stats)
+            self.treeStats.addTopLevelItem(item)
+            if selected is not None and selected == (stats.collection, stats.tool):
+                self.treeStats.setCurrentItem(item)
+        self.treeStats.setSortingEnabled(True)
+        for column in range(len(self.STATS_COLUMNS)):
+            self.treeStats.resizeColumnToContents(column)
+
+        run_count = sum(stats.runs for stats in statistics)
+        self.lblSummary.setText(f"{run_count} runs of {len(statistics)} tools")
+        if self.treeStats.currentItem() is None:
+            self.treeRuns.clear()
+
+    def stats_item(self, stats: ToolStatistics) -> QtWidgets.QTreeWidgetItem:
+        last_run = datetime.datetime.fromtimestamp(stats.last_run)
+        values = (
+            (stats.tool, None),
+            (stats.collection, None),
+            (str(stats.runs), stats.runs),
+            (str(stats.failures) if stats.failures else "", stats.failures),
+            (format_seconds(stats.p50), stats.p50),
+            (format_seconds(stats.p90), stats.p90),
+            (format_seconds(stats.p99), stats.p99),
+            (format_seconds(stats.slowest), stats.slowest),
+            (f"{last_run:%Y-%m-%d %H:%M:%S}", stats.last_run),
+        )
+        item = NumericItem()
+        for column, (text, value) in enumerate(values):
+            item.setText(column, text)
+            if value is not None:
+                item.setData(column, QtCore.Qt.UserRole, value)
+        item.setData(0, self.ROLE_TOOL_KEY, (stats.collection, stats.tool))
+        item.setToolTip(0, "Durations are execute times of the runs that succeeded")
+        return item
+
+    def on_current_tool_changed(self, current: Optional[QtWidgets.QTreeWidgetItem], _):
+        self.treeRuns.clear()
+        if current is None:
+            return
+        collection, tool = current.data(0, self.ROLE_TOOL_KEY)
+        try:
+            runs = self.history.runs(collection, tool, limit=self.RECENT_RUN_COUNT)
+        except Exception:  # noqa
+            return
+        finally:
+            self.history.close()
+        for run in runs:
+            item = QtWidgets.QTreeWidgetItem()
+            item.setText(0, f"{run.started_datetime:%Y-%m-%d %H:%M:%S}")
+            item.setText(1, run.interface)
+            item.setText(2, "" if run.exit_code is None else str(run.exit_code))
+            item.setText(3, format_seconds(run.validate_time))
+            item.setText(4, format_seconds(run.execute_time))
+            item.setText(5, format_seconds(run.teardown_time))
+            item.setText(6, "" if run.peak_rss is None else format_size(run.peak_rss))
+            item.setText(7, run.parameter_hash)
+            item.setText(8, run.versions)
+            self.treeRuns.addTopLevelItem(item)
+        for column in range(len(self.RUN_COLUMNS) - 1):
+            self.treeRuns.resizeColumnToContents(column)
+
+    def on_clear(self):
+        buttons = QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
+        answer = QtWidgets.QMessageBox.question(self, "Clear History", "Remove every recorded run?",
+                                                buttons=buttons, defaultButton=QtWidgets.QMessageBox.No)
+        if answer != QtWidgets.QMessageBox.Yes:
+            return
+        try:
+            self.history.clear()
+        except Exception as err:  # noqa
+            self.warning("History", f"The run history could not be cleared: {err}")
+        finally:
+            self.history.close()
+        self.refresh()
@@ -17,6 +17,7 @@ class OptionsTabPage(BaseTabPage, Ui_tabOptions):
         self.chkMinimizeToTray.stateChanged.connect(self.options_changed.emit)
         self.chkStartMinimized.stateChanged.connect(self.options_changed.emit)
         self.cmbToolViewType.currentIndexChanged.connect(self.options_changed.emit)
+        self.chkOpenInBrowser.stateChanged.connect(self.options_changed.emit)
 
     def populate_tool_view_type_combo(self):
         self.cmbToolViewType.clear()
@@ -36,6 +37,7 @@ class OptionsTabPage(BaseTabPage, Ui_tabOptions):
             'minimize_to_tray': self.chkMinimizeToTray.isChecked(),
             'start_minimized': self.chkStartMinimized.isChecked(),
             'view_type': self.cmbToolViewType.currentData(),
+            'open_in_browser': self.chkOpenInBrowser.isChecked(),
         }
 
     def apply_settings(self, settings_dict: dict):
@@ -47,3 +49,4 @@ class OptionsTabPage(BaseTabPage, Ui_tabOptions):
         view_type = settings_dict.get('view_type', ToolViewType.VIEW_SMALL_ICONS.value)
         index = max(0, self.cmbToolViewType.findData(view_type))
         self.cmbToolViewType.setCurrentIndex(index)
+        self.chkOpenInBrowser.setChecked(settings_dict.get('open_in_browser', False))
@@ -1,14 +1,16 @@
 import importlib.resources
 import math
+import os
 import platform
+import sqlite3
 import subprocess
 import sys
-import webbrowser
+import time
 
-from PyQt5 import QtWidgets, QtGui, QtCore
+from PyQt5 import QtGui, QtCore
 
 from collections import defaultdict
-from typing import DefaultDict, Generator, List, Tuple
+from typing import DefaultDict, Dict, List, Optional, Sequence, Set, Tuple
 
 import xappt
 
@@ -16,9 +18,14 @@ import xappt_qt
 import xappt_qt.config
 from xappt_qt.constants import APP_TITLE, ToolViewType
 from xappt_qt.gui.ui.browser_tab_tools import Ui_tabTools
-from xappt_qt.gui.delegates import SimpleItemDelegate, ToolItemDelegate
+from xappt_qt.gui.delegates import ToolItemDelegate
 from xappt_qt.gui.tab_pages.base import BaseTabPage
-from xappt_qt.utilities.tool_attributes import *
+from xappt_qt.gui.utilities.prefork_launcher import PreforkLauncher
+from xappt_qt.gui.widgets.tool_tree import ToolFilterProxyModel, ToolTreeModel
+from xappt_qt.utilities.plugin_manifest import PluginManifest, ToolManifestEntry
+from xappt_qt.utilities.run_history import RunHistory
+from xappt_qt.utilities.search_index import SearchIndex
+from xappt_qt.utilities.tool_attributes import is_headless
 
 
 ICON_SIZES = {
@@ -32,42 +39,95 @@ class ToolsTabPage(BaseTabPage, Ui_tabTools):
         super().__init__(**kwargs)
         self.setupUi(self)
 
+        self.tool_model = ToolTreeModel(self)
+        self.filter_model = ToolFilterProxyModel(self)
+        self.filter_model.setSourceModel(self.tool_model)
+        self.collapsed_collections: Set[str] = set()
+        self.search_index: Optional[SearchIndex] = None
+        self.last_used: Dict[Tuple[str, str], float] = {}  # by collection and tool name
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(xappt_qt.config.tool_search_delay)
         self.set_tree_attributes()
 
         with importlib.resources.path("xappt_qt.resources.icons", "clear.svg") as path:
             self.btnClear.setIcon(QtGui.QIcon(str(path)))
 
-        self.loaded_plugins: DefaultDict[str, List[Type[xappt.BaseTool]]] = defaultdict(list)
+        self.loaded_plugins: DefaultDict[str, List[ToolManifestEntry]] = defaultdict(list)
         self.populate_plugins()
         self.connect_signals()
 
+        self.open_in_browser = False
+        self.tool_windows: List[xappt.BaseInterface] = []
+
+        self.prefork_launcher: Optional[PreforkLauncher] = None
+        if xappt_qt.config.launch_server_enabled and PreforkLauncher.supported():
+            self.prefork_launcher = PreforkLauncher()
+            self.prefork_launcher.start()
+
     def set_tree_attributes(self):
-        self.treeTools.setIconSize(QtCore.QSize(24, 24))
-        self.treeTools.setItemDelegate(ToolItemDelegate())
+        self.treeTools.setIconSize(ICON_SIZES[ToolViewType.VIEW_SMALL_ICONS])
+        self.treeTools.setItemDelegate(ToolItemDelegate(self.treeTools))
+        self.treeTools.setModel(self.filter_model)
 
     def populate_plugins(self):
-        self.treeTools.clear()
-        plugin_list: DefaultDict[str, List[Type[xappt.BaseTool]]] = defaultdict(list)
-
-        for _, plugin_class in xappt.plugin_manager.registered_tools():
-            collection = plugin_class.collection()
-            plugin_list[collection].append(plugin_class)
-
-        for collection in sorted(plugin_list.keys(), key=lambda x: x.lower()):
-            collection_item = self._create_collection_item(collection)
-            self.treeTools.insertTopLevelItem(self.treeTools.topLevelItemCount(), collection_item)
-            for plugin in sorted(plugin_list[collection], key=lambda x: x.name().lower()):
-                tool_item = self._create_tool_item(plugin)
-                collection_item.addChild(tool_item)
-                self.loaded_plugins[collection].append(plugin)
-            collection_item.setExpanded(True)
+        """ Fill the tree from the plugin manifest, tools are only asked for their help and
+        icon when their module changed since the manifest was saved. """
+        self.loaded_plugins.clear()
+
+        manifest = PluginManifest()
+        tool_classes = [plugin_class for _, plugin_class in xappt.plugin_manager.registered_tools()]
+        entries = manifest.entries(tool_classes)
+        manifest.save()
+
+        self.filter_model.set_scores(None)
+        self.tool_model.set_entries(entries)
+        for entry in self.tool_model.tool_index.entries:
+            self.loaded_plugins[entry.collection].append(entry)
+        self.restore_expanded()
+
+        # the index is loaded once the browser is showing, so the first search doesn't wait for it
+        self.search_index = None
+        QtCore.QTimer.singleShot(0, self.load_search_index)
+
+    def load_search_index(self):
+        """ Load the search index saved next to the plugin manifest, it's rebuilt when a
+        tool changed. The times tools were last run come from the run history. """
+        if self.search_index is None:
+            self.search_index = SearchIndex.load(self.tool_model.tool_index.entries)
+        if xappt_qt.config.run_history_enabled:
+            try:
+                last_runs = RunHistory().last_runs()
+            except sqlite3.Error:
+                last_runs = {}
+            for key, started in last_runs.items():
+                self.last_used[key] = max(started, self.last_used.get(key, 0.0))
+
+    def last_used_rows(self) -> Dict[int, float]:
+        """ When each tool was last used, by row in the model's `tool_index`. """
+        rows = {}
+        for row, entry in enumerate(self.tool_model.tool_index.entries):
+            last_used = self.last_used.get((entry.collection, entry.name))
+            if last_used is not None:
+                rows[row] = last_used
+        return rows
+
+    def restore_expanded(self):
+        """ Collections the filter removed come back collapsed, expand all but the ones the
+        user collapsed. """
+        for row in range(self.filter_model.rowCount()):
+            index = self.filter_model.index(row, 0)
+            self.treeTools.setExpanded(index, index.data() not in self.collapsed_collections)
 
     def connect_signals(self):
-        self.treeTools.itemActivated.connect(self.item_activated)
-        self.treeTools.itemSelectionChanged.connect(self.selection_changed)
+        self.treeTools.activated.connect(self.item_activated)
+        self.treeTools.selectionModel().selectionChanged.connect(self.selection_changed)
         self.treeTools.clicked.connect(self.on_tree_item_clicked)
+        self.treeTools.collapsed.connect(lambda index: self.collapsed_collections.add(index.data()))
+        self.treeTools.expanded.connect(lambda index: self.collapsed_collections.discard(index.data()))
 
-        self.txtSearch.textChanged.connect(self.on_filter_tools)
+        self.txtSearch.textChanged.connect(self.search_timer.start)
+        self.search_timer.timeout.connect(self.on_filter_tools)
         # noinspection PyAttributeOutsideInit
         self.__txtSearch_keyPressEvent_orig = self.txtSearch.keyPressEvent
         self.txtSearch.keyPressEvent = self._filter_key_press
@@ -82,58 +142,55 @@ class ToolsTabPage(BaseTabPage, Ui_tabTools):
         else:
             self.treeTools.expand(index)
 
-    @staticmethod
-    def _create_collection_item(collection_name: str) -> QtWidgets.QTreeWidgetItem:
-        item = QtWidgets.QTreeWidgetItem()
-        item.setText(0, collection_name)
-        item.setData(0, ToolItemDelegate.ROLE_TOOL_CLASS, None)
-        item.setData(0, ToolItemDelegate.ROLE_ITEM_TYPE, ToolItemDelegate.ITEM_TYPE_COLLECTION)
-        return item
-
-    @staticmethod
-    def _create_tool_item(tool_class: Type[xappt.BaseTool]) -> QtWidgets.QTreeWidgetItem:
-        item = QtWidgets.QTreeWidgetItem()
-        item.setText(0, tool_class.name())
-        item.setToolTip(0, help_text(tool_class, process_markdown=True, include_name=True))
-        item.setData(0, ToolItemDelegate.ROLE_TOOL_CLASS, tool_class)
-        item.setData(0, ToolItemDelegate.ROLE_ITEM_TYPE, ToolItemDelegate.ITEM_TYPE_TOOL)
-        item.setData(0, ToolItemDelegate.ROLE_ITEM_SEARCH_TEXT, f'{tool_class.name()}\n{tool_class.help()}')
-
-        icon_path = get_tool_icon(tool_class)
-        item.setIcon(0, QtGui.QIcon(str(icon_path)))
-
-        return item
-
-    def item_activated(self, item: QtWidgets.QTreeWidgetItem, column: int):
-        item_type = item.data(column, ToolItemDelegate.ROLE_ITEM_TYPE)
-        if item_type != ToolItemDelegate.ITEM_TYPE_TOOL:
+    def item_activated(self, index: QtCore.QModelIndex):
+        if index.data(ToolItemDelegate.ROLE_ITEM_TYPE) != ToolItemDelegate.ITEM_TYPE_TOOL:
             return
-        tool_class: Type[xappt.BaseTool] = item.data(column, ToolItemDelegate.ROLE_TOOL_CLASS)
-        self.launch_tool(tool_class)
+        entry: ToolManifestEntry = index.data(ToolItemDelegate.ROLE_TOOL_CLASS)
+        if self.launch_tool(entry.name) is not None:
+            self.last_used[(entry.collection, entry.name)] = time.time()
 
     @staticmethod
-    def launch_command(tool_name: str) -> Tuple:
+    def launch_command(tool_name: str, args: Sequence[str] = ()) -> Tuple:
         if xappt_qt.executable is not None:
-            return xappt_qt.executable, tool_name
-        return sys.executable, "-m", "xappt_qt.launcher", tool_name
-
-    def launch_tool(self, tool_class: Type[xappt.BaseTool]):
-        tool_name = tool_class.name()
+            return (xappt_qt.executable, tool_name, *args)
+        return (sys.executable, "-m", "xappt_qt.launcher", tool_name, *args)
+
+    def launch_tool(self, tool_name: str, args: Sequence[str] = (), cwd: Optional[str] = None,
+                    environment: Optional[Dict[str, str]] = None) -> Optional[int]:
+        """ Run a tool in its own process, this process never needs the tool class. The
+        process is forked from the launch server when it's running. `args` are passed to
+        `xappt_qt.launcher` after the tool name, and the process gets `environment` when
+        it's given. Returns the pid of the new process, or of this process if the tool was
+        opened in a window of the browser. """
+        if self.open_in_browser and self.open_tool_window(tool_name, args, cwd, environment):
+            self.information(APP_TITLE, f"Opened {tool_name}")
+            return os.getpid()
+        if self.prefork_launcher is not None:
+            pid = self.prefork_launcher.launch([tool_name, *args], cwd=cwd, environment=environment)
+            if pid is not None:
+                self.information(APP_TITLE, f"Launched {tool_name} (pid {pid})")
+                return pid
         try:
-            launch_command = self.launch_command(tool_name)
+            launch_command = self.launch_command(tool_name, args)
         except TypeError:
             self.critical(APP_TITLE, "Could not find executable")
-        else:
+            return None
+        try:
             if platform.system() == "Windows":
-                proc = subprocess.Popen(launch_command, creationflags=subprocess.CREATE_NEW_CONSOLE)
+                proc = subprocess.Popen(launch_command, cwd=cwd, env=environment,
+                                        creationflags=subprocess.CREATE_NEW_CONSOLE)
             else:
-                proc = subprocess.Popen(launch_command)
-            self.information(APP_TITLE, f"Launched {tool_name} (pid {proc.pid})")
+                proc = subprocess.Popen(launch_command, cwd=cwd, env=environment)
+        except OSError as err:
+            self.critical(APP_TITLE, f"Could not launch {tool_name}: {err}")
+            return None
+        self.information(APP_TITLE, f"Launched {tool_name} (pid {proc.pid})")
+        return proc.pid
 
     def selection_changed(self):
-        selected_items = self.treeTools.selectedItems()
-        if len(selected_items):
-            self.labelHelp.setText(selected_items[0].toolTip(0))
+        selected = self.treeTools.selectionModel().selectedIndexes()
+        if len(selected):
+            self.labelHelp.setText(selected[0].data(QtCore.Qt.ToolTipRole) or "")
         else:
             self.labelHelp.setText("")
 
@@ -142,55 +199,69 @@ class ToolsTabPage(BaseTabPage, Ui_tabTools):
             self.txtSearch.clear()
         self.__txtSearch_keyPressEvent_orig(event)
 
-    def on_filter_tools(self, text: str):
-        if len(text) == 0:
-            # noinspection PyTypeChecker
-            iterator = QtWidgets.QTreeWidgetItemIterator(self.treeTools, QtWidgets.QTreeWidgetItemIterator.All)
-            while iterator.value():
-                item = iterator.value()
-                item.setHidden(False)
-                iterator += 1
-            return
-        search_terms = [item.lower() for item in text.split(" ") if len(item)]
-        self._filter_branch(search_terms, self.treeTools.invisibleRootItem())
-
-    def _filter_branch(self, search_terms: List[str], parent: QtWidgets.QTreeWidgetItem) -> int:
-        visible_children = 0
-        for c in range(parent.childCount()):
-            child = parent.child(c)
-            item_type = child.data(0, ToolItemDelegate.ROLE_ITEM_TYPE)
-            if item_type == ToolItemDelegate.ITEM_TYPE_TOOL:
-                search_text = child.data(0, ToolItemDelegate.ROLE_ITEM_SEARCH_TEXT)
-                visible_children += 1
-                item_hidden = False
-                for term in search_terms:
-                    if term not in search_text:
-                        item_hidden = True
-                        break
-                child.setHidden(item_hidden)
-                if item_hidden:
-                    visible_children -= 1
-            elif item_type == ToolItemDelegate.ITEM_TYPE_COLLECTION:
-                visible_children += self._filter_branch(search_terms, child)
-            else:
-                raise NotImplementedError
-        parent.setHidden(visible_children == 0)
-        return visible_children
+    def on_filter_tools(self):
+        """ Search once typing paused for `tool_search_delay`, best matches first. """
+        if self.search_index is None:
+            self.load_search_index()
+        self.filter_model.set_scores(self.search_index.search(self.txtSearch.text(), self.last_used_rows()))
+        self.restore_expanded()
+
+    def open_tool_window(self, tool_name: str, args: Sequence[str] = (), cwd: Optional[str] = None,
+                         environment: Optional[Dict[str, str]] = None) -> bool:
+        """ Open the tool in a non-modal window of this process. Each window gets its own
+        interface, so tools never share output callbacks or `tool_data`. Returns False for
+        launches that need a process of their own: headless tools, tools that run in the
+        terminal, or a different working directory or environment. """
+        if cwd is not None and os.path.abspath(cwd) != os.getcwd():
+            return False
+        if environment is not None and environment != dict(os.environ):
+            return False
+        try:
+            tool_class = xappt.plugin_manager.get_tool_plugin(tool_name)
+        except ValueError:
+            return False
+        if is_headless(tool_class):
+            return False
+
+        from xappt_qt import launcher
+        try:
+            options, unknowns = launcher.argument_parser().parse_known_args(args=[tool_name, *args])
+        except SystemExit:  # the arguments are reported by the launcher of a new process
+            return False
+        if options.no_gui:
+            return False
+
+        from xappt_qt.plugins.interfaces.qt import QtInterface
+        interface = QtInterface()
+        interface.tool_data = launcher.parse_unknowns_args(unknowns)
+        interface.add_tool(tool_class)
+        interface.ui.actionProfile.setChecked(options.profile or interface.profiling_enabled)
+        interface.ui.actionProfileMemory.setChecked(options.profile_memory or interface.memory_profiling_enabled)
+        interface.ui.setAttribute(QtCore.Qt.WA_QuitOnClose, False)  # the browser may be hidden in the tray
+        if not interface.show():
+            return False
+        interface.ui.finished.connect(lambda _, i=interface: self.on_tool_window_closed(i))
+        self.tool_windows.append(interface)
+        return True
+
+    def on_tool_window_closed(self, interface: xappt.BaseInterface):
+        if interface in self.tool_windows:
+            self.tool_windows.remove(interface)
+        interface.ui.deleteLater()
+
+    def shutdown(self):
+        for interface in list(self.tool_windows):
+            interface.ui.close()
+        if self.prefork_launcher is not None:
+            self.prefork_launcher.stop()
 
     @staticmethod
     def on_link_activated(url: str):
+        import webbrowser
         webbrowser.open(url)
 
     def settings_changed(self, settings: dict):
+        self.open_in_browser = settings.get('open_in_browser', False)
         view_type = settings.get('view_type', 0)
         self.treeTools.setIconSize(ICON_SIZES[view_type])
-
-        # noinspection PyTypeChecker
-        iterator = QtWidgets.QTreeWidgetItemIterator(self.treeTools, QtWidgets.QTreeWidgetItemIterator.All)
-        while iterator.value():
-            item = iterator.value()
-            if item.data(0, ToolItemDelegate.ROLE_ITEM_TYPE) == ToolItemDelegate.ITEM_TYPE_TOOL:
-                item.setData(0, ToolItemDelegate.ROLE_ICON_SIZE, ICON_SIZES[view_type])
-            else:
-                item.setData(0, ToolItemDelegate.ROLE_ICON_SIZE, ICON_SIZES[ToolViewType.VIEW_SMALL_ICONS])
-            iterator += 1
+        self.tool_model.set_icon_size(ICON_SIZES[view_type])
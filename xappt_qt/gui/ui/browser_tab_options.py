@@ -2,7 +2,7 @@
 
 
 #
-# Created by: PyQt5 UI code generator 5.15.4
+# Created by: PyQt5 UI code generator 5.15.11
 #
 # WARNING: Any manual changes made to this file will be lost when pyuic5 is
 # run again.  Do not edit this file unless you know what you are doing.
@@ -38,6 +38,9 @@ class Ui_tabOptions(object):
         self.label = QtWidgets.QLabel(tabOptions)
         self.label.setObjectName("label")
         self.gridLayout_3.addWidget(self.label, 2, 0, 1, 1)
+        self.chkOpenInBrowser = QtWidgets.QCheckBox(tabOptions)
+        self.chkOpenInBrowser.setObjectName("chkOpenInBrowser")
+        self.gridLayout_3.addWidget(self.chkOpenInBrowser, 3, 1, 1, 1)
         self.verticalLayout.addLayout(self.gridLayout_3)
         spacerItem = QtWidgets.QSpacerItem(20, 237, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
         self.verticalLayout.addItem(spacerItem)
@@ -46,6 +49,7 @@ class Ui_tabOptions(object):
         QtCore.QMetaObject.connectSlotsByName(tabOptions)
         tabOptions.setTabOrder(self.chkMinimizeToTray, self.chkStartMinimized)
         tabOptions.setTabOrder(self.chkStartMinimized, self.cmbToolViewType)
+        tabOptions.setTabOrder(self.cmbToolViewType, self.chkOpenInBrowser)
 
     def retranslateUi(self, tabOptions):
         _translate = QtCore.QCoreApplication.translate
@@ -53,3 +57,5 @@ class Ui_tabOptions(object):
         self.chkMinimizeToTray.setText(_translate("tabOptions", "Minimize to system tray"))
         self.chkStartMinimized.setText(_translate("tabOptions", "Start Minimized"))
         self.label.setText(_translate("tabOptions", "View"))
+        self.chkOpenInBrowser.setToolTip(_translate("tabOptions", "Open tools as windows of the browser, instead of starting a new process for each tool"))
+        self.chkOpenInBrowser.setText(_translate("tabOptions", "Open tools in the browser"))
@@ -2,7 +2,7 @@
 
 
 #
-# Created by: PyQt5 UI code generator 5.15.4
+# Created by: PyQt5 UI code generator 5.15.11
 #
 # WARNING: Any manual changes made to this file will be lost when pyuic5 is
 # run again.  Do not edit this file unless you know what you are doing.
@@ -39,20 +39,20 @@ class Ui_tabTools(object):
         self.labelHelp.setWordWrap(True)
         self.labelHelp.setObjectName("labelHelp")
         self.gridLayout.addWidget(self.labelHelp, 2, 0, 1, 1)
-        self.treeTools = QtWidgets.QTreeWidget(tabTools)
+        self.treeTools = QtWidgets.QTreeView(tabTools)
         self.treeTools.setAlternatingRowColors(True)
         self.treeTools.setIndentation(0)
         self.treeTools.setRootIsDecorated(False)
+        self.treeTools.setSortingEnabled(False)
         self.treeTools.setAnimated(True)
         self.treeTools.setAllColumnsShowFocus(True)
         self.treeTools.setObjectName("treeTools")
-        self.treeTools.headerItem().setText(0, "1")
         self.treeTools.header().setVisible(False)
         self.gridLayout.addWidget(self.treeTools, 1, 0, 1, 1)
         self.gridLayout_2.addLayout(self.gridLayout, 0, 0, 1, 1)
 
         self.retranslateUi(tabTools)
-        self.btnClear.clicked.connect(self.txtSearch.clear)
+        self.btnClear.clicked.connect(self.txtSearch.clear) # type: ignore
         QtCore.QMetaObject.connectSlotsByName(tabTools)
         tabTools.setTabOrder(self.txtSearch, self.btnClear)
         tabTools.setTabOrder(self.btnClear, self.treeTools)
@@ -62,4 +62,3 @@ class Ui_tabTools(object):
         tabTools.setWindowTitle(_translate("tabTools", "Tools"))
         self.txtSearch.setPlaceholderText(_translate("tabTools", "Search"))
         self.btnClear.setText(_translate("tabTools", "x"))
-        self.treeTools.setSortingEnabled(False)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import math
+import traceback
+
+from typing import TYPE_CHECKING, Any, Awaitable, Optional
+
+from PyQt5 import QtCore
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+class AsyncRunner(QtCore.QObject):
+    """ Runs a coroutine on an asyncio event loop that is stepped by the Qt event loop.
+
+    While a coroutine is running, one iteration of the asyncio loop is run whenever it
+    has something to do, so coroutines can wait for I/O concurrently without blocking
+    the window or needing threads: right away while callbacks are ready, when the next
+    scheduled callback is due, and when the loop's selector has I/O events, which a
+    `QSocketNotifier` watches. Loops without a selector to watch are polled every
+    `POLL_INTERVAL` milliseconds instead. Dialogs opened by the coroutine pause it until
+    they are closed.
+
+    `execution_failed` is emitted with the formatted traceback if the coroutine
+    raises, and is always followed by `execution_finished`. The event loop (and asyncio
+    itself) is only created once the first coroutine is started. """
+    execution_finished = QtCore.pyqtSignal(object)  # the result of the coroutine
+    execution_failed = QtCore.pyqtSignal(str)
+
+    POLL_INTERVAL = 5  # milliseconds
+    BLOCKED_INTERVAL = 50  # milliseconds between attempts while another asyncio loop is running
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Future] = None
+        self._notifier: Optional[QtCore.QSocketNotifier] = None
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.step)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, awaitable: Awaitable):
+        import asyncio
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+            self._watch_selector()
+        self._task = asyncio.ensure_future(awaitable, loop=self.loop)
+        self.step()
+
+    def step(self):
+        import asyncio
+        if self._task is None or self.loop is None:
+            return
+        if asyncio._get_running_loop() is not None:
+            # re-entered from a nested event loop, e.g. a dialog opened by this coroutine or
+            # by the coroutine of another runner, asyncio can't run two loops at once
+            self._set_notifier_enabled(False)
+            self.timer.start(self.BLOCKED_INTERVAL)
+            return
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+        if self._task.done():
+            self.timer.stop()
+            self._set_notifier_enabled(False)
+            self._finish(self._task)
+        else:
+            self._schedule_step()
+
+    def _schedule_step(self):
+        """ Start the timer for the next iteration, when the loop has work that isn't I/O. """
+        self._set_notifier_enabled(True)
+        loop = self.loop
+        if len(getattr(loop, "_ready", ())):
+            self.timer.start(0)
+        elif self._notifier is None:
+            self.timer.start(self.POLL_INTERVAL)
+        elif len(getattr(loop, "_scheduled", ())):
+            delay = loop._scheduled[0].when() - loop.time()
+            self.timer.start(max(0, math.ceil(delay * 1000.0)))
+        else:
+            self.timer.stop()  # only I/O or another thread can wake the loop now
+
+    def _watch_selector(self):
+        selector = getattr(self.loop, "_selector", None)
+        try:
+            fd = selector.fileno()
+        except (AttributeError, NotImplementedError, OSError):
+            return  # e.g. the proactor loop on Windows, or a select() based selector
+        self._notifier = QtCore.QSocketNotifier(fd, QtCore.QSocketNotifier.Read, self)
+        self._notifier.activated.connect(self.step)
+
+    def _set_notifier_enabled(self, enabled: bool):
+        if self._notifier is not None:
+            self._notifier.setEnabled(enabled)
+
+    def _finish(self, task: asyncio.Future):
+        if task.cancelled():
+            self.execution_finished.emit(1)
+            return
+        error = task.exception()
+        if error is not None:
+            details = "".join(traceback.format_exception(type(error), error, error.__traceback__))
+            self.execution_failed.emit(details)
+            self.execution_finished.emit(1)
+            return
+        self.execution_finished.emit(task.result())
+
+    def result(self) -> Any:
+        """ The result of the last coroutine, re-raises its exception if it failed. """
+        return self._task.result()
+
+    def cancel(self):
+        if self.running:
+            self._task.cancel()
+            self.timer.start(0)  # the cancellation is delivered by the next iteration
+
+    def close(self):
+        if self.running:
+            self._task.cancel()
+            self.step()
+        self.timer.stop()
+        if self._notifier is not None:
+            self._notifier.setEnabled(False)
+            self._notifier.deleteLater()
+            self._notifier = None
+        if self.loop is not None:
+            self.loop.close()
+            self.loop = None
@@ -0,0 +1,121 @@
+import getpass
+import json
+
+from typing import Callable, Dict, List, Optional
+
+from PyQt5 import QtCore, QtNetwork
+
+from xappt.config import log as logger
+from xappt.constants import LOAD_EXAMPLES_ENV, PLUGIN_PATH_ENV
+
+from xappt_qt.constants import APP_PACKAGE_NAME
+
+CONNECT_TIMEOUT = 250  # milliseconds, a running browser accepts connections right away
+REPLY_TIMEOUT = 5000  # milliseconds
+
+# the variables that decide which tools a process finds
+PLUGIN_ENVIRONMENT = (PLUGIN_PATH_ENV, LOAD_EXAMPLES_ENV, "PYTHONPATH")
+
+RequestHandler = Callable[[List[str], Optional[str], Optional[Dict[str, str]]], Dict]
+
+
+def server_name() -> str:
+    try:
+        user = getpass.getuser()
+    except (KeyError, OSError):  # no user name in the environment or the password database
+        user = "user"
+    return f"{APP_PACKAGE_NAME}-browser-{user}"
+
+
+def plugin_environment(environment: Dict[str, str]) -> Dict[str, str]:
+    return {name: environment.get(name, "") for name in PLUGIN_ENVIRONMENT}
+
+
+def encode_message(message: Dict) -> bytes:
+    return json.dumps(message).encode("utf8") + b"\n"
+
+
+def forward_request(args: List[str], cwd: Optional[str], environment: Optional[Dict[str, str]] = None
+                    ) -> Optional[Dict]:
+    """ Send `args` (a tool name and its arguments, or nothing to bring the browser to
+    the front) to the browser that is already running, with the environment the tool
+    should run in. Returns its reply, or None if no browser is listening. """
+    connection = QtNetwork.QLocalSocket()
+    connection.connectToServer(server_name())
+    if not connection.waitForConnected(CONNECT_TIMEOUT):
+        return None
+    try:
+        connection.write(encode_message({'args': args, 'cwd': cwd, 'env': environment}))
+        if not connection.waitForBytesWritten(REPLY_TIMEOUT):
+            return None
+        data = b""
+        while not data.endswith(b"\n"):
+            if not connection.bytesAvailable() and not connection.waitForReadyRead(REPLY_TIMEOUT):
+                return None
+            data += bytes(connection.readAll())
+        return json.loads(data.decode("utf8"))
+    except ValueError:
+        return None
+    finally:
+        connection.disconnectFromServer()
+
+
+class InstanceServer(QtCore.QObject):
+    """ Listens for launch requests from later invocations of `xappt-qt`, so they can hand
+    their arguments to the running browser and exit instead of starting a new one.
+
+    A request is one JSON line, `{"args": [...], "cwd": ..., "env": {...}}`. It's passed
+    to `handler`, and the dictionary it returns is sent back as the reply. A reply with
+    `declined` tells the sender to launch the tool itself. """
+
+    def __init__(self, handler: RequestHandler, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self.handler = handler
+        self.server = QtNetwork.QLocalServer(self)
+        self.server.setSocketOptions(QtNetwork.QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self.on_new_connection)
+        self._buffers: Dict[QtNetwork.QLocalSocket, bytes] = {}
+
+    def listen(self) -> bool:
+        name = server_name()
+        if not self.server.listen(name):
+            # left behind by a browser that didn't shut down, nothing answered `forward_request`
+            QtNetwork.QLocalServer.removeServer(name)
+            if not self.server.listen(name):
+                logger.warning(f"Could not listen for launch requests: {self.server.errorString()}")
+                return False
+        return True
+
+    def close(self):
+        self.server.close()
+
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            self._buffers[connection] = b""
+            connection.readyRead.connect(lambda c=connection: self.on_ready_read(c))
+            connection.disconnected.connect(lambda c=connection: self.on_disconnected(c))
+
+    def on_ready_read(self, connection: QtNetwork.QLocalSocket):
+        data = self._buffers.get(connection, b"") + bytes(connection.readAll())
+        self._buffers[connection] = data
+        if not data.endswith(b"\n"):
+            return
+        try:
+            request = json.loads(data.decode("utf8"))
+            args = [str(arg) for arg in request['args']]
+            cwd = request.get('cwd')
+            environment = request.get('env')
+            if environment is not None:
+                environment = {str(name): str(value) for name, value in environment.items()}
+        except (ValueError, KeyError, TypeError, AttributeError) as err:
+            reply = {'error': f"invalid request: {err}"}
+        else:
+            reply = self.handler(args, cwd, environment)
+        connection.write(encode_message(reply))
+        connection.flush()
+        connection.disconnectFromServer()
+
+    def on_disconnected(self, connection: QtNetwork.QLocalSocket):
+        self._buffers.pop(connection, None)
+        connection.deleteLater()
@@ -0,0 +1,355 @@
+import enum
+import functools
+import inspect
+import itertools
+import time
+import traceback
+
+from typing import Any, Dict, List, Optional, Type, Union
+
+from PyQt5 import QtCore
+
+import xappt
+
+from xappt_qt import config
+from xappt_qt.gui.utilities.async_runner import AsyncRunner
+from xappt_qt.gui.utilities.tool_process import ToolProcess
+from xappt_qt.gui.utilities.tool_worker import ToolWorker
+from xappt_qt.plugins.interfaces.async_support import AsyncInterfaceMixin
+from xappt_qt.utilities.profiling import profiled
+from xappt_qt.utilities.progress import ProgressTracker
+from xappt_qt.utilities.result_cache import CachedRun, cached_run
+from xappt_qt.utilities.run_history import RunRecorder
+from xappt_qt.utilities.tool_attributes import is_isolated, is_threaded
+
+
+class JobState(enum.Enum):
+    QUEUED = 0
+    RUNNING = 1
+    SUCCESS = 2
+    ERROR = 3
+    CANCELED = 4
+
+
+class Job:
+    """ One queued run of a tool, with a snapshot of its parameter values. """
+    _ids = itertools.count(1)
+
+    def __init__(self, tool_class: Type[xappt.BaseTool], parameters: Dict[str, Any],
+                 tool_data: Dict[str, Any], priority: int = 0, label: Optional[str] = None):
+        self.id = next(self._ids)
+        self.tool_class = tool_class
+        self.parameters = parameters
+        self.tool_data = tool_data
+        self.priority = priority
+        self.label = label  # shown instead of the parameter summary, e.g. the item of a batch
+        self.state = JobState.QUEUED
+        self.start_time: Optional[float] = None
+        self.end_time: Optional[float] = None
+        self.exit_code: Optional[int] = None
+        self.canceled = False  # set when a running job is aborted, it then ends as canceled rather than failed
+        self.progress = ProgressTracker(config.progress_refresh_rate)
+        self.runner: Optional[Union[ToolWorker, ToolProcess, AsyncRunner]] = None
+        self.interface: Optional["JobInterface"] = None
+        self.recorder: Optional[RunRecorder] = None
+        self.cached_run: Optional[CachedRun] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (JobState.SUCCESS, JobState.ERROR, JobState.CANCELED)
+
+    def duration(self) -> Optional[float]:
+        if self.start_time is None:
+            return None
+        end_time = time.monotonic() if self.end_time is None else self.end_time
+        return end_time - self.start_time
+
+    def summary(self) -> str:
+        if self.label is not None:
+            return self.label
+        return ", ".join(f"{name}={value}" for name, value in self.parameters.items())
+
+    def copy(self) -> "Job":
+        """ A new queued job with the same parameters. """
+        return Job(self.tool_class, dict(self.parameters), dict(self.tool_data), self.priority, self.label)
+
+
+class JobInterface(AsyncInterfaceMixin, xappt.BaseInterface):
+    """ The interface of a single job. Every job gets its own command runner and
+    progress, output is forwarded to the tool window with the job's id in front of
+    every line, and dialogs are shown by the tool window. Jobs are profiled when the tool
+    window profiles its runs. """
+
+    def __init__(self, job: Job, parent_interface: xappt.BaseInterface):
+        super().__init__()
+        self.job = job
+        self.parent_interface = parent_interface
+        self.tool_data = dict(job.tool_data)
+        self.profiling_enabled = getattr(parent_interface, "profiling_enabled", False)
+        self.memory_profiling_enabled = getattr(parent_interface, "memory_profiling_enabled", False)
+        self.on_write_stdout.add(self.forward_stdout)
+        self.on_write_stderr.add(self.forward_stderr)
+
+    def _prefixed(self, text: str) -> str:
+        prefix = f"[#{self.job.id}] "
+        return "\n".join(prefix + line for line in text.split("\n"))
+
+    def forward_stdout(self, text: str):
+        self.parent_interface.write_stdout(self._prefixed(text))
+
+    def forward_stderr(self, text: str):
+        self.parent_interface.write_stderr(self._prefixed(text))
+
+    def run(self, **kwargs) -> int:
+        return super().run(**kwargs)
+
+    def invoke(self, plugin: xappt.BaseTool, **kwargs) -> int:
+        self._current_tool = plugin
+        try:
+            execute = profiled(plugin, self.write_stdout, cpu=self.profiling_enabled,
+                               memory=self.memory_profiling_enabled)
+            return execute(**kwargs)
+        finally:
+            self._current_tool = None
+
+    def message(self, message: str):
+        self.parent_interface.message(f"Job #{self.job.id}\n\n{message}")
+
+    def warning(self, message: str):
+        self.parent_interface.warning(f"Job #{self.job.id}\n\n{message}")
+
+    def error(self, message: str, *, details: Optional[str] = None):
+        self.parent_interface.error(f"Job #{self.job.id}\n\n{message}", details=details)
+
+    def ask(self, message: str) -> bool:
+        return self.parent_interface.ask(f"Job #{self.job.id}\n\n{message}")
+
+    # progress is only recorded, the job list polls it at display rate
+    def progress_start(self):
+        self.job.progress.start()
+
+    def progress_update(self, message: str, percent_complete: float):
+        self.job.progress.update(message, percent_complete)
+
+    def progress_end(self):
+        self.job.progress.update("", 1.0)
+
+    def abort(self):
+        super().abort()
+        if self.command_runner.running:
+            self.command_runner.abort()
+        self.kill_async_subprocesses()
+
+
+class JobQueue(QtCore.QObject):
+    """ Runs queued jobs, at most `max_concurrent` at a time. Jobs with a higher priority
+    start first, jobs with the same priority start in the order they were queued.
+
+    Jobs run where the tool would run in the tool window: threaded tools on worker
+    threads, isolated tools in child processes, and every other tool on the GUI thread,
+    with coroutines stepped by the Qt event loop. They are validated, cached and
+    recorded in the run history like runs of the tool window. """
+    job_added = QtCore.pyqtSignal(object)
+    job_changed = QtCore.pyqtSignal(object)
+    job_removed = QtCore.pyqtSignal(object)
+
+    def __init__(self, interface: xappt.BaseInterface, max_concurrent: int = 1,
+                 parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self.interface = interface
+        self._max_concurrent = max(1, max_concurrent)
+        self.jobs: List[Job] = []
+
+    @property
+    def max_concurrent(self) -> int:
+        return self._max_concurrent
+
+    @max_concurrent.setter
+    def max_concurrent(self, value: int):
+        self._max_concurrent = max(1, value)
+        self.schedule()
+
+    def running_jobs(self) -> List[Job]:
+        return [job for job in self.jobs if job.state == JobState.RUNNING]
+
+    def state_counts(self) -> Dict[JobState, int]:
+        counts = {state: 0 for state in JobState}
+        for job in self.jobs:
+            counts[job.state] += 1
+        return counts
+
+    def add(self, job: Job) -> Job:
+        self.jobs.append(job)
+        self.job_added.emit(job)
+        self.schedule()
+        return job
+
+    def remove(self, job: Job):
+        if job.state == JobState.RUNNING:
+            return
+        self.jobs.remove(job)
+        self.job_removed.emit(job)
+
+    def add_batch(self, jobs: List[Job]):
+        """ Add several jobs at once, so they are scheduled by priority rather than in the
+        order they were added. """
+        for job in jobs:
+            self.jobs.append(job)
+            self.job_added.emit(job)
+        self.schedule()
+
+    def retry(self, job: Job) -> Optional[Job]:
+        """ Queue a failed or canceled job again. The new job replaces it in the list. """
+        if job.state not in (JobState.ERROR, JobState.CANCELED):
+            return None
+        self.remove(job)
+        return self.add(job.copy())
+
+    def set_priority(self, job: Job, priority: int):
+        job.priority = priority
+        self.job_changed.emit(job)
+        self.schedule()
+
+    def cancel(self, job: Job):
+        """ Cancel a queued job, or abort a running one. """
+        if job.state == JobState.QUEUED:
+            job.state = JobState.CANCELED
+            self.job_changed.emit(job)
+        elif job.state == JobState.RUNNING:
+            job.canceled = True
+            if isinstance(job.runner, ToolProcess):
+                job.runner.kill()
+            else:
+                job.interface.abort()
+                if isinstance(job.runner, AsyncRunner):
+                    job.runner.cancel()
+
+    def next_job(self) -> Optional[Job]:
+        queued = [job for job in self.jobs if job.state == JobState.QUEUED]
+        if not len(queued):
+            return None
+        return max(queued, key=lambda j: (j.priority, -j.id))
+
+    def schedule(self):
+        while len(self.running_jobs()) < self._max_concurrent:
+            job = self.next_job()
+            if job is None:
+                break
+            self.start(job)
+
+    def start(self, job: Job):
+        job.state = JobState.RUNNING
+        job.start_time = time.monotonic()
+        job.interface = JobInterface(job, self.interface)
+        tool_kwargs = dict(job.tool_data)
+        tool_kwargs.update(job.parameters)
+        try:
+            tool = job.tool_class(interface=job.interface, **tool_kwargs)
+        except xappt.ParameterValidationError as err:
+            job.interface.write_stderr(str(err))
+            self.finish_later(job, 1)
+            return
+
+        # jobs on worker threads share this process, their peak memory can't be told apart
+        job.recorder = RunRecorder(tool, "queue", measure_peak=False)
+        try:
+            tool.validate()
+        except xappt.ParameterValidationError as err:
+            job.interface.write_stderr(str(err))
+            self.finish_later(job, 2)
+            return
+        job.recorder.validated()
+
+        job.cached_run = cached_run(tool, job.interface.tool_data)
+        if job.cached_run is not None:
+            exit_code = job.cached_run.restore()
+            if exit_code is not None:
+                job.cached_run = None
+                job.recorder = None  # a restored result says nothing about how long the tool takes
+                job.interface.write_stdout(f"The inputs of {tool.name()} haven't changed, its cached result was restored.")
+                self.finish_later(job, exit_code)
+                return
+
+        on_finished = functools.partial(self.on_job_finished, job)
+        if is_isolated(tool):
+            job.runner = ToolProcess(job.interface, parent=self)
+            job.runner.execution_finished.connect(on_finished)
+            self.job_changed.emit(job)
+            job.runner.execute(tool, **job.interface.tool_data)
+        elif is_threaded(tool):
+            job.runner = ToolWorker(functools.partial(job.interface.invoke, tool, **job.interface.tool_data),
+                                    parent=self)
+            job.runner.execution_failed.connect(job.interface.write_stderr)
+            job.runner.execution_finished.connect(on_finished)
+            self.job_changed.emit(job)
+            job.runner.start()
+        else:
+            # not while `schedule` is still starting jobs, the tool blocks the GUI thread until it returns
+            self.job_changed.emit(job)
+            QtCore.QTimer.singleShot(0, functools.partial(self.run_on_gui_thread, job, tool))
+
+    def run_on_gui_thread(self, job: Job, tool: xappt.BaseTool):
+        """ Run a tool that isn't threaded or isolated, the way the tool window would. """
+        if job.canceled:
+            self.on_job_finished(job, 1)
+            return
+        try:
+            result = job.interface.invoke(tool, **job.interface.tool_data)
+        except BaseException:  # noqa, reported like the exceptions of tools on worker threads
+            job.interface.write_stderr(traceback.format_exc())
+            result = 1
+        if inspect.isawaitable(result):
+            job.runner = AsyncRunner(parent=self)
+            job.runner.execution_failed.connect(job.interface.write_stderr)
+            job.runner.execution_finished.connect(functools.partial(self.on_job_finished, job))
+            job.runner.start(result)
+            return
+        self.on_job_finished(job, result)
+
+    def finish_later(self, job: Job, result: int):
+        """ Finish a job that never ran once the event loop is back, finishing it right away
+        would start the next job from within `schedule`, once for every such job. """
+        QtCore.QTimer.singleShot(0, functools.partial(self.on_job_finished, job, result))
+
+    def on_job_finished(self, job: Job, result: int):
+        runner = job.runner
+        job.runner = None
+        recorder = job.recorder
+        job.recorder = None
+        if recorder is not None:
+            recorder.executed()
+        if isinstance(runner, ToolWorker):
+            runner.wait()
+        elif isinstance(runner, ToolProcess):
+            runner.stop()
+        elif isinstance(runner, AsyncRunner):
+            runner.close()
+        if runner is not None:
+            runner.deleteLater()
+        if recorder is not None:
+            recorder.finish(result, peak=runner.peak_rss if isinstance(runner, ToolProcess) else None)
+        if job.cached_run is not None:
+            job.cached_run.store(result)
+            job.cached_run = None
+
+        job.end_time = time.monotonic()
+        job.exit_code = result
+        if job.canceled:
+            job.state = JobState.CANCELED
+        else:
+            job.state = JobState.SUCCESS if result == 0 else JobState.ERROR
+        self.job_changed.emit(job)
+        self.schedule()
+
+    def shutdown(self):
+        """ Cancel queued jobs, abort running ones and wait for them to stop. """
+        for job in self.jobs:
+            if job.state == JobState.QUEUED:
+                self.cancel(job)
+        for job in self.running_jobs():
+            runner = job.runner
+            self.cancel(job)
+            if isinstance(runner, ToolWorker):
+                runner.wait()
+            elif isinstance(runner, AsyncRunner):
+                runner.close()  # steps the loop once more, so the coroutine sees the cancellation
@@ -0,0 +1,92 @@
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+
+from typing import Dict, List, Optional
+
+from xappt.config import log as logger
+
+import xappt_qt
+
+
+class PreforkLauncher:
+    """ Keeps a launch server (see `xappt_qt.launch_server`) running next to the browser,
+    and asks it to fork tool processes that have already imported everything.
+
+    `launch` returns None whenever the server can't be used (it's still starting, it
+    died, or the platform can't fork), the caller then starts the tool the usual way. """
+
+    CONNECT_TIMEOUT = 2.0  # seconds
+
+    def __init__(self):
+        self.socket_path = os.path.join(tempfile.gettempdir(), f"xappt_qt-launcher-{os.getuid()}-{os.getpid()}.sock")
+        self.process: Optional[subprocess.Popen] = None
+
+    @staticmethod
+    def supported() -> bool:
+        return hasattr(os, "fork") and platform.system() == "Linux"
+
+    def server_command(self) -> List[str]:
+        if xappt_qt.executable is not None:
+            return [xappt_qt.executable, "--launch-server", self.socket_path]
+        return [sys.executable, "-u", "-m", "xappt_qt.launch_server", self.socket_path]
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        if self.running:
+            return
+        environment = dict(os.environ)
+        # make sure the server can import every tool module that the browser could import
+        environment['PYTHONPATH'] = os.pathsep.join(path for path in sys.path if len(path))
+        try:
+            self.process = subprocess.Popen(self.server_command(), env=environment, stdin=subprocess.DEVNULL)
+        except OSError as err:
+            logger.warning(f"Could not start the launch server: {err}")
+            self.process = None
+
+    def launch(self, args: List[str], cwd: Optional[str] = None,
+               environment: Optional[Dict[str, str]] = None) -> Optional[int]:
+        """ Fork a tool process running `xappt_qt.launcher` with `args`, returns its pid.
+        The process gets `environment` instead of the server's own when it's given. """
+        if not self.running:
+            return None
+        request = {'args': list(args), 'cwd': cwd or os.getcwd(), 'env': environment}
+        request = json.dumps(request).encode("utf8") + b"\n"
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+                connection.settimeout(self.CONNECT_TIMEOUT)
+                connection.connect(self.socket_path)
+                connection.sendall(request)
+                data = b""
+                while not data.endswith(b"\n"):
+                    chunk = connection.recv(4096)
+                    if not chunk:
+                        break
+                    data += chunk
+            response = json.loads(data.decode("utf8"))
+        except (OSError, ValueError):
+            return None  # not listening yet
+        if 'error' in response:
+            logger.warning(f"The launch server refused a request: {response['error']}")
+            return None
+        return response.get('pid')
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=self.CONNECT_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
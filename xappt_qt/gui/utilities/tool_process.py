@@ -0,0 +1,182 @@
+import collections
+import os
+import sys
+
+from typing import List, Optional
+
+from PyQt5 import QtCore
+
+import xappt
+import xappt_qt
+
+from xappt_qt.constants import APP_NO_GUI_ENV
+from xappt_qt.utilities.tool_protocol import *
+
+
+class ToolProcess(QtCore.QObject):
+    """ Runs tools in a child process (see `xappt_qt.tool_host`) and forwards what the
+    tool asks of its interface to `interface`.
+
+    The child is kept alive after a run, and reused if the same tool is run again. The
+    `tool_data` keys the child added or changed during a run are merged into the
+    interface's `tool_data` before `execution_finished` is emitted, so chains see what
+    isolated tools added. """
+    execution_finished = QtCore.pyqtSignal(object)  # the result of `execute`
+
+    STOP_TIMEOUT = 1000  # milliseconds
+
+    def __init__(self, interface: xappt.BaseInterface, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self.interface = interface
+        self.tool_key: Optional[str] = None
+        self.peak_rss: Optional[int] = None  # of the child, during the last run
+
+        self.process = QtCore.QProcess(self)
+        self.process.setProcessEnvironment(self.host_environment())
+        self.process.readyReadStandardOutput.connect(self._on_ready_read)
+        self.process.readyReadStandardError.connect(self._on_ready_read_stderr)
+        self.process.finished.connect(self._on_process_finished)
+
+        self._decoder = FrameDecoder()
+        self._frames = collections.deque()
+        self._dispatching = False
+        self._running = False
+        self._killed = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @staticmethod
+    def host_command() -> List[str]:
+        if xappt_qt.executable is not None:
+            return [xappt_qt.executable, "--tool-host"]
+        return [sys.executable, "-u", "-m", "xappt_qt.tool_host"]
+
+    @staticmethod
+    def host_environment() -> QtCore.QProcessEnvironment:
+        # make sure the child can import every tool module that the parent could import
+        environment = QtCore.QProcessEnvironment.systemEnvironment()
+        environment.insert("PYTHONPATH", os.pathsep.join(path for path in sys.path if len(path)))
+        # the host talks to the parent through the protocol, it doesn't need to load PyQt5
+        environment.insert(APP_NO_GUI_ENV, "1")
+        return environment
+
+    @staticmethod
+    def get_tool_key(tool: xappt.BaseTool) -> str:
+        return f"{tool.__module__}:{tool.name()}"
+
+    def is_warm(self, tool: xappt.BaseTool) -> bool:
+        return self.process.state() == QtCore.QProcess.Running and self.tool_key == self.get_tool_key(tool)
+
+    def start(self, tool: xappt.BaseTool) -> bool:
+        self.stop()
+        self._decoder.clear()
+        self._frames.clear()
+        self._killed = False
+        program, *arguments = self.host_command()
+        self.process.start(program, arguments)
+        if not self.process.waitForStarted():
+            return False
+        self.tool_key = self.get_tool_key(tool)
+        return True
+
+    def stop(self):
+        """ Let an idle child exit, or kill it if it doesn't. """
+        if self.process.state() == QtCore.QProcess.NotRunning:
+            return
+        self.process.closeWriteChannel()
+        if not self.process.waitForFinished(self.STOP_TIMEOUT):
+            self.kill()
+            self.process.waitForFinished(self.STOP_TIMEOUT)
+
+    def kill(self):
+        if self.process.state() == QtCore.QProcess.NotRunning:
+            return
+        self._killed = True
+        self.process.kill()
+
+    def execute(self, tool: xappt.BaseTool, **kwargs):
+        """ Run `tool` with its current parameter values. `execution_finished` is
+        emitted when it is done. """
+        if not self.is_warm(tool) and not self.start(tool):
+            self.interface.write_stderr(f"Could not start the tool process: {self.process.errorString()}")
+            self.execution_finished.emit(1)
+            return
+        self._running = True
+        self.peak_rss = None
+        self.process.write(encode_json_frame(FrameType.RUN, {
+            'module': tool.__module__,
+            'name': tool.name(),
+            'parameters': tool.param_dict(),
+            'tool_data': kwargs,
+            'profile': getattr(self.interface, "profiling_enabled", False),
+            'profile_memory': getattr(self.interface, "memory_profiling_enabled", False),
+        }))
+
+    def _answer(self, value=None):
+        self.process.write(encode_json_frame(FrameType.ANSWER, value))
+
+    def _on_ready_read(self):
+        self._frames.extend(self._decoder.feed(bytes(self.process.readAllStandardOutput())))
+        self._dispatch_frames()
+
+    def _on_ready_read_stderr(self):
+        # only output from before the child captured its file descriptors ends up here
+        data = bytes(self.process.readAllStandardError())
+        self.interface.write_stderr(data.decode("utf8", errors="replace").rstrip("\n"))
+
+    def _dispatch_frames(self):
+        # dialogs run a nested event loop, new frames are queued until they close
+        if self._dispatching:
+            return
+        self._dispatching = True
+        try:
+            while len(self._frames):
+                self._dispatch_frame(*self._frames.popleft())
+        finally:
+            self._dispatching = False
+
+    def _dispatch_frame(self, frame_type: FrameType, payload: bytes):
+        interface = self.interface
+        if frame_type == FrameType.STDOUT:
+            interface.write_stdout(payload.decode("utf8", errors="replace"))
+        elif frame_type == FrameType.STDERR:
+            interface.write_stderr(payload.decode("utf8", errors="replace"))
+        elif frame_type == FrameType.PROGRESS_START:
+            interface.progress_start()
+        elif frame_type == FrameType.PROGRESS_UPDATE:
+            interface.progress_update(*decode_json(payload))
+        elif frame_type == FrameType.PROGRESS_END:
+            interface.progress_end()
+        elif frame_type == FrameType.MESSAGE:
+            interface.message(decode_json(payload))
+            self._answer()
+        elif frame_type == FrameType.WARNING:
+            interface.warning(decode_json(payload))
+            self._answer()
+        elif frame_type == FrameType.ERROR:
+            message, details = decode_json(payload)
+            interface.error(message, details=details)
+            self._answer()
+        elif frame_type == FrameType.ASK:
+            self._answer(interface.ask(decode_json(payload)))
+        elif frame_type == FrameType.STATS:
+            self.peak_rss = decode_json(payload).get('peak_rss')
+        elif frame_type == FrameType.RESULT:
+            result = decode_json(payload)
+            self._running = False
+            interface.tool_data.update(result.get('tool_data', {}))
+            self.execution_finished.emit(result['exit_code'])
+
+    def _on_process_finished(self, exit_code: int, exit_status: QtCore.QProcess.ExitStatus):
+        self._on_ready_read()
+        self.tool_key = None
+        if not self._running:
+            return
+        self._running = False
+        if self._killed:
+            self.interface.write_stderr("The tool process was terminated.")
+        else:
+            self.interface.write_stderr(f"The tool process exited unexpectedly (exit code {exit_code}).")
+        self.execution_finished.emit(exit_code or 1)
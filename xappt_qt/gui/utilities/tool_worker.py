@@ -0,0 +1,100 @@
+import functools
+import inspect
+import threading
+import traceback
+
+from typing import Any, Callable, Optional
+
+from PyQt5 import QtCore
+
+from xappt_qt.plugins.interfaces.async_support import run_awaitable
+
+
+class GuiDispatcher(QtCore.QObject):
+    """ Runs callables on the thread this object lives in, normally the GUI thread.
+
+    Calls are delivered through queued signals, so calls made from one worker thread
+    are run in the order they were made. The dispatcher must not be moved to another
+    thread after it was created. """
+    _call_queued = QtCore.pyqtSignal(object)
+    _call_blocking = QtCore.pyqtSignal(object)
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self._owner_ident = threading.get_ident()
+        self._call_queued.connect(self._run_call, QtCore.Qt.QueuedConnection)
+        self._call_blocking.connect(self._run_call, QtCore.Qt.BlockingQueuedConnection)
+
+    @staticmethod
+    def _run_call(call: Callable[[], Any]):
+        call()
+
+    def in_owner_thread(self) -> bool:
+        # much cheaper than comparing QThread objects, this is checked on every call
+        return threading.get_ident() == self._owner_ident
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """ Run `fn` on the owner thread without waiting for it. """
+        if self.in_owner_thread():
+            fn(*args, **kwargs)
+            return
+        self._call_queued.emit(functools.partial(fn, *args, **kwargs))
+
+    def call_blocking(self, fn: Callable, *args, **kwargs) -> Any:
+        """ Run `fn` on the owner thread and wait for its result. Exceptions raised by `fn`
+        are re-raised in the calling thread. """
+        if self.in_owner_thread():
+            return fn(*args, **kwargs)
+        outcome = {}
+
+        def run_call():
+            try:
+                outcome['result'] = fn(*args, **kwargs)
+            except BaseException as err:
+                outcome['error'] = err
+
+        self._call_blocking.emit(run_call)
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome.get('result')
+
+
+def on_gui_thread(blocking: bool = False):
+    """ Decorate a method of an object with a `dispatcher` attribute so that it always runs
+    on the dispatcher's thread. Non-blocking methods return `None` when called from
+    another thread. """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            dispatcher: GuiDispatcher = self.dispatcher
+            if dispatcher.in_owner_thread():
+                return fn(self, *args, **kwargs)
+            if blocking:
+                return dispatcher.call_blocking(fn, self, *args, **kwargs)
+            dispatcher.call(fn, self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ToolWorker(QtCore.QThread):
+    """ Runs a tool's `execute` on its own thread. Coroutines returned by `fn` run on an
+    asyncio event loop of the worker thread.
+
+    `execution_failed` is emitted with the formatted traceback if `fn` raises, and is
+    always followed by `execution_finished`. """
+    execution_finished = QtCore.pyqtSignal(object)  # the result of `fn`
+    execution_failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, fn: Callable[[], int], parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self.fn = fn
+
+    def run(self):
+        try:
+            result = self.fn()
+            if inspect.isawaitable(result):
+                result = run_awaitable(result)
+        except BaseException:
+            self.execution_failed.emit(traceback.format_exc())
+            result = 1
+        self.execution_finished.emit(result)
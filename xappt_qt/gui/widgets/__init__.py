@@ -1,5 +1,18 @@
-from .file_edit import FileEdit
-from .check_list import CheckList
-from .error_label import ErrorLabel
-from .text_edit import TextEdit
-from .table_edit import TableEdit
+import importlib
+
+# widgets are imported on first use, importing one widget module doesn't load all of them
+WIDGET_MODULES = {
+    'FileEdit': "file_edit",
+    'CheckList': "check_list",
+    'ErrorLabel': "error_label",
+    'TextEdit': "text_edit",
+    'TableEdit': "table_edit",
+}
+
+
+def __getattr__(name: str):
+    module_name = WIDGET_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{module_name}", __name__)
+    return getattr(module, name)
@@ -1,18 +1,28 @@
 import importlib.resources
 import os
-from typing import Generator
+import re
+from collections import deque
+from typing import Deque, Dict, Generator, List, Optional, Set, Tuple
 
-import pyperclip
-
-from PyQt5 import QtGui, QtWidgets
+from PyQt5 import QtCore, QtGui, QtWidgets
 
 from xappt_qt import config
+from xappt_qt.constants import APP_TITLE
 from xappt_qt.gui.ui.console import Ui_Console
+from xappt_qt.gui.widgets.console_search import ConsoleSearchBar, SearchWorker
+from xappt_qt.gui.widgets.log_view import LogModel, LogView, color_brush
+from xappt_qt.utilities.line_store import LineStore
+from xappt_qt.utilities.scrollback import ScrollbackBuffer
+from xappt_qt.utilities.session_log import SessionLog
+from xappt_qt.utilities.terminal import DEFAULT_STYLE, ParsedLine, TerminalLineParser, TextRun, TextStyle
 
 
 class ConsoleWidget(QtWidgets.QWidget, Ui_Console):
-    STREAM_STDOUT = 0
-    STREAM_STDERR = 1
+    STREAM_STDOUT = LogModel.STREAM_STDOUT
+    STREAM_STDERR = LogModel.STREAM_STDERR
+
+    BACKEND_TEXT = "text"
+    BACKEND_LIST = "list"
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -20,7 +30,51 @@ class ConsoleWidget(QtWidgets.QWidget, Ui_Console):
         self.load_icons()
         self.set_tooltips()
 
-        self.output_buffer_raw = []
+        self.output_buffer_raw = ScrollbackBuffer(config.console_scrollback_lines)
+        self.session_log: Optional[SessionLog] = None  # when set, "Save Log..." copies this instead
+        self.context_actions: List[QtWidgets.QAction] = []  # added to the bottom of the context menu
+        self.txtConsole.document().setMaximumBlockCount(self.output_buffer_raw.max_lines)
+
+        self.backend: str = config.console_backend
+        self.log_model: Optional[LogModel] = None
+        self.log_view: Optional[LogView] = None
+        # the text and stream of every block in `txtConsole`, this is what gets searched; the
+        # list backend searches the store of its model instead
+        self._document_lines: Optional[LineStore] = None
+        if self.backend == self.BACKEND_LIST:
+            self.setup_log_view()
+        else:
+            self._document_lines = LineStore(self.output_buffer_raw.max_lines, trim_slack=0)
+
+        self.search_bar = ConsoleSearchBar(self)
+        self.setup_search_bar()
+        self._search_worker: Optional[SearchWorker] = None
+        self._search_matches: List[int] = []  # line ids, see `LineStore.line_id`
+        self._search_match_index = -1
+        self._visible_streams: Set[int] = {self.STREAM_STDOUT, self.STREAM_STDERR}
+
+        self._parsers: Dict[int, TerminalLineParser] = {
+            self.STREAM_STDOUT: TerminalLineParser(),
+            self.STREAM_STDERR: TerminalLineParser(),
+        }
+        self._last_stream: Optional[int] = None  # stream of the last line that was written
+        self._document_has_lines = False
+
+        self._stream_brushes = {
+            self.STREAM_STDOUT: color_brush(config.console_color_stdout),
+            self.STREAM_STDERR: color_brush(config.console_color_stderr),
+        }
+        self._char_formats: Dict[Tuple[TextStyle, int], QtGui.QTextCharFormat] = {}
+
+        # lines waiting to be drawn, flushed to the document in batches by `flush_timer`
+        self._pending_output: Deque[Tuple[ParsedLine, int]] = deque(maxlen=max(1, config.console_max_pending_lines))
+        self._dropped_lines = 0
+        self._watched_window = None
+
+        self.flush_timer = QtCore.QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(self.flush_interval())
+        self.flush_timer.timeout.connect(self.flush)
 
         self.connect_signals()
 
@@ -34,6 +88,32 @@ class ConsoleWidget(QtWidgets.QWidget, Ui_Console):
         self.btnScrollDown.setChecked(self.auto_scroll)
         self.on_scroll_toggled(self.auto_scroll)
 
+    def setup_log_view(self):
+        self.log_model = LogModel(max_lines=self.output_buffer_raw.max_lines, parent=self)
+        self.log_view = LogView(self.log_model, parent=self)
+        self.horizontalLayout.replaceWidget(self.txtConsole, self.log_view)
+        self.txtConsole.hide()
+
+    def setup_search_bar(self):
+        view = self.output_view()
+        self.horizontalLayout.removeWidget(view)
+        layout = QtWidgets.QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+        layout.addWidget(view)
+        layout.addWidget(self.search_bar)
+        self.horizontalLayout.insertLayout(0, layout)
+
+    def line_store(self) -> LineStore:
+        if self.log_model is not None:
+            return self.log_model.store
+        return self._document_lines
+
+    def output_view(self) -> QtWidgets.QAbstractScrollArea:
+        if self.log_view is not None:
+            return self.log_view
+        return self.txtConsole
+
     def load_icons(self):
         with importlib.resources.path("xappt_qt.resources.icons", "copy.svg") as copy_path:
             copy_icon = QtGui.QIcon()
@@ -67,12 +147,62 @@ class ConsoleWidget(QtWidgets.QWidget, Ui_Console):
         self.btnScrollDown.toggled.connect(self.on_scroll_toggled)
         self.btnTrash.clicked.connect(self.on_clear)
 
+        view = self.output_view()
+        view.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        view.customContextMenuRequested.connect(self.on_context_menu)
+
+        self.search_bar.search_changed.connect(self.on_search_changed)
+        self.search_bar.next_requested.connect(self.on_search_next)
+        self.search_bar.previous_requested.connect(self.on_search_previous)
+        self.search_bar.stream_filter_changed.connect(self.on_stream_filter_changed)
+
+        find_shortcut = QtWidgets.QShortcut(QtGui.QKeySequence.Find, self)
+        find_shortcut.setContext(QtCore.Qt.WidgetWithChildrenShortcut)
+        find_shortcut.activated.connect(self.focus_search)
+
+    def on_context_menu(self, pos: QtCore.QPoint):
+        view = self.output_view()
+        if self.log_view is not None:
+            menu = QtWidgets.QMenu(self)
+            copy_action = menu.addAction("Copy")
+            copy_action.setEnabled(self.log_view.selectionModel().hasSelection())
+            copy_action.triggered.connect(
+                lambda: QtWidgets.QApplication.clipboard().setText(self.log_view.selected_text()))
+            menu.addAction("Select All", self.log_view.selectAll)
+        else:
+            menu = self.txtConsole.createStandardContextMenu(pos)
+        menu.addSeparator()
+        save_action = menu.addAction("Save Log...")
+        save_action.setEnabled(len(self.output_buffer_raw) > 0 or self.session_log is not None)
+        save_action.triggered.connect(self.on_save_log)
+        if len(self.context_actions):
+            menu.addSeparator()
+            menu.addActions(self.context_actions)
+        menu.exec_(view.viewport().mapToGlobal(pos))
+        menu.deleteLater()
+
     def on_copy(self):
-        pyperclip.copy(os.linesep.join(self.output_buffer_raw))
+        QtWidgets.QApplication.clipboard().setText(self.output_buffer_raw.text(os.linesep))
+
+    def on_save_log(self):
+        file_name, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save Log", "",
+                                                             "Log files (*.log *.txt);;All files (*)")
+        if not len(file_name):
+            return
+        try:
+            if self.session_log is not None and not self.session_log.closed:
+                self.session_log.save(file_name)
+            else:
+                with open(file_name, "w", encoding="utf8") as fp:
+                    self.output_buffer_raw.save(fp)
+        except OSError as err:
+            QtWidgets.QMessageBox.critical(self, APP_TITLE, f"Could not save log:\n{err}")
 
     def on_wrap_toggled(self, state: bool):
         self.word_wrap = state
-        if self.word_wrap:
+        if self.log_view is not None:
+            self.log_view.set_word_wrap(state)
+        elif self.word_wrap:
             self.txtConsole.setLineWrapMode(QtWidgets.QTextEdit.WidgetWidth)
         else:
             self.txtConsole.setLineWrapMode(QtWidgets.QTextEdit.NoWrap)
@@ -82,7 +212,140 @@ class ConsoleWidget(QtWidgets.QWidget, Ui_Console):
 
     def on_clear(self):
         self.output_buffer_raw.clear()
-        self.txtConsole.clear()
+        self._pending_output.clear()
+        self._dropped_lines = 0
+        self._last_stream = None
+        self._document_has_lines = False
+        for parser in self._parsers.values():
+            parser.break_line()
+        if self.log_model is not None:
+            self.log_model.clear()
+        else:
+            self._document_lines.clear()
+            self.txtConsole.clear()
+        self.cancel_search()
+        self.search_bar.set_status("")
+
+    def focus_search(self):
+        self.search_bar.txtSearch.setFocus()
+        self.search_bar.txtSearch.selectAll()
+
+    def cancel_search(self):
+        if self._search_worker is not None:
+            self._search_worker.matches_found.disconnect()
+            self._search_worker.search_finished.disconnect()
+            self._search_worker.requestInterruption()
+            self._search_worker.wait()
+            self._search_worker = None
+        self._search_matches = []
+        self._search_match_index = -1
+
+    def on_search_changed(self):
+        self.cancel_search()
+        try:
+            pattern = self.search_bar.pattern()
+        except re.error as err:
+            self.search_bar.set_status("Invalid pattern")
+            self.search_bar.txtSearch.setToolTip(str(err))
+            return
+        self.search_bar.txtSearch.setToolTip("")
+        if pattern is None:
+            self.search_bar.set_status("")
+            return
+
+        self.flush()
+        worker = SearchWorker(self.line_store().snapshot(), pattern, self._visible_streams, parent=self)
+        worker.matches_found.connect(self._on_search_matches_found)
+        worker.search_finished.connect(self._on_search_finished)
+        worker.finished.connect(worker.deleteLater)
+        self._search_worker = worker
+        self.search_bar.set_status("Searching...")
+        worker.start(QtCore.QThread.LowPriority)
+
+    def _on_search_matches_found(self, line_ids: List[int]):
+        first_batch = not len(self._search_matches)
+        self._search_matches.extend(line_ids)
+        if first_batch:
+            self._search_match_index = 0
+            self._show_search_match()
+        else:
+            self._update_search_status(final=False)
+
+    def _on_search_finished(self, _: int):
+        self._search_worker = None
+        self._update_search_status(final=True)
+
+    def _update_search_status(self, final: bool = True):
+        count = len(self._search_matches)
+        if not count:
+            self.search_bar.set_status("No matches" if final else "Searching...")
+            return
+        suffix = "" if final else "+"
+        self.search_bar.set_status(f"{self._search_match_index + 1}/{count}{suffix}")
+
+    def _step_search(self, step: int):
+        count = len(self._search_matches)
+        if not count:
+            return
+        store = self.line_store()
+        for _ in range(count):
+            self._search_match_index = (self._search_match_index + step) % count
+            if store.line_index(self._search_matches[self._search_match_index]) >= 0:
+                break
+        self._show_search_match()
+
+    def on_search_next(self):
+        self._step_search(1)
+
+    def on_search_previous(self):
+        self._step_search(-1)
+
+    def _show_search_match(self):
+        self._update_search_status(final=self._search_worker is None)
+        line_id = self._search_matches[self._search_match_index]
+        row = self.line_store().line_index(line_id)
+        if row < 0:
+            return
+
+        # stop following new output, otherwise the next flush would scroll away from the match
+        self.btnScrollDown.setChecked(False)
+
+        if self.log_view is not None:
+            index = self.log_view.source_row_index(row)
+            if index.isValid():
+                self.log_view.setCurrentIndex(index)
+                self.log_view.scrollTo(index, QtWidgets.QAbstractItemView.PositionAtCenter)
+            return
+
+        block = self.txtConsole.document().findBlockByNumber(row)
+        if not block.isValid():
+            return
+        cursor = QtGui.QTextCursor(block)
+        cursor.movePosition(QtGui.QTextCursor.EndOfBlock, QtGui.QTextCursor.KeepAnchor)
+        self.txtConsole.setTextCursor(cursor)
+        self.txtConsole.ensureCursorVisible()
+
+    def on_stream_filter_changed(self):
+        streams = set()
+        if self.search_bar.show_stdout():
+            streams.add(self.STREAM_STDOUT)
+        if self.search_bar.show_stderr():
+            streams.add(self.STREAM_STDERR)
+        self._visible_streams = streams
+
+        if self.log_view is not None:
+            self.log_view.set_stream_filter(streams)
+        else:
+            document = self.txtConsole.document()
+            block = document.begin()
+            while block.isValid():
+                block.setVisible(block.userState() in streams)
+                block = block.next()
+            document.markContentsDirty(0, document.characterCount())
+            self.txtConsole.viewport().update()
+
+        if len(self.search_bar.txtSearch.text()):
+            self.on_search_changed()
 
     def write_stdout(self, s: str):
         self._write_output(s, self.STREAM_STDOUT)
@@ -91,36 +354,150 @@ class ConsoleWidget(QtWidgets.QWidget, Ui_Console):
         self._write_output(s, self.STREAM_STDERR)
 
     @staticmethod
-    def convert_leading_whitespace(s: str, tabwidth: int = 4) -> str:
-        leading_spaces = 0
-        while True:
-            if not len(s):
-                break
-            if s[0] == " ":
-                leading_spaces += 1
-            elif s[0] == "\t":
-                leading_spaces += tabwidth
-            else:
-                break
-            s = s[1:]
-        return f"{'&nbsp;' * leading_spaces}{s}"
+    def flush_interval() -> int:
+        """ The minimum number of milliseconds between two document updates. """
+        return max(1, int(1000 / max(1, config.console_refresh_rate)))
 
     def _write_output(self, s: str, stream: int):
-        s = self.convert_leading_whitespace(s)
-        color = config.console_color_stdout
-        if stream == self.STREAM_STDERR:
-            color = config.console_color_stderr
-        html = f'<span style="color: {color}; white-space: pre;">{s}</span>'
+        if self._last_stream is not None and self._last_stream != stream:
+            self._parsers[self._last_stream].break_line()
+        for line in self._parsers[stream].feed(s):
+            self._queue_line(line, stream)
+        if len(self._pending_output) and not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def _queue_line(self, line: ParsedLine, stream: int):
+        # a line can only be updated in place while nothing else was written after it
+        replaces_previous = line.replaces_previous and self._last_stream == stream
+        self._last_stream = stream
+
+        if replaces_previous:
+            self.output_buffer_raw.replace_last(line.text)
+        else:
+            self.output_buffer_raw.append(line.text)
+
+        if replaces_previous and len(self._pending_output):
+            # the previous version hasn't been drawn yet, so there's no need to draw it at all
+            previous, _ = self._pending_output[-1]
+            self._pending_output[-1] = (line._replace(replaces_previous=previous.replaces_previous), stream)
+            return
 
-        self.output_buffer_raw.append(s)
-        self.txtConsole.append(html)
+        if len(self._pending_output) == self._pending_output.maxlen:
+            self._dropped_lines += 1
+        self._pending_output.append((line._replace(replaces_previous=replaces_previous), stream))
 
+    def _char_format(self, style: TextStyle, stream: int) -> QtGui.QTextCharFormat:
+        key = (style, stream)
+        char_format = self._char_formats.get(key)
+        if char_format is None:
+            char_format = QtGui.QTextCharFormat()
+            if style.foreground is not None:
+                char_format.setForeground(QtGui.QColor(*style.foreground))
+            else:
+                brush = self._stream_brushes.get(stream)
+                if brush is not None:
+                    char_format.setForeground(brush)
+            if style.background is not None:
+                char_format.setBackground(QtGui.QColor(*style.background))
+            if style.bold:
+                char_format.setFontWeight(QtGui.QFont.Bold)
+            self._char_formats[key] = char_format
+        return char_format
+
+    def rendering_paused(self) -> bool:
+        window = self.window()
+        return not self.isVisible() or window.isMinimized()
+
+    def flush(self):
+        """ Draw all pending output with a single edit of the document. Nothing is drawn
+        while the console is hidden or its window is minimized; the output stays queued
+        until the console is shown again. """
+        if not len(self._pending_output):
+            return
+        if self.rendering_paused():
+            return
+
+        batch = list(self._pending_output)
+        self._pending_output.clear()
+        if self._dropped_lines:
+            first_line, first_stream = batch[0]
+            batch[0] = (first_line._replace(replaces_previous=False), first_stream)
+            message = f"... {self._dropped_lines} lines not displayed ..."
+            batch.insert(0, (ParsedLine([TextRun(message, DEFAULT_STYLE)], False, True), self.STREAM_STDERR))
+            self._dropped_lines = 0
+
+        if self.log_model is not None:
+            self._flush_log_model(batch)
+        else:
+            self._flush_document(batch)
+
+    def _flush_log_model(self, batch: List[Tuple[ParsedLine, int]]):
+        first_line, first_stream = batch[0]
+        if first_line.replaces_previous and self.log_model.rowCount():
+            self.log_model.replace_last_line(first_line.text, first_stream)
+            batch = batch[1:]
+        self.log_model.append_lines([(line.text, stream) for line, stream in batch])
         if self.auto_scroll:
-            self.txtConsole.moveCursor(QtGui.QTextCursor.End)
-            self.txtConsole.moveCursor(QtGui.QTextCursor.StartOfLine)
+            self.log_view.scrollToBottom()
+
+    def _flush_document(self, batch: List[Tuple[ParsedLine, int]]):
+        document = self.txtConsole.document()
+        cursor = QtGui.QTextCursor(document)
+        cursor.movePosition(QtGui.QTextCursor.End)
+        cursor.beginEditBlock()
+        lines = self._document_lines
+        for line, stream in batch:
+            if line.replaces_previous and self._document_has_lines:
+                cursor.movePosition(QtGui.QTextCursor.StartOfBlock, QtGui.QTextCursor.KeepAnchor)
+                cursor.removeSelectedText()
+                lines.replace_last(line.text, stream)
+            else:
+                if self._document_has_lines:
+                    cursor.insertBlock()
+                lines.append(line.text, stream)
+            self._document_has_lines = True
+            for run in line.runs:
+                cursor.insertText(run.text, self._char_format(run.style, stream))
+            block = cursor.block()
+            block.setUserState(stream)
+            block.setVisible(stream in self._visible_streams)
+        cursor.endEditBlock()
+        lines.trim()
+
+        if self.auto_scroll:
+            scroll_bar = self.txtConsole.verticalScrollBar()
+            scroll_bar.setValue(scroll_bar.maximum())
+            self.txtConsole.horizontalScrollBar().setValue(0)
+
+    def _resume_rendering(self):
+        if len(self._pending_output) and not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def showEvent(self, event: QtGui.QShowEvent):
+        super().showEvent(event)
+        window = self.window()
+        if window is not self and window is not self._watched_window:
+            window.installEventFilter(self)
+            self._watched_window = window
+        self._resume_rendering()
+
+    def hideEvent(self, event: QtGui.QHideEvent):
+        self.cancel_search()
+        super().hideEvent(event)
+
+    def eventFilter(self, watched: QtCore.QObject, event: QtCore.QEvent) -> bool:
+        if watched is self._watched_window:
+            if event.type() in (QtCore.QEvent.WindowStateChange, QtCore.QEvent.Show):
+                self._resume_rendering()
+        return super().eventFilter(watched, event)
 
     def ordered_widgets(self) -> Generator[QtWidgets.QWidget, None, None]:
-        yield self.txtConsole
+        yield self.output_view()
+        yield self.search_bar.txtSearch
+        yield self.search_bar.chkRegex
+        yield self.search_bar.chkMatchCase
+        yield self.search_bar.btnStdout
+        yield self.search_bar.btnStderr
         yield self.btnCopy
         yield self.btnWordWrap
         yield self.btnScrollDown
@@ -128,4 +505,4 @@ class ConsoleWidget(QtWidgets.QWidget, Ui_Console):
 
     def setFont(self, new_font: QtGui.QFont):
         super().setFont(new_font)
-        self.txtConsole.setFont(new_font)
+        self.output_view().setFont(new_font)
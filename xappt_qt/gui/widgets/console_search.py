@@ -0,0 +1,147 @@
+import re
+
+from typing import Collection, Optional, Pattern
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+from xappt_qt.utilities.line_store import LineStore
+
+
+class SearchWorker(QtCore.QThread):
+    """ Searches a snapshot of a `LineStore` and reports the ids of matching lines
+    in batches, so results show up while the search is still running. """
+    matches_found = QtCore.pyqtSignal(list)  # line ids
+    search_finished = QtCore.pyqtSignal(int)  # total number of matches
+
+    BATCH_SIZE = 4096
+
+    def __init__(self, store: LineStore, pattern: Pattern, streams: Collection[int],
+                 parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self.store = store
+        self.pattern = pattern
+        self.streams = frozenset(streams)
+
+    def run(self):
+        store = self.store
+        search = self.pattern.search
+        streams = self.streams
+        batch = []
+        total = 0
+        for i in range(len(store)):
+            if i % self.BATCH_SIZE == 0:
+                if self.isInterruptionRequested():
+                    return
+                if len(batch):
+                    self.matches_found.emit(batch)
+                    batch = []
+            if store.stream(i) not in streams:
+                continue
+            if search(store.line(i)) is not None:
+                batch.append(store.line_id(i))
+                total += 1
+        if len(batch):
+            self.matches_found.emit(batch)
+        self.search_finished.emit(total)
+
+
+class ConsoleSearchBar(QtWidgets.QWidget):
+    search_changed = QtCore.pyqtSignal()
+    next_requested = QtCore.pyqtSignal()
+    previous_requested = QtCore.pyqtSignal()
+    stream_filter_changed = QtCore.pyqtSignal()
+
+    SEARCH_DELAY = 250  # milliseconds
+
+    def __init__(self, parent: Optional[QtWidgets.QWidget] = None):
+        super().__init__(parent=parent)
+        self.setup_ui()
+
+        self._search_timer = QtCore.QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DELAY)
+        self._search_timer.timeout.connect(self.search_changed.emit)
+
+        self.connect_signals()
+
+    # noinspection PyAttributeOutsideInit
+    def setup_ui(self):
+        layout = QtWidgets.QHBoxLayout()
+        layout.setContentsMargins(0, 2, 0, 2)
+        layout.setSpacing(4)
+        self.setLayout(layout)
+
+        self.txtSearch = QtWidgets.QLineEdit()
+        self.txtSearch.setPlaceholderText("Search")
+        self.txtSearch.setClearButtonEnabled(True)
+        layout.addWidget(self.txtSearch)
+
+        self.chkRegex = QtWidgets.QCheckBox("Regex")
+        self.chkMatchCase = QtWidgets.QCheckBox("Match Case")
+        self.btnPrevious = QtWidgets.QToolButton()
+        self.btnPrevious.setArrowType(QtCore.Qt.UpArrow)
+        self.btnPrevious.setToolTip("Previous Match (Shift+Enter)")
+        self.btnNext = QtWidgets.QToolButton()
+        self.btnNext.setArrowType(QtCore.Qt.DownArrow)
+        self.btnNext.setToolTip("Next Match (Enter)")
+        self.lblStatus = QtWidgets.QLabel()
+        self.lblStatus.setMinimumWidth(self.lblStatus.fontMetrics().horizontalAdvance("000000/000000"))
+        self.btnStdout = QtWidgets.QToolButton()
+        self.btnStdout.setText("stdout")
+        self.btnStdout.setCheckable(True)
+        self.btnStdout.setChecked(True)
+        self.btnStdout.setToolTip("Show Standard Output")
+        self.btnStderr = QtWidgets.QToolButton()
+        self.btnStderr.setText("stderr")
+        self.btnStderr.setCheckable(True)
+        self.btnStderr.setChecked(True)
+        self.btnStderr.setToolTip("Show Standard Error")
+
+        for widget in (self.chkRegex, self.chkMatchCase, self.btnPrevious, self.btnNext, self.lblStatus,
+                       self.btnStdout, self.btnStderr):
+            layout.addWidget(widget)
+
+    def connect_signals(self):
+        self.txtSearch.textChanged.connect(lambda _: self._search_timer.start())
+        self.txtSearch.returnPressed.connect(self._on_return_pressed)
+        self.chkRegex.toggled.connect(lambda _: self._search_timer.start())
+        self.chkMatchCase.toggled.connect(lambda _: self._search_timer.start())
+        self.btnNext.clicked.connect(self.next_requested.emit)
+        self.btnPrevious.clicked.connect(self.previous_requested.emit)
+        self.btnStdout.toggled.connect(lambda _: self.stream_filter_changed.emit())
+        self.btnStderr.toggled.connect(lambda _: self.stream_filter_changed.emit())
+
+    def _on_return_pressed(self):
+        if self._search_timer.isActive():
+            self._search_timer.stop()
+            self.search_changed.emit()
+        if QtWidgets.QApplication.keyboardModifiers() & QtCore.Qt.ShiftModifier:
+            self.previous_requested.emit()
+        else:
+            self.next_requested.emit()
+
+    def keyPressEvent(self, event: QtGui.QKeyEvent):
+        if event.key() == QtCore.Qt.Key_Escape and len(self.txtSearch.text()):
+            self.txtSearch.clear()
+            return
+        super().keyPressEvent(event)
+
+    def pattern(self) -> Optional[Pattern]:
+        """ The compiled search pattern, `None` when there's nothing to search for.
+        Raises `re.error` for invalid regular expressions. """
+        text = self.txtSearch.text()
+        if not len(text):
+            return None
+        if not self.chkRegex.isChecked():
+            text = re.escape(text)
+        flags = 0 if self.chkMatchCase.isChecked() else re.IGNORECASE
+        return re.compile(text, flags)
+
+    def show_stdout(self) -> bool:
+        return self.btnStdout.isChecked()
+
+    def show_stderr(self) -> bool:
+        return self.btnStderr.isChecked()
+
+    def set_status(self, text: str):
+        self.lblStatus.setText(text)
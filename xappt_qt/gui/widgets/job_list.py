@@ -0,0 +1,192 @@
+from typing import Dict, Optional
+
+from PyQt5 import QtCore, QtWidgets
+
+from xappt_qt import config
+from xappt_qt.gui.utilities.job_queue import Job, JobQueue, JobState
+from xappt_qt.utilities.progress import format_duration
+
+
+class JobListWidget(QtWidgets.QWidget):
+    """ Lists the jobs of a `JobQueue` with their state, duration and exit code. """
+    load_parameters_requested = QtCore.pyqtSignal(object)  # Job
+
+    COLUMN_ID = 0
+    COLUMN_STATE = 1
+    COLUMN_PRIORITY = 2
+    COLUMN_PROGRESS = 3
+    COLUMN_DURATION = 4
+    COLUMN_EXIT_CODE = 5
+    COLUMN_PARAMETERS = 6
+    COLUMN_NAMES = ("#", "State", "Priority", "Progress", "Duration", "Exit Code", "Parameters")
+
+    STATE_NAMES = {
+        JobState.QUEUED: "Queued",
+        JobState.RUNNING: "Running",
+        JobState.SUCCESS: "Done",
+        JobState.ERROR: "Failed",
+        JobState.CANCELED: "Canceled",
+    }
+
+    def __init__(self, queue: JobQueue, parent: Optional[QtWidgets.QWidget] = None):
+        super().__init__(parent=parent)
+        self.queue = queue
+        self._items: Dict[int, QtWidgets.QTreeWidgetItem] = {}
+
+        self.setup_ui()
+
+        self.refresh_timer = QtCore.QTimer(self)
+        self.refresh_timer.setInterval(int(1000 / max(1, config.progress_refresh_rate)))
+        self.refresh_timer.timeout.connect(self.refresh_running)
+
+        self.connect_signals()
+
+    # noinspection PyAttributeOutsideInit
+    def setup_ui(self):
+        layout = QtWidgets.QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+
+        self.treeJobs = QtWidgets.QTreeWidget()
+        self.treeJobs.setRootIsDecorated(False)
+        self.treeJobs.setUniformRowHeights(True)
+        self.treeJobs.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.treeJobs.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.treeJobs.setHeaderLabels(self.COLUMN_NAMES)
+        layout.addWidget(self.treeJobs)
+
+        self.lblCounts = QtWidgets.QLabel()
+        layout.addWidget(self.lblCounts)
+
+        controls = QtWidgets.QHBoxLayout()
+        controls.addWidget(QtWidgets.QLabel("Concurrent Jobs"))
+        self.spinConcurrent = QtWidgets.QSpinBox()
+        self.spinConcurrent.setRange(1, 64)
+        self.spinConcurrent.setValue(self.queue.max_concurrent)
+        controls.addWidget(self.spinConcurrent)
+        controls.addStretch()
+        self.btnRetryFailed = QtWidgets.QPushButton("Retry Failed")
+        self.btnRetryFailed.setAutoDefault(False)
+        controls.addWidget(self.btnRetryFailed)
+        self.btnClearFinished = QtWidgets.QPushButton("Clear Finished")
+        self.btnClearFinished.setAutoDefault(False)
+        controls.addWidget(self.btnClearFinished)
+        layout.addLayout(controls)
+
+    def connect_signals(self):
+        self.queue.job_added.connect(self.on_job_added)
+        self.queue.job_changed.connect(self.update_job)
+        self.queue.job_removed.connect(self.on_job_removed)
+        self.spinConcurrent.valueChanged.connect(self.on_concurrent_changed)
+        self.btnClearFinished.clicked.connect(self.on_clear_finished)
+        self.btnRetryFailed.clicked.connect(self.on_retry_failed)
+        self.treeJobs.customContextMenuRequested.connect(self.on_context_menu)
+        self.treeJobs.itemDoubleClicked.connect(self.on_item_double_clicked)
+
+    def job_for_item(self, item: QtWidgets.QTreeWidgetItem) -> Optional[Job]:
+        return item.data(self.COLUMN_ID, QtCore.Qt.UserRole)
+
+    def selected_jobs(self):
+        return [self.job_for_item(item) for item in self.treeJobs.selectedItems()]
+
+    def on_job_added(self, job: Job):
+        item = QtWidgets.QTreeWidgetItem()
+        item.setData(self.COLUMN_ID, QtCore.Qt.UserRole, job)
+        item.setText(self.COLUMN_ID, str(job.id))
+        item.setText(self.COLUMN_PARAMETERS, job.summary())
+        item.setToolTip(self.COLUMN_PARAMETERS, "\n".join(f"{k}: {v}" for k, v in job.parameters.items()))
+        self.treeJobs.addTopLevelItem(item)
+        self._items[job.id] = item
+        self.update_job(job)
+        self.treeJobs.scrollToItem(item)
+
+    def on_job_removed(self, job: Job):
+        item = self._items.pop(job.id, None)
+        if item is not None:
+            self.treeJobs.takeTopLevelItem(self.treeJobs.indexOfTopLevelItem(item))
+        self.update_counts()
+
+    def update_job(self, job: Job):
+        item = self._items.get(job.id)
+        if item is None:
+            return
+        item.setText(self.COLUMN_STATE, self.STATE_NAMES[job.state])
+        item.setText(self.COLUMN_PRIORITY, str(job.priority))
+        item.setText(self.COLUMN_EXIT_CODE, "" if job.exit_code is None else str(job.exit_code))
+        self.update_job_timing(job, item)
+        self.update_counts()
+        if job.state == JobState.RUNNING:
+            self.refresh_timer.start()
+        elif not len(self.queue.running_jobs()):
+            self.refresh_timer.stop()
+
+    def update_job_timing(self, job: Job, item: QtWidgets.QTreeWidgetItem):
+        duration = job.duration()
+        item.setText(self.COLUMN_DURATION, "" if duration is None else format_duration(duration))
+        if job.state == JobState.RUNNING:
+            fraction, status_text = job.progress.display()
+            item.setText(self.COLUMN_PROGRESS, f"{fraction * 100.0:.0f}%")
+            item.setToolTip(self.COLUMN_PROGRESS, status_text)
+        elif job.state == JobState.SUCCESS:
+            item.setText(self.COLUMN_PROGRESS, "100%")
+
+    def update_counts(self):
+        counts = self.queue.state_counts()
+        text = ", ".join(f"{counts[state]} {self.STATE_NAMES[state].lower()}" for state in JobState if counts[state])
+        self.lblCounts.setText(text)
+        self.btnRetryFailed.setEnabled(counts[JobState.ERROR] > 0)
+
+    def refresh_running(self):
+        for job in self.queue.running_jobs():
+            item = self._items.get(job.id)
+            if item is not None:
+                self.update_job_timing(job, item)
+
+    def on_concurrent_changed(self, value: int):
+        self.queue.max_concurrent = value
+
+    def on_retry_failed(self):
+        for job in [job for job in self.queue.jobs if job.state == JobState.ERROR]:
+            self.queue.retry(job)
+
+    def on_clear_finished(self):
+        for job in [job for job in self.queue.jobs if job.finished]:
+            self.queue.remove(job)
+
+    def on_item_double_clicked(self, item: QtWidgets.QTreeWidgetItem, _: int):
+        self.load_parameters_requested.emit(self.job_for_item(item))
+
+    def on_context_menu(self, pos: QtCore.QPoint):
+        jobs = self.selected_jobs()
+        if not len(jobs):
+            return
+        menu = QtWidgets.QMenu(self)
+        load_action = menu.addAction("Load Parameters")
+        load_action.setEnabled(len(jobs) == 1)
+        menu.addSeparator()
+        raise_action = menu.addAction("Raise Priority")
+        lower_action = menu.addAction("Lower Priority")
+        menu.addSeparator()
+        retry_action = menu.addAction("Retry")
+        retry_action.setEnabled(any(job.state in (JobState.ERROR, JobState.CANCELED) for job in jobs))
+        cancel_action = menu.addAction("Cancel")
+        cancel_action.setEnabled(any(not job.finished for job in jobs))
+        remove_action = menu.addAction("Remove")
+        remove_action.setEnabled(any(job.finished for job in jobs))
+
+        action = menu.exec_(self.treeJobs.viewport().mapToGlobal(pos))
+        if action is None:
+            return
+        if action is load_action:
+            self.load_parameters_requested.emit(jobs[0])
+        for job in jobs:
+            if action is raise_action:
+                self.queue.set_priority(job, job.priority + 1)
+            elif action is lower_action:
+                self.queue.set_priority(job, job.priority - 1)
+            elif action is retry_action:
+                self.queue.retry(job)
+            elif action is cancel_action:
+                self.queue.cancel(job)
+            elif action is remove_action and job.finished:
+                self.queue.remove(job)
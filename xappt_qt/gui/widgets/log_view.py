@@ -0,0 +1,163 @@
+from typing import Any, Collection, Optional, Sequence, Tuple
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+from xappt_qt import config
+from xappt_qt.utilities.line_store import LineStore
+
+
+def color_brush(color_name: str) -> Optional[QtGui.QBrush]:
+    """ Convert a console color from `config` to a brush. Style sheet values such as
+    "palette(window-text)" can't be used outside of style sheets, so these return
+    `None` and the widget's palette is used instead. """
+    color = QtGui.QColor(color_name)
+    if not color.isValid():
+        return None
+    return QtGui.QBrush(color)
+
+
+class LogModel(QtCore.QAbstractListModel):
+    ROLE_STREAM = QtCore.Qt.UserRole + 1
+
+    STREAM_STDOUT = 0
+    STREAM_STDERR = 1
+
+    def __init__(self, max_lines: int = 0, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self.store = LineStore(max_lines)
+        self._stream_colors = {
+            self.STREAM_STDOUT: color_brush(config.console_color_stdout),
+            self.STREAM_STDERR: color_brush(config.console_color_stderr),
+        }
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.store)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == QtCore.Qt.DisplayRole:
+            return self.store.line(row)
+        elif role == QtCore.Qt.ForegroundRole:
+            return self._stream_colors.get(self.store.stream(row))
+        elif role == self.ROLE_STREAM:
+            return self.store.stream(row)
+        return None
+
+    def append_lines(self, lines: Sequence[Tuple[str, int]]):
+        if not len(lines):
+            return
+        first = len(self.store)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(lines) - 1)
+        for text, stream in lines:
+            self.store.append(text, stream)
+        self.endInsertRows()
+
+        excess = self.store.excess()
+        if excess:
+            self.beginRemoveRows(QtCore.QModelIndex(), 0, excess - 1)
+            self.store.remove_first(excess)
+            self.endRemoveRows()
+
+    def replace_last_line(self, text: str, stream: int):
+        row = len(self.store) - 1
+        if row < 0:
+            self.append_lines([(text, stream)])
+            return
+        self.store.replace_last(text, stream)
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def clear(self):
+        self.beginResetModel()
+        self.store.clear()
+        self.endResetModel()
+
+
+class LogFilterProxyModel(QtCore.QSortFilterProxyModel):
+    """ Only accepts lines from the given streams. """
+
+    def __init__(self, streams: Collection[int], parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self.streams = frozenset(streams)
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QtCore.QModelIndex) -> bool:
+        return self.sourceModel().store.stream(source_row) in self.streams
+
+
+class LogItemDelegate(QtWidgets.QStyledItemDelegate):
+    """ Every row in a `LogView` has the same height, and its width is that of the
+    longest line that was ever added, so that the view can scroll horizontally. """
+
+    def sizeHint(self, option: QtWidgets.QStyleOptionViewItem, index: QtCore.QModelIndex) -> QtCore.QSize:
+        view = self.parent()
+        if isinstance(view, QtWidgets.QListView) and view.wordWrap():
+            return super().sizeHint(option, index)
+        metrics = option.fontMetrics
+        model = index.model()
+        if isinstance(model, QtCore.QSortFilterProxyModel):
+            model = model.sourceModel()
+        max_length = model.store.max_length if isinstance(model, LogModel) else 0
+        width = metrics.horizontalAdvance("M") * (max_length + 1)
+        return QtCore.QSize(width, metrics.height())
+
+
+class LogView(QtWidgets.QListView):
+    """ A read-only console view that only lays out the rows that are visible. """
+
+    def __init__(self, model: LogModel, parent: Optional[QtWidgets.QWidget] = None):
+        super().__init__(parent)
+        self.log_model = model
+        self.setModel(model)
+        self.setItemDelegate(LogItemDelegate(self))
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.setHorizontalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+        self.setTextElideMode(QtCore.Qt.ElideNone)
+        self.setWordWrap(False)
+
+    def set_word_wrap(self, state: bool):
+        # wrapped rows have different heights, which means every row has to be measured
+        self.setUniformItemSizes(not state)
+        self.setWordWrap(state)
+        self.scheduleDelayedItemsLayout()
+
+    def set_stream_filter(self, streams: Collection[int]):
+        """ Only show lines from `streams`. The proxy model is only used while some
+        streams are hidden, so unfiltered output doesn't pay for it. """
+        current_model = self.model()
+        selection_model = self.selectionModel()
+        if set(streams) >= {LogModel.STREAM_STDOUT, LogModel.STREAM_STDERR}:
+            if current_model is not self.log_model:
+                self.setModel(self.log_model)
+                current_model.deleteLater()
+                selection_model.deleteLater()
+            return
+        proxy = LogFilterProxyModel(streams, self)
+        proxy.setSourceModel(self.log_model)
+        self.setModel(proxy)
+        selection_model.deleteLater()
+        if current_model is not self.log_model:
+            current_model.deleteLater()
+
+    def source_row_index(self, source_row: int) -> QtCore.QModelIndex:
+        """ The view index of a row in `log_model`, invalid if the row is filtered out. """
+        index = self.log_model.index(source_row)
+        model = self.model()
+        if isinstance(model, QtCore.QSortFilterProxyModel):
+            return model.mapFromSource(index)
+        return index
+
+    def selected_text(self) -> str:
+        indexes = sorted(self.selectedIndexes(), key=lambda i: i.row())
+        return "\n".join(index.data() for index in indexes)
+
+    def keyPressEvent(self, event: QtGui.QKeyEvent):
+        if event.matches(QtGui.QKeySequence.Copy):
+            QtWidgets.QApplication.clipboard().setText(self.selected_text())
+            return
+        super().keyPressEvent(event)
@@ -1,6 +1,19 @@
-from xappt_qt.gui.widgets.tool_page.converters.base import ParameterWidgetBase
-from xappt_qt.gui.widgets.tool_page.converters.convert_bool import ParameterWidgetBool
-from xappt_qt.gui.widgets.tool_page.converters.convert_float import ParameterWidgetFloat
-from xappt_qt.gui.widgets.tool_page.converters.convert_int import ParameterWidgetInt
-from xappt_qt.gui.widgets.tool_page.converters.convert_list import ParameterWidgetList
-from xappt_qt.gui.widgets.tool_page.converters.convert_str import ParameterWidgetStr
+import importlib
+
+# converters are imported on first use, a tool only loads the widgets its parameters need
+CONVERTER_MODULES = {
+    'ParameterWidgetBase': "base",
+    'ParameterWidgetBool': "convert_bool",
+    'ParameterWidgetFloat': "convert_float",
+    'ParameterWidgetInt': "convert_int",
+    'ParameterWidgetList': "convert_list",
+    'ParameterWidgetStr': "convert_str",
+}
+
+
+def __getattr__(name: str):
+    module_name = CONVERTER_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{module_name}", __name__)
+    return getattr(module, name)
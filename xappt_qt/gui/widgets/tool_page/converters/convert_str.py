@@ -1,5 +1,3 @@
-import webbrowser
-
 from PyQt5 import QtWidgets, QtCore
 
 import xappt
@@ -88,4 +86,5 @@ class ParameterWidgetStr(ParameterWidgetBase):
 
     @staticmethod
     def link_activated(url: str):
+        import webbrowser
         webbrowser.open(url)
@@ -4,21 +4,24 @@ from PyQt5 import QtWidgets, QtCore
 
 import xappt
 
-from xappt_qt.gui.widgets.tool_page.converters import *
+from xappt_qt.gui.widgets.tool_page import converters
+from xappt_qt.gui.widgets.tool_page.converters.base import ParameterWidgetBase
 from xappt_qt.gui.widgets.error_label import ErrorLabel
 
+CONVERTER_NAMES = {
+    int: "ParameterWidgetInt",
+    bool: "ParameterWidgetBool",
+    float: "ParameterWidgetFloat",
+    str: "ParameterWidgetStr",
+    list: "ParameterWidgetList",
+}
+
 
 class ToolPage(QtWidgets.QWidget):
     def __init__(self, tool: xappt.BaseTool, parent: Optional[QtWidgets.QWidget] = None):
         super().__init__(parent=parent)
 
-        self.convert_dispatch: Dict[Type, Callable] = {
-            int: ParameterWidgetInt,
-            bool: ParameterWidgetBool,
-            float: ParameterWidgetFloat,
-            str: ParameterWidgetStr,
-            list: ParameterWidgetList,
-        }
+        self.convert_dispatch: Dict[Type, Callable] = {}
 
         self.vertical_expand = False
 
@@ -38,7 +41,10 @@ class ToolPage(QtWidgets.QWidget):
         self._load_tool_parameters()
 
     def _convert_parameter(self, param: xappt.Parameter) -> QtWidgets.QWidget:
-        widget_class = self.convert_dispatch[param.data_type]
+        widget_class = self.convert_dispatch.get(param.data_type)
+        if widget_class is None:
+            widget_class = getattr(converters, CONVERTER_NAMES[param.data_type])
+            self.convert_dispatch[param.data_type] = widget_class
         widget_instance: ParameterWidgetBase = widget_class(parameter=param, parent=self)
         widget_instance.onValueChanged.connect(self.on_widget_value_changed)
         return widget_instance
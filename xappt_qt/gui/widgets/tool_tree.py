@@ -0,0 +1,190 @@
+import array
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from PyQt5 import QtCore, QtGui
+
+from xappt_qt.gui.delegates import ToolItemDelegate
+from xappt_qt.utilities.plugin_manifest import ToolManifestEntry
+
+COLLECTION_ICON_SIZE = QtCore.QSize(24, 24)
+
+
+class ToolIndex:
+    """ The tools of the browser in one flat list, sorted by collection and name. Each
+    collection is a contiguous range of that list, so the tree is a view over arrays
+    rather than an object per item. """
+
+    def __init__(self, entries: Sequence[ToolManifestEntry] = ()):
+        self.entries: List[ToolManifestEntry] = sorted(entries, key=lambda e: (e.collection.lower(), e.name.lower()))
+        self.search_text: List[str] = [entry.search_text.lower() for entry in self.entries]
+        self.collections: List[str] = []
+        self.collection_start = array.array("i")
+        self.collection_end = array.array("i")
+        self.entry_collection = array.array("i")  # the collection row of each entry
+        for row, entry in enumerate(self.entries):
+            if not len(self.collections) or self.collections[-1] != entry.collection:
+                self.collections.append(entry.collection)
+                self.collection_start.append(row)
+                self.collection_end.append(row)
+            self.collection_end[-1] = row + 1
+            self.entry_collection.append(len(self.collections) - 1)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def tool_count(self, collection_row: int) -> int:
+        return self.collection_end[collection_row] - self.collection_start[collection_row]
+
+    def entry_row(self, collection_row: int, row: int) -> int:
+        return self.collection_start[collection_row] + row
+
+
+class ToolTreeModel(QtCore.QAbstractItemModel):
+    """ Collections at the top level, with their tools as children. Tool indexes carry
+    the row of their collection plus one as their internal id, collections carry 0.
+    Icons are only created once a view asks for them. """
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self.tool_index = ToolIndex()
+        self.icon_size = COLLECTION_ICON_SIZE
+        self._icons: Dict[str, QtGui.QIcon] = {}
+
+    def set_entries(self, entries: Sequence[ToolManifestEntry]):
+        self.beginResetModel()
+        self.tool_index = ToolIndex(entries)
+        self._icons.clear()
+        self.endResetModel()
+
+    def set_icon_size(self, size: QtCore.QSize):
+        """ Tools are drawn with `size`, which changes the height of every tool row. """
+        if size == self.icon_size:
+            return
+        self.layoutAboutToBeChanged.emit()
+        self.icon_size = size
+        self.layoutChanged.emit()
+
+    def index(self, row: int, column: int, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> QtCore.QModelIndex:
+        # called for every row whenever the proxy maps the tree, keep it short
+        if parent.isValid():
+            collection_row = parent.row()
+            if column == 0 and parent.internalId() == 0 and 0 <= row < self.tool_index.tool_count(collection_row):
+                return self.createIndex(row, 0, collection_row + 1)
+        elif column == 0 and 0 <= row < len(self.tool_index.collections):
+            return self.createIndex(row, 0, 0)
+        return QtCore.QModelIndex()
+
+    def parent(self, index: QtCore.QModelIndex = QtCore.QModelIndex()) -> QtCore.QModelIndex:
+        if not index.isValid() or index.internalId() == 0:
+            return QtCore.QModelIndex()
+        return self.createIndex(index.internalId() - 1, 0, 0)
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        if not parent.isValid():
+            return len(self.tool_index.collections)
+        if parent.internalId() == 0:
+            return self.tool_index.tool_count(parent.row())
+        return 0
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 1
+
+    def flags(self, index: QtCore.QModelIndex) -> QtCore.Qt.ItemFlags:
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+
+    def entry_row(self, index: QtCore.QModelIndex) -> Optional[int]:
+        """ The row of a tool index in the flat `tool_index`, None for collections. """
+        if not index.isValid() or index.internalId() == 0:
+            return None
+        return self.tool_index.entry_row(index.internalId() - 1, index.row())
+
+    def entry(self, index: QtCore.QModelIndex) -> Optional[ToolManifestEntry]:
+        row = self.entry_row(index)
+        return None if row is None else self.tool_index.entries[row]
+
+    def icon(self, path: str) -> QtGui.QIcon:
+        icon = self._icons.get(path)
+        if icon is None:
+            icon = self._icons[path] = QtGui.QIcon(path)
+        return icon
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        entry = self.entry(index)
+        if entry is None:
+            if role == QtCore.Qt.DisplayRole:
+                return self.tool_index.collections[index.row()]
+            elif role == ToolItemDelegate.ROLE_ITEM_TYPE:
+                return ToolItemDelegate.ITEM_TYPE_COLLECTION
+            elif role == ToolItemDelegate.ROLE_ICON_SIZE:
+                return COLLECTION_ICON_SIZE
+            return None
+        if role == QtCore.Qt.DisplayRole:
+            return entry.name
+        elif role == QtCore.Qt.ToolTipRole:
+            return entry.tooltip
+        elif role == QtCore.Qt.DecorationRole:
+            return self.icon(entry.icon)
+        elif role == ToolItemDelegate.ROLE_TOOL_CLASS:
+            return entry
+        elif role == ToolItemDelegate.ROLE_ITEM_TYPE:
+            return ToolItemDelegate.ITEM_TYPE_TOOL
+        elif role == ToolItemDelegate.ROLE_ITEM_SEARCH_TEXT:
+            return self.tool_index.search_text[self.entry_row(index)]
+        elif role == ToolItemDelegate.ROLE_ICON_SIZE:
+            return self.icon_size
+        return None
+
+
+class ToolFilterProxyModel(QtCore.QSortFilterProxyModel):
+    """ Only accepts the tools that have a search score, best first, and the collections
+    that still have tools, ordered by their best tool. Without scores every tool is
+    accepted in the order of the source model. """
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self.scores: Optional[Dict[int, float]] = None
+        self.collection_scores: Dict[int, float] = {}
+        self.setRecursiveFilteringEnabled(True)
+
+    def set_scores(self, scores: Optional[Dict[int, float]]):
+        """ Filter and rank by `scores`, by row in the source model's `tool_index`. The
+        proxy is reset rather than invalidated, which would remove and insert rows one
+        range at a time, with a layout of the view for each. """
+        model: ToolTreeModel = self.sourceModel()
+        self.beginResetModel()
+        self.scores = scores
+        self.collection_scores.clear()
+        for row, score in (scores or {}).items():
+            collection_row = model.tool_index.entry_collection[row]
+            if score > self.collection_scores.get(collection_row, 0.0):
+                self.collection_scores[collection_row] = score
+        self.endResetModel()
+        self.sort(-1 if scores is None else 0)
+
+    def entry_score(self, source_row: int, source_parent: QtCore.QModelIndex) -> float:
+        if not source_parent.isValid():
+            return self.collection_scores.get(source_row, 0.0)
+        model: ToolTreeModel = self.sourceModel()
+        return self.scores.get(model.tool_index.entry_row(source_parent.row(), source_row), 0.0)
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QtCore.QModelIndex) -> bool:
+        if self.scores is None:
+            return True
+        if not source_parent.isValid():
+            return False  # collections are accepted for their tools
+        model: ToolTreeModel = self.sourceModel()
+        return model.tool_index.entry_row(source_parent.row(), source_row) in self.scores
+
+    def lessThan(self, left: QtCore.QModelIndex, right: QtCore.QModelIndex) -> bool:
+        if self.scores is None:
+            return left.row() < right.row()
+        left_score = self.entry_score(left.row(), left.parent())
+        right_score = self.entry_score(right.row(), right.parent())
+        if left_score != right_score:
+            return left_score > right_score
+        return left.row() < right.row()
@@ -0,0 +1,140 @@
+""" A process that has already imported everything a tool launch needs, and forks a
+new tool process for each launch request.
+
+Starting a tool from scratch pays for the interpreter, PyQt5, plugin discovery and
+the tool modules every time. This process pays for them once; a forked child only
+has to create its `QApplication` and the tool window. Requests arrive over a Unix
+socket as one JSON line, `{"args": [tool name, ...], "cwd": ..., "env": {...}}`, where
+`env` replaces the environment of the child when it isn't null, and are answered
+with `{"pid": ...}` once the child was forked.
+
+Only available where `os.fork` is. Nothing here may start a thread or create a
+`QApplication`, neither survives a fork. """
+
+import json
+import os
+import signal
+import socket
+import sys
+import traceback
+
+from typing import Dict, List, Optional
+
+ACCEPT_TIMEOUT = 1.0  # seconds between checks that the browser is still alive
+REQUEST_TIMEOUT = 5.0
+
+
+def preload():
+    """ Import what every launch would otherwise import on its own. """
+    import xappt  # noqa, discovers and imports the plugins
+    from xappt_qt import launcher  # noqa
+    from xappt_qt.utilities.display import gui_available
+    if not gui_available():
+        return
+    import markdown  # noqa
+    import xappt_qt.plugins.interfaces.qt  # noqa
+    import xappt_qt.gui.widgets as widgets
+    from xappt_qt.gui.widgets.tool_page import converters
+    for name in widgets.WIDGET_MODULES.keys():
+        getattr(widgets, name)
+    for name in converters.CONVERTER_MODULES.keys():
+        getattr(converters, name)
+
+
+def stop(*_):
+    raise SystemExit(0)
+
+
+def read_request(connection: socket.socket) -> dict:
+    connection.settimeout(REQUEST_TIMEOUT)
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = connection.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+    return json.loads(data.decode("utf8"))
+
+
+def run_child(args: List[str], cwd: Optional[str], environment: Optional[Dict[str, str]]) -> int:
+    """ Runs in the forked child: launch the tool like `xappt_qt.launcher` would. """
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)  # the tool waits for its own subprocesses
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    try:
+        if cwd is not None:
+            os.chdir(cwd)
+        if environment is not None:
+            os.environ.clear()
+            os.environ.update(environment)
+        sys.argv = [sys.argv[0], *args]
+        from xappt_qt import launcher
+        result = launcher.main(args)
+    except SystemExit as err:
+        result = err.code if isinstance(err.code, int) else 1
+    except BaseException:  # noqa
+        traceback.print_exc()
+        result = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    return result if isinstance(result, int) else 1
+
+
+def serve(socket_path: str) -> int:
+    preload()
+    parent_pid = os.getppid()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        os.unlink(socket_path)
+    except FileNotFoundError:
+        pass
+    server.bind(socket_path)
+    os.chmod(socket_path, 0o600)
+    server.listen(16)
+    server.settimeout(ACCEPT_TIMEOUT)
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)  # forked tools are reaped automatically
+    signal.signal(signal.SIGTERM, stop)  # clean up the socket when the browser stops us
+
+    try:
+        while os.getppid() == parent_pid:
+            try:
+                connection, _ = server.accept()
+            except socket.timeout:
+                continue
+            with connection:
+                try:
+                    request = read_request(connection)
+                    args = [str(arg) for arg in request['args']]
+                    environment = request.get('env')
+                    if environment is not None:
+                        environment = {str(name): str(value) for name, value in environment.items()}
+                except (OSError, ValueError, KeyError, TypeError, AttributeError) as err:
+                    connection.sendall(json.dumps({'error': f"invalid request: {err}"}).encode("utf8") + b"\n")
+                    continue
+                pid = os.fork()
+                if pid == 0:
+                    server.close()
+                    connection.close()
+                    os._exit(run_child(args, request.get('cwd'), environment))
+                try:
+                    connection.sendall(json.dumps({'pid': pid}).encode("utf8") + b"\n")
+                except OSError:
+                    pass
+    finally:
+        server.close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+    return 0
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) != 1:
+        print("usage: launch_server SOCKET_PATH", file=sys.stderr)
+        return 2
+    return serve(argv[0])
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
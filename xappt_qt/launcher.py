@@ -8,6 +8,8 @@ import xappt
 from xappt.config import log as logger
 
 from xappt_qt.constants import *
+from xappt_qt.utilities.display import display_available
+from xappt_qt.utilities.tool_attributes import is_headless
 
 
 def parse_unknowns_args(args: list[str], default_bool=True):
@@ -31,27 +33,56 @@ def parse_unknowns_args(args: list[str], default_bool=True):
     return kwarg_dict
 
 
-def launch(tool_name: str, unknown_args: list[str]):
+def create_interface(tool_class: type[xappt.BaseTool], *, no_gui: bool = False,
+                     assume_yes: bool = False) -> xappt.BaseInterface:
+    """ The terminal interface if the GUI was turned off, or for headless tools when
+    there's no display. Headless tools otherwise only get a progress dialog. """
+    if no_gui or (is_headless(tool_class) and not display_available()):
+        from xappt_qt.plugins.interfaces.terminal import TerminalInterface
+        return TerminalInterface(assume_yes=assume_yes)
+    if is_headless(tool_class):
+        from xappt_qt.plugins.interfaces.headless import HeadlessInterface
+        return HeadlessInterface()
+    import xappt_qt.plugins.interfaces.qt  # noqa, registers the interface if it was skipped at startup
+    return xappt.get_interface()
+
+
+def launch(tool_name: str, unknown_args: list[str], *, no_gui: bool = False, assume_yes: bool = False):
     tool_class = xappt.get_tool_plugin(tool_name)
     if tool_class is None:
         raise SystemExit(f"Tool {tool_name} not found.")
 
-    interface = xappt.get_interface()
+    interface = create_interface(tool_class, no_gui=no_gui, assume_yes=assume_yes)
     interface.tool_data = parse_unknowns_args(unknown_args)
     interface.add_tool(tool_class)
 
     return interface.run()
 
 
-def main(argv) -> int:
-    os.environ[xappt.INTERFACE_ENV] = APP_INTERFACE_NAME
-
+def argument_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser()
     parser.add_argument('toolname', help='Specify the name of the tool to load')
+    parser.add_argument('--no-gui', action='store_true',
+                        help='Run the tool in the terminal, without loading Qt')
+    parser.add_argument('-y', '--yes', action='store_true',
+                        help='Answer yes to every question the tool asks when running in the terminal')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile the tool, and print the slowest functions when it finishes')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='Report the memory the tool used and the allocations it left behind')
+    return parser
+
+
+def main(argv) -> int:
+    os.environ[xappt.INTERFACE_ENV] = APP_INTERFACE_NAME
 
-    options, unknowns = parser.parse_known_args(args=argv)
+    options, unknowns = argument_parser().parse_known_args(args=argv)
+    if options.profile:
+        os.environ[APP_PROFILE_ENV] = "1"
+    if options.profile_memory:
+        os.environ[APP_MEMORY_PROFILE_ENV] = "1"
 
-    return launch(options.toolname, unknowns)
+    return launch(options.toolname, unknowns, no_gui=options.no_gui, assume_yes=options.yes)
 
 
 def entry_point() -> int:
@@ -2,12 +2,13 @@ import argparse
 import os
 import sys
 
+from typing import List, Optional
+
 import xappt
 import xappt_qt
-import xappt_qt.browser
-import xappt_qt.launcher
 
-from xappt_qt.constants import APP_INTERFACE_NAME
+from xappt_qt.constants import APP_INTERFACE_NAME, APP_MEMORY_PROFILE_ENV, APP_PROFILE_ENV
+from xappt_qt.utilities.display import gui_available
 
 
 if getattr(xappt_qt, "__compiled__", None) is not None:
@@ -16,6 +17,26 @@ elif getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
     xappt_qt.executable = os.path.abspath(sys.executable)
 
 
+def forward_to_browser(options: argparse.Namespace, unknowns: List[str]) -> Optional[int]:
+    """ Let a running browser launch the tool, in this process' environment. Returns the
+    exit code, or None if no browser took the request: none is running, or it can't see
+    the tools this process can. """
+    from xappt_qt import config
+    if not config.forward_launches_to_browser or not gui_available():
+        return None
+    from xappt_qt.gui.utilities.instance_server import forward_request
+    args = [options.toolname]
+    args += [flag for flag, enabled in (("--yes", options.yes), ("--profile", options.profile),
+                                        ("--profile-memory", options.profile_memory)) if enabled]
+    reply = forward_request(args + unknowns, os.getcwd(), dict(os.environ))
+    if reply is None or 'declined' in reply:
+        return None
+    if 'error' in reply:
+        print(reply['error'], file=sys.stderr)
+        return 1
+    return 0
+
+
 def main() -> int:
     os.environ[xappt.INTERFACE_ENV] = APP_INTERFACE_NAME
 
@@ -23,16 +44,47 @@ def main() -> int:
     parser.add_argument('toolname', type=str, help='Specify the name of the tool to load', nargs='?')
     parser.add_argument('-v', '--version', action='store_true',
                         help='Display the version number and build')
+    parser.add_argument('--no-gui', action='store_true',
+                        help='Run the tool in the terminal, without loading Qt')
+    parser.add_argument('-y', '--yes', action='store_true',
+                        help='Answer yes to every question the tool asks when running in the terminal')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile the tool, and print the slowest functions when it finishes')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='Report the memory the tool used and the allocations it left behind')
+    parser.add_argument('--tool-host', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--launch-server', type=str, metavar='SOCKET', help=argparse.SUPPRESS)
 
     options, unknowns = parser.parse_known_args()
 
+    # each mode only imports what it needs
+    if options.tool_host:
+        from xappt_qt import tool_host
+        return tool_host.main()
+    if options.launch_server is not None:
+        from xappt_qt import launch_server
+        return launch_server.main([options.launch_server])
+
+    if options.profile:
+        os.environ[APP_PROFILE_ENV] = "1"
+    if options.profile_memory:
+        os.environ[APP_MEMORY_PROFILE_ENV] = "1"
+
     if options.version:
         print(f"xappt_qt {xappt_qt.version_str}")
 
     if options.toolname is None:
-        return xappt_qt.browser.main(sys.argv)
+        if options.no_gui:
+            parser.error("a tool name is required with --no-gui")
+        from xappt_qt import browser
+        return browser.main(sys.argv)
     else:
-        return xappt_qt.launcher.launch(options.toolname, unknown_args=unknowns)
+        result = forward_to_browser(options, unknowns)
+        if result is not None:
+            return result
+        from xappt_qt import launcher
+        return launcher.launch(options.toolname, unknown_args=unknowns, no_gui=options.no_gui,
+                               assume_yes=options.yes)
 
 
 if __name__ == '__main__':
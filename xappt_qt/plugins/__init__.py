@@ -1,3 +1,3 @@
-import xappt_qt.plugins.interfaces.qt
+import xappt_qt.plugins.interfaces
 
 from xappt_qt.plugins.tools import *
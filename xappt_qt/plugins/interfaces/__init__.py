@@ -0,0 +1,6 @@
+import xappt_qt.plugins.interfaces.terminal
+
+from xappt_qt.utilities.display import gui_available
+
+if gui_available():
+    import xappt_qt.plugins.interfaces.qt
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import codecs
+import os
+import shlex
+
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Sequence, Set, Union
+
+if TYPE_CHECKING:
+    import asyncio
+
+from xappt_qt.utilities.terminal import split_output
+
+
+def run_awaitable(awaitable: Awaitable) -> Any:
+    """ Run `awaitable` to completion on a new event loop, for threads and processes
+    that have no Qt event loop to step one. """
+    import asyncio  # imported when a tool needs it, asyncio is slow to import
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(awaitable)
+    finally:
+        loop.close()
+
+
+class AsyncInterfaceMixin:
+    """ asyncio variants of interface methods that would otherwise block, for tools with
+    an `async def execute`. Must be mixed into a `xappt.BaseInterface`. """
+
+    STREAM_CHUNK_SIZE = 65536
+
+    @property
+    def async_processes(self) -> Set[asyncio.subprocess.Process]:
+        processes = getattr(self, "_async_processes", None)
+        if processes is None:
+            processes = self._async_processes = set()
+        return processes
+
+    async def run_subprocess_async(self, command: Union[str, Sequence[str]], **kwargs) -> int:
+        """ Like `run_subprocess`, but other coroutines keep running while the command runs,
+        so several commands can run at the same time. """
+        import asyncio
+        command_runner = self.command_runner  # noqa
+        subprocess_args = {
+            'cwd': str(kwargs.get('cwd') or command_runner.cwd),
+            'env': kwargs.get('env', command_runner.env),
+            'stdout': asyncio.subprocess.PIPE,
+            'stderr': asyncio.subprocess.PIPE,
+            'stdin': asyncio.subprocess.DEVNULL,
+        }
+        if kwargs.get('shell', False):
+            if not isinstance(command, str):
+                command = " ".join(command)
+            process = await asyncio.create_subprocess_shell(command, **subprocess_args)
+        else:
+            if isinstance(command, str):
+                command = shlex.split(command, posix=os.name != "nt")
+            process = await asyncio.create_subprocess_exec(*command, **subprocess_args)
+
+        self.async_processes.add(process)
+        try:
+            await asyncio.gather(self._forward_stream(process.stdout, self.write_stdout),  # noqa
+                                 self._forward_stream(process.stderr, self.write_stderr))  # noqa
+            return await process.wait()
+        finally:
+            self.async_processes.discard(process)
+
+    async def _forward_stream(self, stream: asyncio.StreamReader, write_fn: Callable[[str], None]):
+        decoder = codecs.getincrementaldecoder("utf8")(errors="replace")
+        pending = ""
+        while True:
+            data = await stream.read(self.STREAM_CHUNK_SIZE)
+            if not data:
+                break
+            complete, pending = split_output(pending + decoder.decode(data))
+            if len(complete):
+                write_fn(complete)
+        pending += decoder.decode(b"", final=True)
+        if len(pending):
+            write_fn(pending)
+
+    def kill_async_subprocesses(self):
+        for process in tuple(self.async_processes):
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+
+    async def progress_update_async(self, message: str, percent_complete: float):
+        """ Update progress, then give other coroutines (and the display) a chance to run. """
+        import asyncio
+        self.progress_update(message, percent_complete)  # noqa
+        await asyncio.sleep(0)
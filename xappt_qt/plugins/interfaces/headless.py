@@ -1,4 +1,6 @@
 import importlib.resources
+import inspect
+import math
 import sys
 
 from typing import Optional
@@ -7,17 +9,28 @@ from PyQt5 import QtWidgets, QtCore
 
 import xappt
 
+from xappt_qt import config
 from xappt_qt.constants import *
 from xappt_qt.gui.application import get_application
+from xappt_qt.gui.utilities.async_runner import AsyncRunner
+from xappt_qt.plugins.interfaces.async_support import AsyncInterfaceMixin
+from xappt_qt.utilities.progress import ProgressTracker
+from xappt_qt.utilities.result_cache import cached_run
+from xappt_qt.utilities.run_history import RunRecorder
 
 
-class HeadlessInterface(xappt.BaseInterface):
+class HeadlessInterface(AsyncInterfaceMixin, xappt.BaseInterface):
     def __init__(self):
         super().__init__()
         self.app = get_application()
 
         self.progress_dialog = QtWidgets.QProgressDialog()
 
+        self.progress = ProgressTracker(config.progress_refresh_rate)
+        self.progress_timer = QtCore.QTimer()
+        self.progress_timer.setSingleShot(True)
+        self.progress_timer.timeout.connect(self.repaint_progress)
+
     def setup_progress_dialog(self):
         self.progress_dialog.setMinimumWidth(600)
 
@@ -29,7 +42,43 @@ class HeadlessInterface(xappt.BaseInterface):
 
     def invoke(self, plugin: xappt.BaseTool, **kwargs) -> int:
         self.progress_dialog.setWindowTitle(f"{plugin.name()} - {APP_TITLE}")
-        return plugin.execute(**kwargs)
+        recorder = RunRecorder(plugin, "headless")
+        try:
+            plugin.validate()
+        except xappt.ParameterValidationError as err:
+            self.error(str(err))
+            recorder.finish(2)
+            return 2
+        recorder.validated()
+        cached = cached_run(plugin, self.tool_data)
+        if cached is not None:
+            exit_code = cached.restore()
+            if exit_code is not None:
+                return exit_code  # a restored result says nothing about how long the tool takes
+        result = 1
+        try:
+            result = plugin.execute(**kwargs)
+            if inspect.isawaitable(result):
+                result = self.run_async(result)
+            recorder.executed()
+        finally:
+            recorder.finish(result)
+        if cached is not None:
+            cached.store(result)
+        return result
+
+    def run_async(self, awaitable) -> int:
+        """ Run a coroutine while the Qt event loop keeps the progress dialog responsive. """
+        runner = AsyncRunner()
+        event_loop = QtCore.QEventLoop()
+        runner.execution_finished.connect(lambda _: event_loop.quit())
+        runner.start(awaitable)
+        if runner.running:
+            event_loop.exec()
+        try:
+            return runner.result()
+        finally:
+            runner.close()
 
     def message(self, message: str):
         QtWidgets.QMessageBox.information(None, APP_TITLE, message)
@@ -48,18 +97,29 @@ class HeadlessInterface(xappt.BaseInterface):
 
     def progress_start(self):
         self.setup_progress_dialog()
+        self.progress.start()
         self.progress_dialog.setValue(0)
         self.progress_dialog.setLabelText("")
         self.progress_dialog.show()
         self.app.processEvents()
 
     def progress_update(self, message: str, percent_complete: float):
-        progress_value = int(100.0 * percent_complete)
-        self.progress_dialog.setValue(progress_value)
-        self.progress_dialog.setLabelText(message)
+        self.progress.update(message, percent_complete)
+        delay = self.progress.time_until_refresh()
+        if delay <= 0.0:
+            self.repaint_progress()
+        elif not self.progress_timer.isActive():
+            self.progress_timer.start(math.ceil(delay * 1000.0))
+
+    def repaint_progress(self):
+        self.progress.mark_refreshed()
+        fraction, status_text = self.progress.display()
+        self.progress_dialog.setValue(int(100.0 * fraction))
+        self.progress_dialog.setLabelText(status_text)
         self.app.processEvents()
 
     def progress_end(self):
+        self.progress_timer.stop()
         self.progress_dialog.setValue(0)
         self.progress_dialog.setLabelText("")
         self.progress_dialog.canceled.disconnect(self.abort)
@@ -72,4 +132,5 @@ class HeadlessInterface(xappt.BaseInterface):
     def abort(self):
         if self.command_runner.running:
             self.command_runner.abort()
+        self.kill_async_subprocesses()
         raise SystemExit("Aborted by user")
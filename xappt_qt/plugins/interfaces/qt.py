@@ -1,17 +1,36 @@
 import base64
+import copy
 import enum
+import functools
+import inspect
+import math
 import os
 
-from typing import Optional
+from typing import Any, Dict, NamedTuple, Optional, Type
 
 from PyQt5 import QtWidgets, QtGui, QtCore
 
 import xappt
+from xappt.config import log as logger
 
+from xappt_qt import config
 from xappt_qt.constants import *
+from xappt_qt.gui.dialogs.batch_dialog import BatchDialog
 from xappt_qt.gui.dialogs.tool_ui_dialog import ToolUI
+from xappt_qt.plugins.interfaces.async_support import AsyncInterfaceMixin
 from xappt_qt.plugins.interfaces.headless import HeadlessInterface
 from xappt_qt.gui.application import get_application
+from xappt_qt.gui.utilities.async_runner import AsyncRunner
+from xappt_qt.gui.utilities.job_queue import Job, JobQueue
+from xappt_qt.gui.utilities.tool_process import ToolProcess
+from xappt_qt.gui.utilities.tool_worker import GuiDispatcher, ToolWorker, on_gui_thread
+from xappt_qt.gui.widgets.tool_page.widget import ToolPage
+from xappt_qt.utilities.memory import MemoryTracker, memory_profiling_requested
+from xappt_qt.utilities.profiling import profiled, profiling_requested
+from xappt_qt.utilities.progress import ProgressTracker
+from xappt_qt.utilities.result_cache import CachedRun, cached_run
+from xappt_qt.utilities.run_history import RunRecorder
+from xappt_qt.utilities.session_log import SessionLog
 from xappt_qt.utilities.tool_attributes import *
 
 os.environ.setdefault('QT_STYLE_OVERRIDE', "Fusion")
@@ -25,13 +44,47 @@ class ToolState(enum.Enum):
     UNKNOWN = 99
 
 
+class PreparedTool(NamedTuple):
+    """ The next tool of the chain, built ahead of time with a snapshot of the `tool_data`
+    it was built with. """
+    index: int
+    tool_class: Type[xappt.BaseTool]
+    tool: xappt.BaseTool
+    page: ToolPage
+    tool_data: Dict[str, Any]
+
+
 @xappt.register_plugin
-class QtInterface(xappt.BaseInterface):
+class QtInterface(AsyncInterfaceMixin, xappt.BaseInterface):
     def __init__(self):
         super().__init__()
         self.app = get_application()
 
         self.ui = ToolUI()
+        self.dispatcher = GuiDispatcher(self.ui)
+        self._worker: Optional[ToolWorker] = None
+        self.tool_process = ToolProcess(self, parent=self.ui)
+        self.tool_process.execution_finished.connect(self.on_process_finished)
+        self.async_runner = AsyncRunner(parent=self.ui)
+        self.async_runner.execution_failed.connect(self.on_worker_failed)
+        self.async_runner.execution_finished.connect(self.on_async_finished)
+        self._advance_after_run = False
+        self._run_recorder: Optional[RunRecorder] = None
+        self._cached_run: Optional[CachedRun] = None
+
+        self._prepared_tool: Optional[PreparedTool] = None
+        self.prepare_timer = QtCore.QTimer(self.ui)
+        self.prepare_timer.setSingleShot(True)
+        self.prepare_timer.timeout.connect(self.prepare_next_tool)
+
+        self.job_queue = JobQueue(self, config.job_max_concurrent, parent=self.ui)
+        self.ui.setup_job_list(self.job_queue)
+
+        self.progress = ProgressTracker(config.progress_refresh_rate)
+        self.progress_timer = QtCore.QTimer(self.ui)
+        self.progress_timer.setSingleShot(True)
+        self.progress_timer.timeout.connect(self.repaint_progress)
+        self._progress_repaint_pending = False
 
         self.__ui_close_event_orig = self.ui.closeEvent
         self.ui.closeEvent = self.close_event
@@ -41,10 +94,29 @@ class QtInterface(xappt.BaseInterface):
         self.ui.btnRunAndAdvance.clicked.connect(self.on_run_and_advance)
         self.ui.btnHelp.clicked.connect(self.on_show_help)
         self.ui.btnAbort.clicked.connect(self.on_abort)
+        self.ui.btnQueue.clicked.connect(self.on_queue_tool)
+        self.ui.btnBatch.clicked.connect(self.on_batch_tool)
+
+        self.profiling_enabled = profiling_requested()
+        self.ui.actionProfile.setChecked(self.profiling_enabled)
+        self.ui.actionProfile.toggled.connect(self.on_profiling_toggled)
+
+        self.memory_profiling_enabled = False
+        self.memory_tracker: Optional[MemoryTracker] = None
+        self.memory_timer = QtCore.QTimer(self.ui)
+        self.memory_timer.setSingleShot(True)
+        self.memory_timer.timeout.connect(self.memory_checkpoint)
+        self.ui.actionProfileMemory.toggled.connect(self.on_memory_profiling_toggled)
+        self.ui.actionProfileMemory.setChecked(memory_profiling_requested())
+        self.ui.job_list.load_parameters_requested.connect(self.on_load_job_parameters)
 
         self.on_write_stdout.add(self.ui.write_stdout)
         self.on_write_stderr.add(self.ui.write_stderr)
 
+        self.session_log: Optional[SessionLog] = None
+        self.on_write_stdout.add(self.write_session_log_stdout)
+        self.on_write_stderr.add(self.write_session_log_stderr)
+
         self._tool_geo = {}
 
         self._tool_state: ToolState = ToolState.UNKNOWN
@@ -65,6 +137,7 @@ class QtInterface(xappt.BaseInterface):
 
     def save_window_geo(self, tool_key: str):
         geo = bytes(self.ui.saveGeometry())
+        self.load_config()  # other windows of this process may have saved theirs since this one was opened
         self._tool_geo[tool_key] = base64.b64encode(geo).decode('utf8')
         self.save_config()
 
@@ -72,18 +145,86 @@ class QtInterface(xappt.BaseInterface):
     def name(cls) -> str:
         return APP_INTERFACE_NAME
 
+    def open_session_log(self, tool: xappt.BaseTool):
+        self.close_session_log()
+        if not config.session_log_enabled:
+            return
+        try:
+            self.session_log = SessionLog(get_tool_log_directory(tool),
+                                          title=f"{tool.collection()}::{tool.name()}",
+                                          max_bytes=config.session_log_max_bytes,
+                                          backup_count=config.session_log_backup_count,
+                                          compress=config.session_log_compress)
+        except OSError as err:
+            logger.warning(f"Could not open session log: {err}")
+            return
+        self.ui.console.session_log = self.session_log
+
+    def close_session_log(self):
+        if self.session_log is None:
+            return
+        self.ui.console.session_log = None
+        self.session_log.close()
+        self.session_log = None
+
+    def write_session_log_stdout(self, text: str):
+        if self.session_log is not None:
+            self.session_log.write_stdout(text)
+
+    def write_session_log_stderr(self, text: str):
+        if self.session_log is not None:
+            self.session_log.write_stderr(text)
+
     def invoke(self, plugin: xappt.BaseTool, **kwargs) -> int:
-        return plugin.execute(**kwargs)
+        execute = profiled(plugin, self.write_stdout, cpu=self.profiling_enabled, memory=self.memory_profiling_enabled)
+        return execute(**kwargs)
+
+    def on_profiling_toggled(self, checked: bool):
+        self.profiling_enabled = checked
+
+    def on_memory_profiling_toggled(self, checked: bool):
+        self.memory_profiling_enabled = checked
+        if checked:
+            self.memory_tracker = MemoryTracker(self.write_stdout)
+            self.memory_checkpoint()
+        elif self.memory_tracker is not None:
+            self.memory_timer.stop()
+            self.memory_tracker.close()
+            self.memory_tracker = None
+
+    def memory_checkpoint(self):
+        """ Compare memory with the last tool that was loaded. This runs once the event loop
+        is idle, after the page of the previous tool was deleted. """
+        if self.memory_tracker is None or self.current_tool_index < 0:
+            return
+        tool_class = self.get_tool(self.current_tool_index)
+        self.memory_tracker.checkpoint(f"{tool_class.name()} ({self.current_tool_index + 1}/{self.tool_count})")
+
+    def process_events(self):
+        if self._worker is None and not self.tool_process.running and not self.async_runner.running:
+            self.app.processEvents()
 
+    @on_gui_thread()
+    def write_stdout(self, text: str):
+        super().write_stdout(text)
+
+    @on_gui_thread()
+    def write_stderr(self, text: str):
+        super().write_stderr(text)
+
+    @on_gui_thread(blocking=True)
     def message(self, message: str):
         QtWidgets.QMessageBox.information(self.ui, APP_TITLE, message)
 
+    @on_gui_thread(blocking=True)
     def warning(self, message: str):
         QtWidgets.QMessageBox.warning(self.ui, APP_TITLE, message)
 
+    @on_gui_thread(blocking=True)
     def error(self, message: str, *, details: Optional[str] = None):
         QtWidgets.QMessageBox.critical(self.ui, APP_TITLE, message)
 
+    @on_gui_thread(blocking=True)
     def ask(self, message: str) -> bool:
         buttons = QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
         ask_result = QtWidgets.QMessageBox.question(self.ui, APP_TITLE, message, buttons=buttons,
@@ -91,26 +232,121 @@ class QtInterface(xappt.BaseInterface):
         return ask_result == QtWidgets.QMessageBox.Yes
 
     def progress_start(self):
-        self.ui.progressBar.setRange(0, 100)
-        self.ui.progressBar.setFormat("")
-        self.app.processEvents()
+        self.progress.start()
+        self.reset_progress_bar()
 
     def progress_update(self, message: str, percent_complete: float):
-        progress_value = int(100.0 * percent_complete)
-        self.ui.progressBar.setValue(progress_value)
-        self.ui.progressBar.setFormat(message)
-        self.app.processEvents()
+        """ Only the latest value is kept, the bar is repainted at most
+        `config.progress_refresh_rate` times per second. """
+        self.progress.update(message, percent_complete)
+        if self.dispatcher.in_owner_thread():
+            if self.progress.time_until_refresh() <= 0.0 or not self.progress_timer.isActive():
+                self.schedule_progress_repaint()
+        elif not self._progress_repaint_pending:
+            # a threaded tool only has one repaint request in flight at any time
+            self._progress_repaint_pending = True
+            self.schedule_progress_repaint()
 
     def progress_end(self):
+        self.progress.start()
+        self.reset_progress_bar()
+
+    @on_gui_thread()
+    def reset_progress_bar(self):
+        self.progress_timer.stop()
+        self._progress_repaint_pending = False
+        self.ui.progressBar.setRange(0, 100)
         self.ui.progressBar.setValue(0)
         self.ui.progressBar.setFormat("")
-        self.app.processEvents()
+        self.process_events()
+
+    @on_gui_thread()
+    def schedule_progress_repaint(self):
+        delay = self.progress.time_until_refresh()
+        if delay <= 0.0:
+            self.repaint_progress()
+        elif not self.progress_timer.isActive():
+            self.progress_timer.start(math.ceil(delay * 1000.0))
+
+    def repaint_progress(self):
+        self._progress_repaint_pending = False
+        self.progress.mark_refreshed()
+        fraction, status_text = self.progress.display()
+        self.ui.progressBar.setValue(int(100.0 * fraction))
+        self.ui.progressBar.setFormat(status_text)
+        self.process_events()
 
     def load_tool_ui(self):
-        tool_class = self.get_tool(self.current_tool_index)
-        tool_instance = tool_class(interface=self, **self.tool_data)
-        self.ui.load_tool(tool_instance)
+        prepared = self.take_prepared_tool(self.current_tool_index)
+        if prepared is None:
+            tool_class = self.get_tool(self.current_tool_index)
+            tool_instance = tool_class(interface=self, **self.tool_data)
+            self.ui.load_tool(tool_instance)
+        else:
+            tool_instance = prepared.tool
+            self.ui.load_tool(tool_instance, prepared.page)
+        self.open_session_log(tool_instance)
         self.set_tool_state(ToolState.LOADED)
+        if self.memory_tracker is not None:
+            self.memory_timer.start(0)  # started first, so it runs before the next tool is prepared
+        self.schedule_prepare_next_tool()
+
+    def schedule_prepare_next_tool(self):
+        """ Build the next tool once the event loop is idle, which is while the user fills
+        in the current tool or while it runs off the GUI thread. """
+        if config.prebuild_next_tool and self.current_tool_index + 1 < self.tool_count:
+            self.prepare_timer.start(0)
+
+    def prepare_next_tool(self):
+        index = self.current_tool_index + 1
+        if index >= self.tool_count:
+            return
+        if self.prepared_tool_valid(index):
+            return
+        self.discard_prepared_tool()
+
+        tool_class = self.get_tool(index)
+        try:
+            tool_data = copy.deepcopy(self.tool_data)
+        except Exception:  # noqa, without a snapshot there's no telling whether the tool is stale
+            return
+        try:
+            tool_instance = tool_class(interface=self, **self.tool_data)
+        except Exception as err:  # noqa, the error is reported if the tool is loaded the usual way
+            logger.debug(f"Unable to prepare {tool_class.name()}: {err}")
+            return
+        page = self.ui.build_tool_page(tool_instance)
+        self._prepared_tool = PreparedTool(index, tool_class, tool_instance, page, tool_data)
+
+    def prepared_tool_valid(self, index: int) -> bool:
+        prepared = self._prepared_tool
+        if prepared is None or prepared.index != index or index >= self.tool_count:
+            return False
+        if prepared.tool_class is not self.get_tool(index):
+            return False
+        keys = get_tool_data_keys(prepared.tool_class)
+        if keys is None:
+            keys = set(prepared.tool_data.keys()) | set(self.tool_data.keys())
+        missing = object()
+        try:
+            return all(prepared.tool_data.get(key, missing) == self.tool_data.get(key, missing) for key in keys)
+        except Exception:  # noqa, values that can't be compared count as changed
+            return False
+
+    def take_prepared_tool(self, index: int) -> Optional[PreparedTool]:
+        """ The prepared tool if it was built for `index` and the `tool_data` it depends on
+        hasn't changed since, otherwise it's discarded. """
+        self.prepare_timer.stop()
+        prepared = self._prepared_tool if self.prepared_tool_valid(index) else None
+        if prepared is None:
+            self.discard_prepared_tool()
+        self._prepared_tool = None
+        return prepared
+
+    def discard_prepared_tool(self):
+        if self._prepared_tool is not None:
+            self._prepared_tool.page.deleteLater()
+            self._prepared_tool = None
 
     def run(self, **kwargs) -> int:
         if not len(self._tool_chain):
@@ -119,48 +355,118 @@ class QtInterface(xappt.BaseInterface):
         self._current_tool_index = 0
         tool_class = self.get_tool(self.current_tool_index)
 
-        icon_path = get_tool_icon(tool_class)
-        self.ui.setWindowIcon(QtGui.QIcon(str(icon_path)))
-        self.ui.setWindowTitle(f"{tool_class.name()} - {APP_TITLE}")
-
         if is_headless(tool_class):
             headless_interface = HeadlessInterface()
             headless_interface.tool_data.update(self.tool_data.copy())
             headless_interface.add_tool(tool_class)
             return headless_interface.run(**kwargs)
 
-        tool_geo_key = f"{tool_class.collection()}::{tool_class.name()}"
+        self.open_window()
+        self.ui.exec()
+        self.close_window()
+        return 0
 
-        self.load_window_geo(tool_geo_key)
+    def show(self) -> bool:
+        """ Show the window of the first tool and return without waiting for it to close,
+        for tools opened in the browser's process. The window is cleaned up like `run`
+        does when `ui.finished` is emitted. Headless tools can't be shown this way. """
+        if not len(self._tool_chain) or is_headless(self.get_tool(0)):
+            return False
+        self._current_tool_index = 0
+        self.open_window()
+        self.ui.finished.connect(lambda _: self.close_window())
+        self.ui.show()
+        return True
+
+    def window_geo_key(self) -> str:
+        tool_class = self.get_tool(0)
+        return f"{tool_class.collection()}::{tool_class.name()}"
+
+    def open_window(self):
+        tool_class = self.get_tool(0)
+        icon_path = get_tool_icon(tool_class)
+        self.ui.setWindowIcon(QtGui.QIcon(str(icon_path)))
+        self.ui.setWindowTitle(f"{tool_class.name()} - {APP_TITLE}")
+        self.load_window_geo(self.window_geo_key())
         self.load_tool_ui()
 
-        self.ui.exec()
-        self.save_window_geo(tool_geo_key)
-        return 0
+    def close_window(self):
+        if self._worker is not None:
+            self._worker.wait()
+        self.tool_process.stop()
+        self.async_runner.close()
+        self.job_queue.shutdown()
+        self.prepare_timer.stop()
+        self.discard_prepared_tool()
+        self.ui.actionProfileMemory.setChecked(False)
+        self.close_session_log()
+        self.save_window_geo(self.window_geo_key())
 
     def close_event(self, event: QtGui.QCloseEvent):
-        if self.command_runner.running or self.current_tool_state() == ToolState.RUNNING:
+        running_jobs = self.job_queue.running_jobs()
+        if self.command_runner.running or self.current_tool_state() == ToolState.RUNNING or len(running_jobs):
             if self.ask("A process is currently running.\nDo you want to kill it?"):
                 self.command_runner.abort()
+                self.tool_process.kill()
+                self.kill_async_subprocesses()
+                self.async_runner.cancel()
+                for job in running_jobs:
+                    self.job_queue.cancel(job)
                 self.warning("The Process has been terminated.")
             event.ignore()
         else:
             self.__ui_close_event_orig(event)
 
     def on_run_tool(self):
-        self.set_tool_state(ToolState.RUNNING)
+        self.run_current_tool(advance=False)
+
+    def on_queue_tool(self):
+        """ Queue a run of the current tool with a snapshot of its parameter values. """
         tool = self.ui.current_tool
         try:
             tool.validate()
         except xappt.ParameterValidationError as err:
             self.error(str(err))
-            self.set_tool_state(ToolState.ERROR)
-        else:
-            result = self.invoke(tool, **self.tool_data)
-            if result == 0:
-                self.set_tool_state(ToolState.SUCCESS)
-            else:
-                self.set_tool_state(ToolState.ERROR)
+            return
+        self.job_queue.add(Job(type(tool), tool.param_dict(), dict(self.tool_data),
+                               priority=self.ui.spinPriority.value()))
+        self.ui.show_job_list()
+
+    def on_batch_tool(self):
+        """ Queue one run of the current tool for each value of a parameter. """
+        tool = self.ui.current_tool
+        dialog = BatchDialog(tool, workers=self.job_queue.max_concurrent, parent=self.ui)
+        if dialog.exec() != QtWidgets.QDialog.Accepted:
+            return
+        name = dialog.parameter_name()
+        try:
+            for param in tool.parameters():
+                if param.name != name:
+                    param.validate(param.value)
+        except xappt.ParameterValidationError as err:
+            self.error(str(err))
+            return
+
+        parameters = tool.param_dict()
+        priority = self.ui.spinPriority.value()
+        jobs = []
+        for text, value in dialog.converted_values():
+            job_parameters = dict(parameters)
+            job_parameters[name] = value
+            jobs.append(Job(type(tool), job_parameters, dict(self.tool_data), priority=priority,
+                            label=f"{name}={text}"))
+        self.ui.job_list.spinConcurrent.setValue(dialog.workers())
+        self.job_queue.add_batch(jobs)
+        self.ui.show_job_list()
+
+    def on_load_job_parameters(self, job: Job):
+        tool = self.ui.current_tool
+        if tool is None or job.tool_class is not type(tool):
+            return
+        for name, value in job.parameters.items():
+            param = getattr(tool, name, None)
+            if isinstance(param, xappt.Parameter):
+                param.value = value
 
     def on_next_tool(self):
         self._current_tool_index = self.current_tool_index + 1
@@ -170,19 +476,113 @@ class QtInterface(xappt.BaseInterface):
             self.ui.close()
 
     def on_run_and_advance(self):
+        self.run_current_tool(advance=True)
+
+    def run_current_tool(self, advance: bool):
         self.set_tool_state(ToolState.RUNNING)
         tool = self.ui.current_tool
+        self._run_recorder = RunRecorder(tool, self.name())
         try:
             tool.validate()
         except xappt.ParameterValidationError as err:
+            self.finish_run_record(2)
             self.error(str(err))
             self.set_tool_state(ToolState.ERROR)
-        else:
-            result = self.invoke(tool, **self.tool_data)
-            if result != 0:
-                self.set_tool_state(ToolState.ERROR)
+            return
+        self._run_recorder.validated()
+
+        self._cached_run = cached_run(tool, self.tool_data)
+        if self._cached_run is not None:
+            exit_code = self._cached_run.restore()
+            if exit_code is not None:
+                self._cached_run = None
+                self._run_recorder = None  # a restored result says nothing about how long the tool takes
+                self.write_stdout(f"The inputs of {tool.name()} haven't changed, its cached result was restored.")
+                self.on_tool_finished(exit_code, advance)
                 return
+
+        self._current_tool = tool
+        if is_isolated(tool):
+            self.start_process(tool, advance)
+            return
+        if is_threaded(tool):
+            self.start_worker(tool, advance)
+            return
+        result = self.invoke(tool, **self.tool_data)
+        if inspect.isawaitable(result):
+            self.start_async(result, advance)
+            return
+        self.mark_executed()
+        self.on_tool_finished(result, advance)
+
+    def start_worker(self, tool: xappt.BaseTool, advance: bool):
+        """ Run the tool on a worker thread. Everything the tool asks of the interface is
+        forwarded to the GUI thread, and the tool state is updated when it finishes. """
+        self._worker = ToolWorker(functools.partial(self.invoke, tool, **self.tool_data), parent=self.ui)
+        self._worker.execution_failed.connect(self.on_worker_failed)
+        self._worker.execution_finished.connect(functools.partial(self.on_worker_finished, advance=advance))
+        self.ui.pump_events = False
+        self._worker.start()
+
+    def start_process(self, tool: xappt.BaseTool, advance: bool):
+        """ Run the tool in a child process, which is reused when the same tool runs again. """
+        self._advance_after_run = advance
+        self.ui.pump_events = False
+        self.tool_process.execute(tool, **self.tool_data)
+
+    def on_process_finished(self, result: int):
+        self.ui.pump_events = True
+        self.mark_executed()
+        self.finish_run_record(result, peak=self.tool_process.peak_rss)
+        self.on_tool_finished(result, self._advance_after_run)
+
+    def start_async(self, awaitable, advance: bool):
+        """ Run the coroutine returned by an `async def execute` on the GUI thread's asyncio loop. """
+        self._advance_after_run = advance
+        self.ui.pump_events = False
+        self.async_runner.start(awaitable)
+
+    def on_async_finished(self, result: int):
+        self.ui.pump_events = True
+        self.mark_executed()
+        self.on_tool_finished(result, self._advance_after_run)
+
+    def on_worker_failed(self, details: str):
+        self.write_stderr(details)
+        self.error("The tool raised an unhandled exception.", details=details)
+
+    def on_worker_finished(self, result: int, advance: bool):
+        self.mark_executed()
+        self._worker.wait()
+        self._worker.deleteLater()
+        self._worker = None
+        self.ui.pump_events = True
+        self.on_tool_finished(result, advance)
+
+    def mark_executed(self):
+        """ `execute` returned, whatever runs from here on counts as teardown. """
+        if self._run_recorder is not None:
+            self._run_recorder.executed()
+
+    def finish_run_record(self, result: int, *, peak: Optional[int] = None):
+        recorder = self._run_recorder
+        self._run_recorder = None
+        if recorder is not None:
+            recorder.finish(result, peak=peak)
+
+    def on_tool_finished(self, result: int, advance: bool):
+        self._current_tool = None
+        self.finish_run_record(result)
+        if self._cached_run is not None:
+            self._cached_run.store(result)
+            self._cached_run = None
+        if result != 0:
+            self.set_tool_state(ToolState.ERROR)
+        elif advance:
             self.on_next_tool()
+        else:
+            self.set_tool_state(ToolState.SUCCESS)
+            self.schedule_prepare_next_tool()  # the tool may have added tools or changed tool_data
 
     def current_tool_state(self) -> ToolState:
         return self._tool_state
@@ -197,6 +597,11 @@ class QtInterface(xappt.BaseInterface):
         self.ui.btnRun.setEnabled(False)
         self.ui.btnAdvance.setEnabled(False)
         self.ui.btnRunAndAdvance.setEnabled(False)
+        self.ui.btnQueue.setVisible(not auto_advance)
+        self.ui.spinPriority.setVisible(not auto_advance)
+        self.ui.btnBatch.setVisible(not auto_advance)
+        self.ui.btnQueue.setEnabled(state in (ToolState.LOADED, ToolState.ERROR))
+        self.ui.btnBatch.setEnabled(state in (ToolState.LOADED, ToolState.ERROR))
 
         self.ui.btnHelp.setEnabled(state != ToolState.RUNNING)
         self.ui.btnAbort.setEnabled(state == ToolState.RUNNING)
@@ -258,4 +663,11 @@ class QtInterface(xappt.BaseInterface):
             self.message(message)
 
     def on_abort(self):
+        if self.tool_process.running:
+            self.tool_process.kill()
+            return
+        if self.async_runner.running:
+            self.kill_async_subprocesses()
+            self.async_runner.cancel()
+            return
         self.abort()
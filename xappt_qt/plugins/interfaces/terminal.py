@@ -0,0 +1,208 @@
+import inspect
+import shutil
+import sys
+import textwrap
+import threading
+
+from typing import Optional, TextIO
+
+import xappt
+
+from xappt_qt import config
+from xappt_qt.plugins.interfaces.async_support import AsyncInterfaceMixin, run_awaitable
+from xappt_qt.utilities.memory import memory_profiling_requested
+from xappt_qt.utilities.profiling import profiled, profiling_requested
+from xappt_qt.utilities.progress import ProgressTracker
+from xappt_qt.utilities.result_cache import cached_run
+from xappt_qt.utilities.run_history import RunRecorder
+
+
+@xappt.register_plugin
+class TerminalInterface(AsyncInterfaceMixin, xappt.BaseInterface):
+    """ Runs tools without a GUI, for machines with no display. Nothing here imports PyQt5.
+
+    Parameters aren't prompted for, they come from `tool_data` (the command line of the
+    launcher). Progress is drawn as a text bar, or printed as plain lines when stdout
+    isn't a terminal, and `ask` reads the answer from stdin unless `assume_yes` is set. """
+
+    BAR_WIDTH = 30
+    LOG_REFRESH_RATE = 1  # progress lines per second when stdout isn't a terminal
+
+    def __init__(self, *, assume_yes: bool = False, stdout: Optional[TextIO] = None,
+                 stderr: Optional[TextIO] = None):
+        super().__init__()
+        self.assume_yes = assume_yes
+        self.profiling_enabled = profiling_requested()
+        self.memory_profiling_enabled = memory_profiling_requested()
+        self.stdout = stdout or sys.stdout
+        self.stderr = stderr or sys.stderr
+        self.interactive = self.stdout.isatty()
+
+        refresh_rate = config.progress_refresh_rate if self.interactive else self.LOG_REFRESH_RATE
+        self.progress = ProgressTracker(refresh_rate)
+        self._progress_line = ""
+        self._progress_active = False
+        self._lock = threading.Lock()  # threads and coroutines of a tool may write at the same time
+
+        self.on_write_stdout.add(self.print_stdout)
+        self.on_write_stderr.add(self.print_stderr)
+
+    @classmethod
+    def name(cls) -> str:
+        return "terminal"
+
+    def run(self, **kwargs) -> int:
+        return super().run(**kwargs)
+
+    def invoke(self, plugin: xappt.BaseTool, **kwargs) -> int:
+        recorder = RunRecorder(plugin, self.name())
+        try:
+            plugin.validate()
+        except xappt.ParameterValidationError as err:
+            self.error(str(err))
+            recorder.finish(2)
+            return 2
+        recorder.validated()
+        cached = cached_run(plugin, self.tool_data)
+        if cached is not None:
+            exit_code = cached.restore()
+            if exit_code is not None:
+                self.message(f"The inputs of {plugin.name()} haven't changed, its cached result was restored.")
+                return exit_code
+        result = 1
+        try:
+            execute = profiled(plugin, self.write_stdout, cpu=self.profiling_enabled,
+                               memory=self.memory_profiling_enabled)
+            result = execute(**kwargs)
+            if inspect.isawaitable(result):
+                result = run_awaitable(result)
+            recorder.executed()
+        except KeyboardInterrupt:
+            self.abort_subprocesses()
+            self.error("Aborted by user")
+            return 1
+        finally:
+            self.end_progress_line()
+            recorder.finish(result)
+        if cached is not None:
+            cached.store(result)
+        return result
+
+    def _write(self, stream: TextIO, text: str):
+        with self._lock:
+            self.clear_progress_line()
+            stream.write(text)
+            if not text.endswith("\n"):
+                stream.write("\n")
+            stream.flush()
+            self.restore_progress_line()
+
+    def print_stdout(self, text: str):
+        self._write(self.stdout, text)
+
+    def print_stderr(self, text: str):
+        self._write(self.stderr, text)
+
+    def message(self, message: str):
+        self._write(self.stdout, message)
+
+    def warning(self, message: str):
+        self._write(self.stderr, f"WARNING: {message}")
+
+    def error(self, message: str, *, details: Optional[str] = None):
+        if details is not None and len(details):
+            message = f"{message}\n{textwrap.indent(details.rstrip(), '    ')}"
+        self._write(self.stderr, f"ERROR: {message}")
+
+    def ask(self, message: str) -> bool:
+        if self.assume_yes:
+            self._write(self.stdout, f"{message} (y|n) y")
+            return True
+        with self._lock:
+            self.clear_progress_line()
+            while True:
+                self.stdout.write(f"{message} (y|n) ")
+                self.stdout.flush()
+                answer = sys.stdin.readline()
+                if not len(answer):  # end of input, nobody is there to answer
+                    self.stdout.write("n\n")
+                    result = False
+                    break
+                answer = answer.strip().lower()
+                if answer in ("y", "yes"):
+                    result = True
+                    break
+                if answer in ("n", "no"):
+                    result = False
+                    break
+                self.stdout.write("Please enter y or n\n")
+            self.restore_progress_line()
+        return result
+
+    def progress_start(self):
+        self.progress.start()
+        self._progress_active = True
+
+    def progress_update(self, message: str, percent_complete: float):
+        self.progress.update(message, percent_complete)
+        if self.progress.time_until_refresh() <= 0.0:
+            with self._lock:
+                self.progress.mark_refreshed()
+                self.draw_progress_line()
+
+    def progress_end(self):
+        with self._lock:
+            if self._progress_active and self.progress.dirty:
+                self.progress.mark_refreshed()
+                self.draw_progress_line()
+            self.end_progress_line()
+        self._progress_active = False
+
+    def progress_text(self) -> str:
+        fraction, status_text = self.progress.display()
+        fraction = max(0.0, min(1.0, fraction))
+        filled = int(round(self.BAR_WIDTH * fraction))
+        bar = "#" * filled + "-" * (self.BAR_WIDTH - filled)
+        text = f"[{bar}] {fraction * 100.0:3.0f}% {status_text}"
+        if self.interactive:
+            width = shutil.get_terminal_size().columns - 1
+            text = text[:width]
+        return text
+
+    def draw_progress_line(self):
+        if not self._progress_active:
+            return
+        text = self.progress_text()
+        if self.interactive:
+            self.stdout.write(f"\r{text.ljust(len(self._progress_line))}")
+            self._progress_line = text
+        else:
+            self.stdout.write(f"{text}\n")
+        self.stdout.flush()
+
+    def restore_progress_line(self):
+        """ Draw the bar again after output cleared it. Progress printed as lines isn't
+        cleared, and is only printed at `LOG_REFRESH_RATE`. """
+        if self.interactive:
+            self.draw_progress_line()
+
+    def clear_progress_line(self):
+        if len(self._progress_line):
+            self.stdout.write(f"\r{' ' * len(self._progress_line)}\r")
+            self._progress_line = ""
+
+    def end_progress_line(self):
+        """ Leave the progress bar where it is and move on to a new line. """
+        if len(self._progress_line):
+            self.stdout.write("\n")
+            self.stdout.flush()
+            self._progress_line = ""
+
+    def abort_subprocesses(self):
+        if self.command_runner.running:
+            self.command_runner.abort()
+        self.kill_async_subprocesses()
+
+    def abort(self):
+        self.abort_subprocesses()
+        super().abort()
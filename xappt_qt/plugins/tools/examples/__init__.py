@@ -1,5 +1,8 @@
 from xappt_qt.plugins.tools.examples.video_convert import ConvertX265
 from xappt_qt.plugins.tools.examples.headless import HeadlessExecution
+from xappt_qt.plugins.tools.examples.threaded import ThreadedExecution
+from xappt_qt.plugins.tools.examples.isolated import IsolatedExecution
+from xappt_qt.plugins.tools.examples.async_execution import AsyncExecution
 from xappt_qt.plugins.tools.examples.custom_icon import *
 from xappt_qt.plugins.tools.examples.auto_advance import AutoAdvance
 from xappt_qt.plugins.tools.examples.string_ui import StringUi
@@ -0,0 +1,38 @@
+import asyncio
+import sys
+
+import xappt
+
+
+@xappt.register_plugin
+class AsyncExecution(xappt.BaseTool):
+    process_count = xappt.ParamInt(default=4, minimum=1, maximum=16)
+
+    @classmethod
+    def name(cls) -> str:
+        return "async"
+
+    @classmethod
+    def help(cls) -> str:
+        return ("A tool with an `async def execute` runs on an asyncio event loop that "
+                "shares the window's event loop, so it can wait on many things at once "
+                "without threads.\n\nThis example runs several commands at the same time "
+                "with `interface.run_subprocess_async`.")
+
+    @classmethod
+    def collection(cls) -> str:
+        return "Examples"
+
+    async def run_command(self, index: int) -> int:
+        command = [sys.executable, "-c", f"import time; time.sleep(1 + {index} * 0.5); print('Process {index} done')"]
+        return await self.interface.run_subprocess_async(command)
+
+    async def execute(self, **kwargs) -> int:
+        count = self.process_count.value
+        self.interface.progress_start()
+        tasks = [asyncio.ensure_future(self.run_command(i)) for i in range(count)]
+        for finished, task in enumerate(asyncio.as_completed(tasks)):
+            await task
+            await self.interface.progress_update_async("Running...", (finished + 1) / count)
+        self.interface.progress_end()
+        return max(task.result() for task in tasks)
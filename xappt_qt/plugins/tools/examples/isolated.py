@@ -0,0 +1,42 @@
+import os
+import time
+
+import xappt
+
+
+@xappt.register_plugin
+class IsolatedExecution(xappt.BaseTool):
+    isolated = True
+
+    crash = xappt.ParamBool(default=False, description="Exit the tool process without cleaning up")
+
+    @classmethod
+    def name(cls) -> str:
+        return "isolated"
+
+    @classmethod
+    def help(cls) -> str:
+        return ("An isolated tool runs in a separate process, so a crash or a leak in the tool "
+                "can't take the window down with it, and **Abort** can always stop it.\n\n"
+                "To run a tool in its own process, simply add a class variable named "
+                "`isolated`, and set its value to **True**.")
+
+    @classmethod
+    def collection(cls) -> str:
+        return "Examples"
+
+    def execute(self, **kwargs) -> int:
+        print(f"Running in process {os.getpid()}")
+
+        self.interface.progress_start()
+        for i in range(10):
+            self.interface.progress_update("Working...", (i + 1) / 10)
+            time.sleep(0.25)
+        self.interface.progress_end()
+
+        if self.crash.value:
+            os._exit(1)
+
+        self.interface.message("Complete")
+
+        return 0
@@ -0,0 +1,41 @@
+import time
+
+import xappt
+
+
+@xappt.register_plugin
+class ThreadedExecution(xappt.BaseTool):
+    threaded = True
+
+    iterations = xappt.ParamInt(default=20, minimum=1)
+
+    @classmethod
+    def name(cls) -> str:
+        return "threaded"
+
+    @classmethod
+    def help(cls) -> str:
+        return ("A threaded tool runs on a worker thread, so the window stays responsive "
+                "while it works. Messages, questions, progress and output are forwarded "
+                "to the window automatically.\n\nTo make a tool threaded, simply add a "
+                "class variable named `threaded`, and set its value to **True**.")
+
+    @classmethod
+    def collection(cls) -> str:
+        return "Examples"
+
+    def execute(self, **kwargs) -> int:
+        iterations = self.iterations.value
+        if not self.interface.ask(f"This will take {iterations * 0.25:.1f} seconds. Continue?"):
+            return 1
+
+        self.interface.progress_start()
+        for i in range(iterations):
+            self.interface.write_stdout(f"Step {i + 1} of {iterations}")
+            self.interface.progress_update("Working...", (i + 1) / iterations)
+            time.sleep(0.25)
+        self.interface.progress_end()
+
+        self.interface.message("Complete")
+
+        return 0
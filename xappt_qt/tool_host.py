@@ -0,0 +1,257 @@
+""" The child process side of out-of-process tool execution.
+
+The parent talks to this process through its stdin and stdout using the frames
+defined in `xappt_qt.utilities.tool_protocol`. Output that tools (or libraries they
+use) write directly to file descriptors 1 and 2 is captured through pipes and
+forwarded as STDOUT and STDERR frames, so it can't corrupt the protocol. """
+
+import codecs
+import copy
+import importlib
+import inspect
+import json
+import os
+import queue
+import sys
+import threading
+import traceback
+
+from typing import Any, BinaryIO, Dict, Optional
+
+import xappt
+
+from xappt_qt import config
+from xappt_qt.constants import APP_NO_GUI_ENV
+from xappt_qt.utilities.memory import peak_rss, reset_peak_rss
+from xappt_qt.plugins.interfaces.async_support import AsyncInterfaceMixin, run_awaitable
+from xappt_qt.utilities.profiling import profiled
+from xappt_qt.utilities.progress import ProgressTracker
+from xappt_qt.utilities.terminal import split_output
+from xappt_qt.utilities.tool_protocol import *
+
+SYNC_MARKER = "\x00xappt-sync\x00"
+
+
+class OutputForwarder(threading.Thread):
+    """ Reads what is written to a file descriptor and sends it as text frames.
+
+    Text is only sent up to the last line break or carriage return, so lines aren't
+    split across frames. """
+
+    def __init__(self, host: "ToolHost", fd: int, frame_type: FrameType):
+        super().__init__(daemon=True)
+        self.host = host
+        self.frame_type = frame_type
+        self.read_fd, write_fd = os.pipe()
+        os.dup2(write_fd, fd)
+        os.close(write_fd)
+        self.synced = threading.Event()
+
+    def send(self, text: str):
+        if len(text):
+            self.host.send_text(self.frame_type, text)
+
+    def run(self):
+        decoder = codecs.getincrementaldecoder("utf8")(errors="replace")
+        pending = ""
+        while True:
+            data = os.read(self.read_fd, 65536)
+            if not data:
+                break
+            pending += decoder.decode(data)
+            marker = pending.find(SYNC_MARKER)
+            if marker >= 0:
+                for text in split_output(pending[:marker]):
+                    self.send(text)
+                pending = pending[marker + len(SYNC_MARKER):]
+                self.synced.set()
+            complete, pending = split_output(pending)
+            self.send(complete)
+        self.send(pending + decoder.decode(b"", final=True))
+
+
+class ToolHostInterface(AsyncInterfaceMixin, xappt.BaseInterface):
+    """ Forwards everything a tool asks of its interface to the parent process. """
+
+    def __init__(self, host: "ToolHost"):
+        super().__init__()
+        self.host = host
+        self.profiling_enabled = False  # set for each run by the parent
+        self.memory_profiling_enabled = False
+        self.progress = ProgressTracker(config.progress_refresh_rate)
+        self.on_write_stdout.add(self.send_stdout)
+        self.on_write_stderr.add(self.send_stderr)
+
+    def send_stdout(self, text: str):
+        self.host.send_text(FrameType.STDOUT, text)
+
+    def send_stderr(self, text: str):
+        self.host.send_text(FrameType.STDERR, text)
+
+    def run(self, **kwargs) -> int:
+        return super().run(**kwargs)
+
+    def invoke(self, plugin: xappt.BaseTool, **kwargs) -> int:
+        execute = profiled(plugin, self.write_stdout, cpu=self.profiling_enabled, memory=self.memory_profiling_enabled)
+        result = execute(**kwargs)
+        if inspect.isawaitable(result):
+            result = run_awaitable(result)
+        return result
+
+    def message(self, message: str):
+        self.host.request(FrameType.MESSAGE, message)
+
+    def warning(self, message: str):
+        self.host.request(FrameType.WARNING, message)
+
+    def error(self, message: str, *, details: Optional[str] = None):
+        self.host.request(FrameType.ERROR, [message, details])
+
+    def ask(self, message: str) -> bool:
+        return bool(self.host.request(FrameType.ASK, message))
+
+    def progress_start(self):
+        self.progress.start()
+        self.host.send(encode_frame(FrameType.PROGRESS_START))
+
+    def progress_update(self, message: str, percent_complete: float):
+        # the parent only repaints a few times per second, don't send it more than that
+        self.progress.update(message, percent_complete)
+        if self.progress.time_until_refresh() <= 0.0:
+            self.send_progress()
+
+    def send_progress(self):
+        self.progress.mark_refreshed()
+        self.host.send(encode_json_frame(FrameType.PROGRESS_UPDATE, list(self.progress.latest())))
+
+    def flush_progress(self):
+        if self.progress.dirty:
+            self.send_progress()
+
+    def progress_end(self):
+        self.progress.start()
+        self.host.send(encode_frame(FrameType.PROGRESS_END))
+
+
+class ToolHost:
+    def __init__(self):
+        self._send_lock = threading.Lock()
+        self._answers = queue.Queue()
+        self._runs = queue.Queue()
+
+        # keep private copies of stdin and stdout for the protocol, then point the
+        # standard file descriptors somewhere tools can't interfere with it
+        self._in: BinaryIO = os.fdopen(os.dup(0), "rb", buffering=0)
+        self._out: BinaryIO = os.fdopen(os.dup(1), "wb", buffering=0)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.close(devnull)
+
+        self._forwarders = (OutputForwarder(self, 1, FrameType.STDOUT),
+                            OutputForwarder(self, 2, FrameType.STDERR))
+        for forwarder in self._forwarders:
+            forwarder.start()
+        sys.stdout = open(1, "w", buffering=1, encoding="utf8", errors="replace", closefd=False)
+        sys.stderr = open(2, "w", buffering=1, encoding="utf8", errors="replace", closefd=False)
+
+        self.interface = ToolHostInterface(self)
+        self._sent_tool_data: Dict[str, Any] = {}  # the tool_data of the current run, as the parent sent it
+
+    def send(self, frame: bytes):
+        with self._send_lock:
+            self._out.write(frame)
+
+    def send_text(self, frame_type: FrameType, text: str):
+        self.send(encode_frame(frame_type, text.encode("utf8", errors="replace")))
+
+    def request(self, frame_type: FrameType, value: Any) -> Any:
+        """ Send a frame and wait for the parent's answer. """
+        self.sync_output()
+        self.send(encode_json_frame(frame_type, value))
+        return self._answers.get()
+
+    def sync_output(self, timeout: float = 1.0):
+        """ Wait until everything written to stdout and stderr so far was forwarded. """
+        self.interface.flush_progress()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        for fd, forwarder in zip((1, 2), self._forwarders):
+            forwarder.synced.clear()
+            os.write(fd, SYNC_MARKER.encode("utf8"))
+        for forwarder in self._forwarders:
+            forwarder.synced.wait(timeout)
+
+    def read_frames(self):
+        """ Runs on its own thread so that answers arrive while a tool is executing. """
+        while True:
+            frame = read_frame(self._in)
+            if frame is None:
+                break
+            frame_type, payload = frame
+            if frame_type == FrameType.RUN:
+                self._runs.put(decode_json(payload))
+            elif frame_type == FrameType.ANSWER:
+                self._answers.put(decode_json(payload))
+        self._runs.put(None)
+
+    def run_tool(self, request: dict) -> int:
+        self.interface.tool_data = {}
+        self._sent_tool_data = copy.deepcopy(request['tool_data'])
+        try:
+            importlib.import_module(request['module'])
+        except ImportError:
+            pass  # the tool may still be available through xappt's plugin discovery
+        tool_class = xappt.get_tool_plugin(request['name'])
+        tool_data = request['tool_data']
+        tool_kwargs = dict(tool_data)
+        tool_kwargs.update(request['parameters'])
+
+        self.interface.tool_data = tool_data
+        self.interface.profiling_enabled = request.get('profile', False)
+        self.interface.memory_profiling_enabled = request.get('profile_memory', False)
+        tool = tool_class(interface=self.interface, **tool_kwargs)
+        return self.interface.invoke(tool, **tool_data)
+
+    def result_tool_data(self) -> Dict[str, Any]:
+        """ The `tool_data` the tool added or changed, to hand back to the parent, which
+        passes it on to the next tool of the chain. Keys the tool didn't touch are left
+        out: values that aren't JSON arrive here as strings, and must not replace the
+        parent's originals. Values that can't be sent as JSON are left out as well. """
+        tool_data = {}
+        missing = object()
+        for key, value in self.interface.tool_data.items():
+            if self._sent_tool_data.get(key, missing) == value:
+                continue
+            try:
+                json.dumps(value)
+            except (TypeError, ValueError):
+                continue
+            tool_data[key] = value
+        return tool_data
+
+    def serve(self) -> int:
+        threading.Thread(target=self.read_frames, daemon=True).start()
+        while True:
+            request = self._runs.get()
+            if request is None:
+                break
+            reset_peak_rss()
+            try:
+                result = self.run_tool(request)
+            except BaseException:
+                traceback.print_exc()
+                result = 1
+            self.sync_output()
+            self.send(encode_json_frame(FrameType.STATS, {'peak_rss': peak_rss()}))
+            self.send(encode_json_frame(FrameType.RESULT, {'exit_code': result, 'tool_data': self.result_tool_data()}))
+        return 0
+
+
+def main() -> int:
+    # only meant for this process, don't pass it on to processes started by the tools
+    os.environ.pop(APP_NO_GUI_ENV, None)
+    return ToolHost().serve()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
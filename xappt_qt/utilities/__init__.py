@@ -1 +1,7 @@
 from .file_utils import *
+from .scrollback import *
+from .line_store import *
+from .terminal import *
+from .session_log import *
+from .tool_protocol import *
+from .progress import *
@@ -0,0 +1,29 @@
+import os
+import sys
+
+from xappt.constants import TRUTHY_STRINGS
+
+from xappt_qt.constants import APP_NO_GUI_ENV
+
+NO_GUI_FLAG = "--no-gui"
+
+
+def display_available() -> bool:
+    """ Whether Qt has somewhere to show windows, checked without importing PyQt5. """
+    if sys.platform in ("win32", "darwin"):
+        return True
+    # QT_QPA_PLATFORM covers platforms that need no display server, like "offscreen"
+    return any(len(os.environ.get(name, "")) for name in ("DISPLAY", "WAYLAND_DISPLAY", "QT_QPA_PLATFORM"))
+
+
+def gui_disabled() -> bool:
+    """ Whether the GUI was turned off, with the environment variable or with `--no-gui`
+    on the command line. This is checked before the command line is parsed, since the
+    Qt interface is registered when xappt discovers this package. """
+    if os.environ.get(APP_NO_GUI_ENV, "").lower() in TRUTHY_STRINGS + ("1", ):
+        return True
+    return NO_GUI_FLAG in sys.argv[1:]
+
+
+def gui_available() -> bool:
+    return display_available() and not gui_disabled()
@@ -0,0 +1,128 @@
+from array import array
+from typing import Optional
+
+__all__ = [
+    'LineStore',
+]
+
+
+class LineStore:
+    """ A compact, append-only store of text lines.
+
+    Every line is encoded into a single `bytearray`, and an array of offsets marks
+    where each line starts. A second array holds one stream flag per line. This
+    costs a few bytes per line instead of a full Python object.
+
+    When `max_lines` is exceeded the oldest lines are discarded in blocks of
+    `trim_slack` lines (10% of `max_lines` by default), so the store can hold slightly
+    more than `max_lines` lines between two trims.
+
+    Every line also has an id that doesn't change when older lines are discarded,
+    see `line_id` and `line_index`. """
+
+    ENCODING = "utf8"
+
+    def __init__(self, max_lines: int = 0, trim_slack: Optional[int] = None):
+        self.max_lines = max_lines
+        self.trim_slack = max(1, max_lines // 10) if trim_slack is None else trim_slack
+        self._buffer = bytearray()
+        self._offsets = array('Q', [0])
+        self._streams = array('B')
+        self._max_length = 0
+        self._removed_count = 0
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+    @property
+    def removed_count(self) -> int:
+        """ The number of lines that were discarded since the store was created. """
+        return self._removed_count
+
+    def line_id(self, index: int) -> int:
+        return self._removed_count + index
+
+    def line_index(self, line_id: int) -> int:
+        """ The current index of a line id, or -1 if it was discarded. """
+        index = line_id - self._removed_count
+        if 0 <= index < len(self):
+            return index
+        return -1
+
+    @property
+    def max_length(self) -> int:
+        """ The length of the longest line that was stored. """
+        return self._max_length
+
+    def append(self, text: str, stream: int = 0):
+        data = text.encode(self.ENCODING, errors="replace")
+        self._buffer += data
+        self._offsets.append(self._offsets[-1] + len(data))
+        self._streams.append(stream)
+        if len(text) > self._max_length:
+            self._max_length = len(text)
+
+    def replace_last(self, text: str, stream: int = 0):
+        if not len(self._streams):
+            self.append(text, stream)
+            return
+        start = self._offsets[-2] - self._offsets[0]
+        del self._buffer[start:]
+        del self._offsets[-1]
+        del self._streams[-1]
+        self.append(text, stream)
+
+    def line(self, index: int) -> str:
+        base = self._offsets[0]
+        start = self._offsets[index] - base
+        end = self._offsets[index + 1] - base
+        return self._buffer[start:end].decode(self.ENCODING, errors="replace")
+
+    def stream(self, index: int) -> int:
+        return self._streams[index]
+
+    def lines(self):
+        for i in range(len(self)):
+            yield self.line(i)
+
+    def excess(self) -> int:
+        """ The number of lines that `trim` would discard. """
+        if self.max_lines <= 0:
+            return 0
+        count = len(self)
+        if count <= self.max_lines or count < self.max_lines + self.trim_slack:
+            return 0
+        return count - self.max_lines
+
+    def trim(self) -> int:
+        count = self.excess()
+        if count:
+            self.remove_first(count)
+        return count
+
+    def remove_first(self, count: int):
+        count = min(count, len(self))
+        if count <= 0:
+            return
+        cut = self._offsets[count] - self._offsets[0]
+        del self._buffer[:cut]
+        del self._offsets[:count]
+        del self._streams[:count]
+        self._removed_count += count
+
+    def snapshot(self) -> "LineStore":
+        """ A copy that can be read from another thread while this store keeps changing. """
+        copy = LineStore(self.max_lines, self.trim_slack)
+        copy._buffer = bytearray(self._buffer)
+        copy._offsets = array('Q', self._offsets)
+        copy._streams = array('B', self._streams)
+        copy._max_length = self._max_length
+        copy._removed_count = self._removed_count
+        return copy
+
+    def clear(self):
+        self._removed_count += len(self)
+        self._buffer = bytearray()
+        self._offsets = array('Q', [0])
+        self._streams = array('B')
+        self._max_length = 0
@@ -0,0 +1,209 @@
+import gc
+import inspect
+import os
+import sys
+import tracemalloc
+
+from typing import Any, Awaitable, Callable, List, Optional
+
+import xappt
+
+from xappt.constants import TRUTHY_STRINGS
+
+from xappt_qt import config
+from xappt_qt.constants import APP_MEMORY_PROFILE_ENV
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def memory_profiling_requested() -> bool:
+    """ Whether memory profiling was turned on with the environment variable (or `--profile-memory`). """
+    return os.environ.get(APP_MEMORY_PROFILE_ENV, "").lower() in TRUTHY_STRINGS + ("1", )
+
+
+def format_size(size: int, *, signed: bool = False) -> str:
+    text = xappt.humanize_bytes(abs(size), decimal_places=1)
+    if size < 0:
+        return f"-{text}"
+    return f"+{text}" if signed else text
+
+
+def current_rss() -> Optional[int]:
+    """ The resident set size of this process in bytes, if it can be read. """
+    try:
+        with open("/proc/self/statm", "r") as fp:
+            return int(fp.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def peak_rss() -> Optional[int]:
+    """ The highest resident set size of this process in bytes, since it started or
+    since the last `reset_peak_rss`. """
+    try:
+        with open("/proc/self/status", "r") as fp:
+            for line in fp:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024  # bytes on macOS, KiB elsewhere
+
+
+def reset_peak_rss() -> bool:
+    """ Reset the peak that `peak_rss` reports, so it covers a single run. Only Linux
+    supports this, elsewhere the peak is the peak of the whole process. """
+    try:
+        with open("/proc/self/clear_refs", "w") as fp:
+            fp.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def start_tracing() -> bool:
+    """ Start tracing Python allocations. Returns False if they were already traced. """
+    if tracemalloc.is_tracing():
+        return False
+    tracemalloc.start(config.memory_profile_frames)
+    return True
+
+
+def take_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+
+
+def format_statistics(statistics: List[tracemalloc.StatisticDiff], *, diff: bool) -> List[str]:
+    lines = []
+    for stat in statistics[:config.memory_profile_summary_count]:
+        frame = stat.traceback[0]
+        location = f"{frame.filename}:{frame.lineno}"
+        if diff:
+            lines.append(f"  {format_size(stat.size_diff, signed=True):>12} {stat.count_diff:+9d} blocks  {location}")
+        else:
+            lines.append(f"  {format_size(stat.size):>12} {stat.count:9d} blocks  {location}")
+    if not len(lines):
+        lines.append("  (none)")
+    return lines
+
+
+class MemoryProfiler:
+    """ Measures the memory used by one run of a tool.
+
+    Reports the resident set size before and after the run and its peak during the
+    run, the Python allocations that were alive at the end of the run, grouped by the
+    line that made them, and what grew between the snapshots taken before and after
+    the run (that is, what the run left behind). Like `RunProfiler`, the coroutine of an
+    `async def execute` is measured wherever it is awaited. """
+
+    def __init__(self, tool: xappt.BaseTool, report: Callable[[str], None]):
+        self.tool = tool
+        self.report = report
+        self._started_tracing = False
+        self._before: Optional[tracemalloc.Snapshot] = None
+        self._rss_before: Optional[int] = None
+        self._peak_reset = False
+
+    def start(self):
+        self._started_tracing = start_tracing()
+        if hasattr(tracemalloc, "reset_peak"):  # python 3.9+, otherwise the peak is since tracing started
+            tracemalloc.reset_peak()
+        self._before = take_snapshot()
+        self._rss_before = current_rss()
+        self._peak_reset = reset_peak_rss()
+
+    def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        self.start()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:
+            self.finish()
+            raise
+        if inspect.isawaitable(result):
+            return self.run_awaitable(result)
+        self.finish()
+        return result
+
+    async def run_awaitable(self, awaitable: Awaitable) -> Any:
+        try:
+            return await awaitable
+        finally:
+            self.finish()
+
+    def finish(self):
+        gc.collect()
+        after = take_snapshot()
+        _, traced_peak = tracemalloc.get_traced_memory()
+        rss_after = current_rss()
+        rss_peak = peak_rss()
+        if self._started_tracing:
+            tracemalloc.stop()
+
+        lines = [f"\n=== {self.tool.name()} memory ==="]
+        if rss_after is not None:
+            rss_line = f"RSS: {format_size(self._rss_before)} -> {format_size(rss_after)}"
+            if rss_peak is not None:
+                rss_line += f" (peak {format_size(rss_peak)}{'' if self._peak_reset else ' for the process'})"
+            lines.append(rss_line)
+        elif rss_peak is not None:
+            lines.append(f"Peak RSS: {format_size(rss_peak)}")
+
+        growth = after.compare_to(self._before, "lineno")
+        retained = sum(stat.size_diff for stat in growth)
+        lines.append(f"Python allocations: {format_size(retained, signed=True)} retained, "
+                     f"peak {format_size(traced_peak)}")
+        lines.append("\nTop allocation sites:")
+        lines.extend(format_statistics(after.statistics("lineno"), diff=False))
+        lines.append("\nRetained growth:")
+        lines.extend(format_statistics([stat for stat in growth if stat.size_diff > 0], diff=True))
+        self.report("\n".join(lines) + "\n")
+
+
+class MemoryTracker:
+    """ Follows memory across the tools of a chain, to find what a tool leaves behind
+    once the next one is loaded, like pages or parameter callbacks that are never freed.
+
+    Call `checkpoint` whenever a tool is loaded. From the second call on, the growth
+    since the previous checkpoint is reported. """
+
+    def __init__(self, report: Callable[[str], None]):
+        self.report = report
+        self._started_tracing = start_tracing()
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._label = ""
+        self._rss: Optional[int] = None
+
+    def checkpoint(self, label: str):
+        gc.collect()  # count what's really still alive, not cycles waiting to be collected
+        snapshot = take_snapshot()
+        rss = current_rss()
+        if self._snapshot is not None:
+            growth = snapshot.compare_to(self._snapshot, "lineno")
+            retained = sum(stat.size_diff for stat in growth)
+            lines = [f"\n=== memory from {self._label} to {label} ==="]
+            if rss is not None and self._rss is not None:
+                lines.append(f"RSS: {format_size(rss - self._rss, signed=True)}")
+            lines.append(f"Python allocations: {format_size(retained, signed=True)}")
+            lines.extend(format_statistics([stat for stat in growth if stat.size_diff > 0], diff=True))
+            self.report("\n".join(lines) + "\n")
+        self._snapshot = snapshot
+        self._label = label
+        self._rss = rss
+
+    def close(self):
+        self._snapshot = None
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
@@ -0,0 +1,148 @@
+import json
+import os
+import pathlib
+import sys
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Type
+
+import xappt
+
+from xappt.config import log as logger
+
+import xappt_qt
+
+from xappt_qt.constants import APP_CONFIG_PATH
+from xappt_qt.utilities.tool_attributes import get_tool_icon, help_text
+
+MANIFEST_PATH = APP_CONFIG_PATH.joinpath("plugin_manifest.json")
+MANIFEST_FORMAT = 2
+
+
+class ToolManifestEntry(NamedTuple):
+    """ What the browser shows of a tool, without having to ask the tool class. """
+    name: str
+    collection: str
+    module: str
+    tooltip: str  # the help text, converted from markdown
+    search_text: str
+    icon: str
+    parameters: str  # the name and description of each parameter, one per line
+
+
+def module_file(module_name: str) -> Optional[str]:
+    module = sys.modules.get(module_name)
+    file_name = getattr(module, "__file__", None)
+    return None if file_name is None else os.path.normpath(file_name)
+
+
+def module_stamp(file_name: Optional[str]) -> Optional[List[int]]:
+    if file_name is None:
+        return None
+    try:
+        stat = os.stat(file_name)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def parameter_text(tool_class: Type[xappt.BaseTool]) -> str:
+    lines = []
+    for descriptor in tool_class.class_parameters():
+        setup = descriptor.param_setup_args
+        lines.append(f"{setup.get('name', '')} {setup.get('description', '')}".strip())
+    return "\n".join(lines)
+
+
+def build_entry(tool_class: Type[xappt.BaseTool]) -> ToolManifestEntry:
+    return ToolManifestEntry(
+        name=tool_class.name(),
+        collection=tool_class.collection(),
+        module=tool_class.__module__,
+        tooltip=help_text(tool_class, process_markdown=True, include_name=True),
+        search_text=f"{tool_class.name()}\n{tool_class.help()}",
+        icon=str(get_tool_icon(tool_class)),
+        parameters=parameter_text(tool_class),
+    )
+
+
+class PluginManifest:
+    """ The names, collections, help and icons of the registered tools, saved to the
+    app's config folder.
+
+    Entries are grouped by the file of the module that defines the tools, and reused
+    for as long as that file keeps its modification time and size. Only the tools of
+    modules that changed are asked for their help and icon again, which is what makes
+    the browser slow to start with a few hundred tools (converting the help text from
+    markdown, and finding icons through `importlib.resources`). """
+
+    def __init__(self, path: Optional[pathlib.Path] = None):
+        self.path = MANIFEST_PATH if path is None else path
+        self._modules: Dict[str, dict] = {}
+        self._dirty = False
+        self.load()
+
+    def stamp(self) -> str:
+        # the help is converted with xappt_qt's markdown settings, a new version may convert it differently
+        return f"{MANIFEST_FORMAT}:{xappt_qt.version_str}"
+
+    def load(self):
+        try:
+            with open(self.path, "r") as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get('stamp') != self.stamp():
+            return
+        self._modules = data.get('modules', {})
+
+    def save(self):
+        if not self._dirty:
+            return
+        data = {'stamp': self.stamp(), 'modules': self._modules}
+        temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "w") as fp:
+                json.dump(data, fp)
+            os.replace(temp_path, self.path)
+        except OSError as err:
+            logger.warning(f"Could not save the plugin manifest: {err}")
+        else:
+            self._dirty = False
+
+    def fresh_entries(self, module_key: str, stamp: Optional[List[int]]) -> Optional[List[ToolManifestEntry]]:
+        cached = self._modules.get(module_key)
+        if stamp is None or cached is None or cached.get('stamp') != stamp:
+            return None
+        try:
+            entries = [ToolManifestEntry(**entry) for entry in cached['tools']]
+        except (KeyError, TypeError):
+            return None
+        if not all(os.path.exists(entry.icon) for entry in entries):
+            return None
+        return entries
+
+    def entries(self, tools: Iterable[Type[xappt.BaseTool]]) -> List[ToolManifestEntry]:
+        """ The manifest entries of `tools`, updating the entries of modules that changed. """
+        by_module: Dict[str, List[Type[xappt.BaseTool]]] = {}
+        for tool_class in tools:
+            by_module.setdefault(tool_class.__module__, []).append(tool_class)
+
+        modules = {}
+        result = []
+        for module_name, tool_classes in by_module.items():
+            file_name = module_file(module_name)
+            module_key = module_name if file_name is None else file_name
+            stamp = module_stamp(file_name)
+            names = sorted(tool_class.name() for tool_class in tool_classes)
+            entries = self.fresh_entries(module_key, stamp)
+            if entries is None or sorted(entry.name for entry in entries) != names:
+                entries = [build_entry(tool_class) for tool_class in tool_classes]
+                self._dirty = True
+            modules[module_key] = {'stamp': stamp, 'tools': [entry._asdict() for entry in entries]}
+            result.extend(entries)
+
+        if set(modules.keys()) != set(self._modules.keys()):
+            self._dirty = True  # modules were removed
+        self._modules = modules
+        return result
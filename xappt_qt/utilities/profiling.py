@@ -0,0 +1,153 @@
+import cProfile
+import datetime
+import functools
+import inspect
+import io
+import os
+import pathlib
+import pstats
+
+from typing import Any, Awaitable, Callable, Optional, Type, Union
+
+from xappt import BaseTool
+from xappt.config import log as logger
+from xappt.constants import TRUTHY_STRINGS
+
+from xappt_qt import config
+from xappt_qt.constants import APP_PROFILE_ENV
+from xappt_qt.utilities.memory import MemoryProfiler
+from xappt_qt.utilities.tool_attributes import get_tool_log_directory
+
+PROFILE_SUFFIX = ".pstats"
+
+
+def profiling_requested() -> bool:
+    """ Whether profiling was turned on with the environment variable (or `--profile`). """
+    return os.environ.get(APP_PROFILE_ENV, "").lower() in TRUTHY_STRINGS + ("1", )
+
+
+def profiled(tool: BaseTool, report: Callable[[str], None], *, cpu: bool = False,
+             memory: bool = False) -> Callable[..., Any]:
+    """ `tool.execute`, wrapped in the profilers that are turned on. """
+    execute = tool.execute
+    if cpu:
+        execute = functools.partial(RunProfiler(tool, report).run, execute)
+    if memory:  # outside of cProfile, so the snapshots don't show up in the profile
+        execute = functools.partial(MemoryProfiler(tool, report).run, execute)
+    return execute
+
+
+def profile_path(tool: Union[Type[BaseTool], BaseTool]) -> pathlib.Path:
+    """ A new file for a profile of `tool`, in the same folder as its session logs. """
+    directory = get_tool_log_directory(tool)
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = f"{datetime.datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+    path = directory.joinpath(f"{stem}{PROFILE_SUFFIX}")
+    index = 1
+    while path.exists():
+        index += 1
+        path = directory.joinpath(f"{stem}-{index}{PROFILE_SUFFIX}")
+    return path
+
+
+def prune_profiles(directory: pathlib.Path, backup_count: int):
+    """ Remove all but the `backup_count` most recent profiles in `directory`. """
+    if backup_count <= 0:
+        return
+    profiles = [path for path in directory.iterdir() if path.is_file() and path.suffix == PROFILE_SUFFIX]
+    profiles.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in profiles[backup_count:]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+class ProfiledSteps:
+    """ Awaits `awaitable` with `profile` enabled only while one of its steps runs.
+
+    The event loop runs other callbacks between the steps of a coroutine (and the GUI
+    thread's loop is stepped by Qt, so everything else on that thread runs there too);
+    none of that is profiled. """
+
+    def __init__(self, profile: cProfile.Profile, awaitable: Awaitable):
+        self.profile = profile
+        self.awaitable = awaitable
+
+    def __await__(self):
+        steps = self.awaitable.__await__()
+        value, error = None, None
+        while True:
+            self.profile.enable()
+            try:
+                if error is None:
+                    yielded = steps.send(value)
+                else:
+                    yielded = steps.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.profile.disable()
+            value, error = None, None
+            try:
+                value = yield yielded
+            except GeneratorExit:
+                steps.close()
+                raise
+            except BaseException as err:  # noqa, cancellation and the like are passed on to the coroutine
+                error = err
+
+
+class RunProfiler:
+    """ Profiles one run of a tool with cProfile.
+
+    When the run is done, the profile is saved to a `.pstats` file (it can be opened
+    with `pstats`, snakeviz and similar tools) and `report` is called with the path and
+    the functions that took the most time. The result of an `async def execute` is
+    wrapped, so the coroutine is profiled wherever it is awaited, one step at a time:
+    the time it spends waiting isn't part of the profile. Only the thread that runs the
+    tool is profiled. """
+
+    def __init__(self, tool: BaseTool, report: Callable[[str], None], *, summary_count: Optional[int] = None):
+        self.tool = tool
+        self.report = report
+        self.summary_count = config.profile_summary_count if summary_count is None else summary_count
+        self.profile = cProfile.Profile()
+
+    def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        self.profile.enable()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:
+            self.profile.disable()
+            self.finish()
+            raise
+        self.profile.disable()
+        if inspect.isawaitable(result):
+            return self.run_awaitable(result)
+        self.finish()
+        return result
+
+    async def run_awaitable(self, awaitable: Awaitable) -> Any:
+        try:
+            return await ProfiledSteps(self.profile, awaitable)
+        finally:
+            self.finish()
+
+    def summary(self) -> str:
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)
+        stats.strip_dirs().sort_stats(pstats.SortKey.TIME).print_stats(self.summary_count)
+        return stream.getvalue().strip("\n")
+
+    def finish(self):
+        try:
+            path = profile_path(self.tool)
+            self.profile.dump_stats(str(path))
+        except OSError as err:
+            logger.warning(f"Could not save profile: {err}")
+            location = "Profile could not be saved"
+        else:
+            prune_profiles(path.parent, config.profile_backup_count)
+            location = f"Profile saved to {path}"
+        self.report(f"\n=== {self.tool.name()} profile ===\n{location}\n\n{self.summary()}\n")
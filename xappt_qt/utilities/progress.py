@@ -0,0 +1,131 @@
+import collections
+import threading
+import time
+
+from typing import Optional, Tuple
+
+__all__ = [
+    'ProgressTracker',
+    'format_duration',
+]
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+class ProgressTracker:
+    """ Keeps the latest progress value and decides when it is worth displaying.
+
+    `update` is cheap enough to be called in a tight loop: it only stores the value,
+    and samples it a few times per second to estimate the rate of progress. Displays
+    should call `time_until_refresh` to find out when to repaint, and `mark_refreshed`
+    once they did.
+
+    Threaded tools update the tracker while the GUI thread displays it, so every value
+    is read and written under a lock. Read `latest` or `display` rather than `message`
+    and `fraction`, they return values that belong to the same update. """
+
+    SAMPLE_INTERVAL = 0.25  # seconds
+    RATE_WINDOW = 10.0  # seconds of samples used for the rate and the ETA
+
+    def __init__(self, refresh_rate: float = 10.0):
+        self.refresh_interval = 1.0 / refresh_rate if refresh_rate > 0 else 0.0
+        self.message = ""
+        self.fraction = 0.0
+        self._samples = collections.deque(maxlen=int(self.RATE_WINDOW / self.SAMPLE_INTERVAL) + 1)
+        self._last_refresh = 0.0
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            self.message = ""
+            self.fraction = 0.0
+            self._samples.clear()
+            self._last_refresh = 0.0
+            self._dirty = False
+
+    @property
+    def dirty(self) -> bool:
+        """ True if there is a value that wasn't displayed yet. """
+        return self._dirty
+
+    def update(self, message: str, fraction: float):
+        now = time.monotonic()
+        with self._lock:
+            self.message = message
+            self.fraction = fraction
+            self._dirty = True
+
+            samples = self._samples
+            if len(samples):
+                last_time, last_fraction = samples[-1]
+                if fraction < last_fraction:  # progress started over
+                    samples.clear()
+                elif now - last_time < self.SAMPLE_INTERVAL:
+                    return
+            samples.append((now, fraction))
+
+    def time_until_refresh(self) -> float:
+        """ Seconds until the display may be refreshed again, 0 if it may be refreshed now. """
+        return max(0.0, self._last_refresh + self.refresh_interval - time.monotonic())
+
+    def mark_refreshed(self):
+        with self._lock:
+            self._last_refresh = time.monotonic()
+            self._dirty = False
+
+    def latest(self) -> Tuple[str, float]:
+        """ The message and fraction of the last update. """
+        with self._lock:
+            return self.message, self.fraction
+
+    def display(self) -> Tuple[float, str]:
+        """ The fraction of the last update and its `status_text`. """
+        with self._lock:
+            return self.fraction, self._status_text()
+
+    def rate(self) -> Optional[float]:
+        """ The average progress per second over the last few seconds. """
+        with self._lock:
+            return self._rate()
+
+    def eta(self) -> Optional[float]:
+        """ The estimated number of seconds until progress is complete. """
+        with self._lock:
+            return self._eta(self._rate())
+
+    def status_text(self) -> str:
+        """ The message, followed by the rate of progress and the ETA when they are known. """
+        with self._lock:
+            return self._status_text()
+
+    def _rate(self) -> Optional[float]:
+        if len(self._samples) < 2:
+            return None
+        first_time, first_fraction = self._samples[0]
+        last_time, last_fraction = self._samples[-1]
+        if last_time <= first_time:
+            return None
+        return (last_fraction - first_fraction) / (last_time - first_time)
+
+    def _eta(self, rate: Optional[float]) -> Optional[float]:
+        if rate is None or rate <= 0.0:
+            return None
+        return max(0.0, 1.0 - self.fraction) / rate
+
+    def _status_text(self) -> str:
+        rate = self._rate()
+        eta = self._eta(rate)
+        if rate is None or eta is None:
+            return self.message
+        details = f"{rate * 100.0:.1f}%/s, {format_duration(eta)} remaining"
+        if not len(self.message):
+            return details
+        return f"{self.message} ({details})"
@@ -0,0 +1,333 @@
+import copy
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import time
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import xappt
+
+from xappt.config import log as logger
+
+from xappt_qt import config
+from xappt_qt.constants import APP_CONFIG_PATH
+from xappt_qt.utilities.tool_attributes import get_cache_outputs, get_tool_data_keys, is_cacheable
+
+CACHE_PATH = APP_CONFIG_PATH.joinpath("result_cache")
+
+INPUT_UIS = ("file-open", "folder-select")
+OUTPUT_UIS = ("file-save", )
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class UncacheableRun(Exception):
+    """ The run depends on, or produces, something the cache can't key or restore. """
+
+
+def file_digest(path: pathlib.Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for block in iter(lambda: fp.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def walk_files(path: pathlib.Path) -> Iterator[Tuple[str, pathlib.Path]]:
+    """ The files below `path`, with their path relative to it, in a stable order. """
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = pathlib.Path(root, name)
+            yield file_path.relative_to(path).as_posix(), file_path
+
+
+def path_values(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [value] if len(value) else []
+    if isinstance(value, (list, tuple)):
+        return [item for item in value if isinstance(item, str) and len(item)]
+    return []
+
+
+def fingerprint(path: pathlib.Path, *, hash_contents: bool) -> Any:
+    """ Changes whenever the file (or any file in the folder) at `path` changes. Stat
+    based fingerprints are cheap, but also change when a file is touched without being
+    modified. """
+    def file_fingerprint(file_path: pathlib.Path) -> Any:
+        if hash_contents:
+            return file_digest(file_path)
+        stat = file_path.stat()
+        return [stat.st_size, stat.st_mtime_ns]
+
+    if path.is_file():
+        return file_fingerprint(path)
+    if path.is_dir():
+        return [[name, file_fingerprint(file_path)] for name, file_path in walk_files(path)]
+    return None
+
+
+def json_copy(value: Any) -> Any:
+    """ `value` as it would come back from the cache, or `UncacheableRun` if it can't be stored. """
+    try:
+        return json.loads(json.dumps(value))
+    except (TypeError, ValueError) as err:
+        raise UncacheableRun(f"the value can't be stored: {err}")
+
+
+def cached_run(tool: xappt.BaseTool, tool_data: Dict[str, Any]) -> Optional["CachedRun"]:
+    """ A `CachedRun` for `tool`, or None if it isn't cacheable or caching is turned off. """
+    if not config.result_cache_enabled or not is_cacheable(tool):
+        return None
+    run = CachedRun(tool, tool_data)
+    return run if run.key is not None else None
+
+
+class ResultCache:
+    """ Stores the results of cacheable tools, so a run with the same inputs can be
+    skipped and its results restored instead.
+
+    Every output file is stored once in a content-addressed store (a file named after
+    the hash of its contents), and an entry per run lists the files of each output with
+    the exit code and the `tool_data` updates of the run. Entries are evicted least
+    recently used first, once the stored files exceed `max_bytes`. """
+
+    def __init__(self, path: Optional[pathlib.Path] = None, max_bytes: Optional[int] = None):
+        self.path = CACHE_PATH if path is None else path
+        self.max_bytes = config.result_cache_max_bytes if max_bytes is None else max_bytes
+        self.objects_path = self.path.joinpath("objects")
+        self.entries_path = self.path.joinpath("entries")
+
+    def object_path(self, digest: str) -> pathlib.Path:
+        return self.objects_path.joinpath(digest[:2], digest[2:])
+
+    def entry_path(self, key: str) -> pathlib.Path:
+        return self.entries_path.joinpath(f"{key}.json")
+
+    @staticmethod
+    def _write_atomic(target: pathlib.Path, write):
+        """ Write to a temporary file next to `target` and move it in place, so other
+        processes never see a partial file. """
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                write(fp)
+            os.replace(temp_name, target)
+        except BaseException:
+            try:
+                os.unlink(temp_name)
+            except OSError:
+                pass
+            raise
+
+    def add_file(self, source: pathlib.Path) -> Tuple[str, int]:
+        digest = file_digest(source)
+        target = self.object_path(digest)
+        if not target.is_file():
+            with open(source, "rb") as src:
+                self._write_atomic(target, lambda dst: shutil.copyfileobj(src, dst))
+        return digest, target.stat().st_size
+
+    def restore_file(self, digest: str, target: pathlib.Path):
+        if target.is_file() and file_digest(target) == digest:
+            return
+        with open(self.object_path(digest), "rb") as src:
+            self._write_atomic(target, lambda dst: shutil.copyfileobj(src, dst))
+
+    def lookup(self, key: str) -> Optional[dict]:
+        path = self.entry_path(key)
+        try:
+            with open(path, "r") as fp:
+                entry = json.load(fp)
+        except (OSError, ValueError):
+            return None
+        try:
+            if not all(self.object_path(digest).is_file() for digest in self.entry_objects(entry)):
+                return None
+        except (KeyError, TypeError, ValueError):  # written by an incompatible version
+            return None
+        try:
+            os.utime(path)  # the modification time of an entry is its last use
+        except OSError:
+            pass
+        return entry
+
+    def restore(self, entry: dict):
+        for output in entry['outputs'].values():
+            if output['kind'] == "file":
+                self.restore_file(output['digest'], pathlib.Path(output['path']))
+            else:
+                folder = pathlib.Path(output['path'])
+                folder.mkdir(parents=True, exist_ok=True)
+                for name, digest, _ in output['files']:
+                    self.restore_file(digest, folder.joinpath(name))
+
+    def store(self, key: str, entry: dict):
+        data = json.dumps(entry, indent=2).encode("utf8")
+        self._write_atomic(self.entry_path(key), lambda fp: fp.write(data))
+        self.evict()
+
+    def add_output(self, path: pathlib.Path) -> dict:
+        if path.is_file():
+            digest, size = self.add_file(path)
+            return {'kind': "file", 'path': str(path), 'digest': digest, 'size': size}
+        if path.is_dir():
+            files = [[name, *self.add_file(file_path)] for name, file_path in walk_files(path)]
+            return {'kind': "folder", 'path': str(path), 'files': files}
+        raise UncacheableRun(f"the output {path} was not created")
+
+    @staticmethod
+    def entry_objects(entry: dict) -> List[str]:
+        digests = []
+        for output in entry['outputs'].values():
+            if output['kind'] == "file":
+                digests.append(output['digest'])
+            else:
+                digests.extend(digest for _, digest, _ in output['files'])
+        return digests
+
+    def evict(self):
+        """ Remove the least recently used entries until the stored files fit in
+        `max_bytes`, and every stored file that no entry uses any more. """
+        entries = []
+        references: Dict[str, int] = {}
+        for path in self.entries_path.glob("*.json"):
+            try:
+                with open(path, "r") as fp:
+                    digests = set(self.entry_objects(json.load(fp)))
+                last_used = path.stat().st_mtime
+            except (OSError, ValueError, KeyError):
+                continue
+            entries.append((last_used, path, digests))
+            for digest in digests:
+                references[digest] = references.get(digest, 0) + 1
+        entries.sort(key=lambda e: e[0])
+
+        sizes: Dict[str, int] = {}
+        for path in self.objects_path.glob("*/*"):
+            if path.name.startswith(".tmp-"):
+                continue
+            try:
+                sizes[path.parent.name + path.name] = path.stat().st_size
+            except OSError:
+                pass
+
+        def remove_object(object_digest: str):
+            try:
+                self.object_path(object_digest).unlink()
+            except OSError:
+                pass
+            sizes.pop(object_digest, None)
+
+        for digest in [digest for digest in sizes if digest not in references]:
+            remove_object(digest)
+
+        total = sum(sizes.values())
+        for _, path, digests in entries:
+            if self.max_bytes <= 0 or total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            for digest in digests:
+                references[digest] -= 1
+                if references[digest] == 0:
+                    total -= sizes.get(digest, 0)
+                    remove_object(digest)
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+class CachedRun:
+    """ One run of a cacheable tool: builds the key of the run before it executes, then
+    either restores a stored result or stores the result once the run is done.
+
+    The key covers the tool's name, collection and version, its parameter values, the
+    `tool_data` it depends on, and a fingerprint of every `file-open` and `folder-select`
+    input. The outputs are the `file-save` parameters, or the parameters named in the
+    tool's `cache_outputs`. Only successful runs are stored. """
+
+    def __init__(self, tool: xappt.BaseTool, tool_data: Dict[str, Any], cache: Optional[ResultCache] = None):
+        self.tool = tool
+        self.tool_data = tool_data
+        self.cache = ResultCache() if cache is None else cache
+        self.key: Optional[str] = None
+        self._tool_data_before: Dict[str, Any] = {}
+        try:
+            self.key = self.build_key()
+            self._tool_data_before = copy.deepcopy(tool_data)
+        except (UncacheableRun, OSError, copy.Error, TypeError) as err:
+            logger.debug(f"{tool.name()} can't be cached: {err}")
+            self.key = None
+
+    def build_key(self) -> str:
+        tool = self.tool
+        tool_data_keys = get_tool_data_keys(tool)
+        if tool_data_keys is None:
+            tool_data_keys = self.tool_data.keys()
+        inputs = {}
+        for param in tool.parameters():
+            if param.options.get("ui") in INPUT_UIS:
+                inputs[param.name] = [fingerprint(pathlib.Path(value), hash_contents=config.result_cache_hash_inputs)
+                                      for value in path_values(param.value)]
+        key_data = {
+            'tool': f"{tool.collection()}::{tool.name()}",
+            'version': str(getattr(tool, "version", "")),
+            'parameters': json_copy(tool.param_dict()),
+            'tool_data': json_copy({key: self.tool_data.get(key) for key in sorted(tool_data_keys)}),
+            'inputs': inputs,
+        }
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode("utf8")).hexdigest()
+
+    def output_paths(self) -> Dict[str, pathlib.Path]:
+        names = get_cache_outputs(self.tool)
+        outputs = {}
+        for param in self.tool.parameters():
+            if names is None and param.options.get("ui") not in OUTPUT_UIS:
+                continue
+            if names is not None and param.name not in names:
+                continue
+            for index, value in enumerate(path_values(param.value)):
+                outputs[f"{param.name}[{index}]"] = pathlib.Path(value).absolute()
+        return outputs
+
+    def restore(self) -> Optional[int]:
+        """ Restore the outputs and `tool_data` updates of a stored run with the same
+        key. Returns its exit code, or None if there's nothing to restore. """
+        if self.key is None:
+            return None
+        entry = self.cache.lookup(self.key)
+        if entry is None:
+            return None
+        try:
+            self.cache.restore(entry)
+        except (OSError, KeyError) as err:
+            logger.warning(f"Could not restore the cached result of {self.tool.name()}: {err}")
+            return None
+        self.tool_data.update(entry['tool_data'])
+        return entry['exit_code']
+
+    def store(self, exit_code: int):
+        if self.key is None or exit_code != 0:
+            return
+        missing = object()
+        try:
+            updates = json_copy({key: value for key, value in self.tool_data.items()
+                                 if self._tool_data_before.get(key, missing) != value})
+            outputs = {name: self.cache.add_output(path) for name, path in self.output_paths().items()}
+            self.cache.store(self.key, {
+                'tool': f"{self.tool.collection()}::{self.tool.name()}",
+                'created': time.time(),
+                'exit_code': exit_code,
+                'outputs': outputs,
+                'tool_data': updates,
+            })
+        except (UncacheableRun, OSError, ValueError) as err:
+            logger.warning(f"Could not cache the result of {self.tool.name()}: {err}")
@@ -0,0 +1,236 @@
+import datetime
+import hashlib
+import json
+import pathlib
+import sqlite3
+import sys
+import time
+
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import xappt
+
+from xappt.config import log as logger
+
+import xappt_qt
+
+from xappt_qt import config
+from xappt_qt.constants import APP_CONFIG_PATH
+from xappt_qt.utilities.memory import peak_rss, reset_peak_rss
+
+HISTORY_PATH = APP_CONFIG_PATH.joinpath("history.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL,
+    tool TEXT NOT NULL,
+    collection TEXT NOT NULL,
+    interface TEXT NOT NULL,
+    parameter_hash TEXT NOT NULL,
+    validate_time REAL,
+    execute_time REAL,
+    teardown_time REAL,
+    exit_code INTEGER,
+    peak_rss INTEGER,
+    versions TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_tool ON runs (collection, tool, started);
+"""
+
+
+def parameter_hash(parameters: Dict[str, Any]) -> str:
+    """ A short hash of parameter values, runs with the same hash used the same values. """
+    data = json.dumps(parameters, sort_keys=True, default=str)
+    return hashlib.sha1(data.encode("utf8")).hexdigest()[:12]
+
+
+def library_versions(tool: Union[xappt.BaseTool, type]) -> str:
+    versions = {
+        'xappt_qt': xappt_qt.version_str,
+        'xappt': xappt.version_str,
+        'python': ".".join(map(str, sys.version_info[:3])),
+    }
+    tool_version = getattr(tool, "version", None)
+    if tool_version is not None:
+        versions['tool'] = str(tool_version)
+    return " ".join(f"{name}={version}" for name, version in versions.items())
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """ The value below which `fraction` of `values` fall, interpolated between the
+    closest ranks. `values` must be sorted. """
+    if not len(values):
+        return None
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class RunRecord(NamedTuple):
+    started: float  # unix time
+    tool: str
+    collection: str
+    interface: str
+    parameter_hash: str
+    validate_time: Optional[float]  # seconds
+    execute_time: Optional[float]
+    teardown_time: Optional[float]
+    exit_code: Optional[int]
+    peak_rss: Optional[int]  # bytes, the peak of the process that ran the tool
+    versions: str
+
+    @property
+    def started_datetime(self) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self.started)
+
+
+class ToolStatistics(NamedTuple):
+    tool: str
+    collection: str
+    runs: int
+    failures: int
+    p50: Optional[float]  # execute time percentiles, in seconds
+    p90: Optional[float]
+    p99: Optional[float]
+    slowest: Optional[float]
+    last_run: float
+
+
+class RunHistory:
+    """ A local record of tool runs, stored in an SQLite database in the app's config
+    folder, so the durations of a tool can be compared across tool and library upgrades.
+
+    Several processes may record runs at the same time (every tool launched from the
+    browser runs in its own process), SQLite takes care of the locking. """
+
+    def __init__(self, path: Optional[pathlib.Path] = None):
+        self.path = HISTORY_PATH if path is None else path
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.path), timeout=5.0)
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def add(self, record: RunRecord):
+        with self.connection() as connection:
+            fields = ", ".join(RunRecord._fields)
+            placeholders = ", ".join("?" for _ in RunRecord._fields)
+            connection.execute(f"INSERT INTO runs ({fields}) VALUES ({placeholders})", tuple(record))
+        self.prune(config.run_history_max_records)
+
+    def prune(self, max_records: int):
+        if max_records <= 0:
+            return
+        with self.connection() as connection:
+            connection.execute("DELETE FROM runs WHERE id <= (SELECT MAX(id) FROM runs) - ?", (max_records, ))
+
+    def clear(self):
+        with self.connection() as connection:
+            connection.execute("DELETE FROM runs")
+
+    def runs(self, collection: str, tool: str, limit: int = 1000) -> List[RunRecord]:
+        """ The most recent runs of a tool, newest first. """
+        fields = ", ".join(RunRecord._fields)
+        cursor = self.connection().execute(
+            f"SELECT {fields} FROM runs WHERE collection = ? AND tool = ? ORDER BY started DESC LIMIT ?",
+            (collection, tool, limit))
+        return [RunRecord(*row) for row in cursor.fetchall()]
+
+    def last_runs(self) -> Dict[Tuple[str, str], float]:
+        """ When each tool was last run, by collection and tool name. """
+        cursor = self.connection().execute("SELECT collection, tool, MAX(started) FROM runs GROUP BY collection, tool")
+        return {(collection, tool): started for collection, tool, started in cursor}
+
+    def statistics(self) -> List[ToolStatistics]:
+        """ Execute time percentiles of every tool that was run. Failed runs are counted,
+        but left out of the percentiles. """
+        cursor = self.connection().execute(
+            "SELECT collection, tool, execute_time, exit_code, started FROM runs ORDER BY collection, tool")
+        grouped: Dict[tuple, dict] = {}
+        for collection, tool, execute_time, exit_code, started in cursor:
+            group = grouped.setdefault((collection, tool), {'times': [], 'runs': 0, 'failures': 0, 'last': 0.0})
+            group['runs'] += 1
+            group['last'] = max(group['last'], started)
+            if exit_code != 0:
+                group['failures'] += 1
+            elif execute_time is not None:
+                group['times'].append(execute_time)
+
+        statistics = []
+        for (collection, tool), group in grouped.items():
+            times = sorted(group['times'])
+            statistics.append(ToolStatistics(tool=tool, collection=collection, runs=group['runs'],
+                                             failures=group['failures'], p50=percentile(times, 0.5),
+                                             p90=percentile(times, 0.9), p99=percentile(times, 0.99),
+                                             slowest=times[-1] if len(times) else None, last_run=group['last']))
+        return statistics
+
+
+class RunRecorder:
+    """ Times the phases of one run of a tool and adds it to the run history.
+
+    Call `validated` once the parameters were validated (if the interface validates
+    them), `executed` when `execute` returned, and `finish` once the interface is done
+    with the run. Recording never raises, a history that can't be written is only
+    logged.
+
+    The peak memory is the peak of this process during the run, unless `measure_peak`
+    is off, for runs that share the process with other runs, or runs in another process
+    that pass their own peak to `finish`. """
+
+    def __init__(self, tool: xappt.BaseTool, interface: str, *, measure_peak: bool = True):
+        self.tool = tool
+        self.interface = interface
+        self.started = time.time()
+        self.parameter_hash = parameter_hash(tool.param_dict())
+        self._start = time.perf_counter()
+        self._validated: Optional[float] = None
+        self._executed: Optional[float] = None
+        self._peak_reset = measure_peak and reset_peak_rss()
+
+    def validated(self):
+        self._validated = time.perf_counter()
+
+    def executed(self):
+        if self._executed is None:
+            self._executed = time.perf_counter()
+
+    def finish(self, exit_code: Optional[int], *, peak: Optional[int] = None):
+        """ `peak` is the peak RSS of the process the tool ran in, in bytes. """
+        if not config.run_history_enabled:
+            return
+        finished = time.perf_counter()
+        execute_start = self._start if self._validated is None else self._validated
+        execute_end = finished if self._executed is None else self._executed
+        if peak is None and self._peak_reset:
+            peak = peak_rss()
+        record = RunRecord(
+            started=self.started,
+            tool=self.tool.name(),
+            collection=self.tool.collection(),
+            interface=self.interface,
+            parameter_hash=self.parameter_hash,
+            validate_time=None if self._validated is None else self._validated - self._start,
+            execute_time=execute_end - execute_start,
+            teardown_time=finished - execute_end,
+            exit_code=exit_code if isinstance(exit_code, int) else None,
+            peak_rss=peak,
+            versions=library_versions(self.tool),
+        )
+        history = RunHistory()
+        try:
+            history.add(record)
+        except (sqlite3.Error, OSError) as err:
+            logger.warning(f"Could not record the run in the history: {err}")
+        finally:
+            history.close()
@@ -0,0 +1,83 @@
+import tempfile
+
+from collections import deque
+from typing import Deque, Generator, IO, Optional, TextIO
+
+__all__ = [
+    'ScrollbackBuffer',
+]
+
+
+class ScrollbackBuffer:
+    """ Keeps the most recent `max_lines` lines in memory. Lines that fall out of
+    the in-memory ring buffer are appended to a temporary file on disk, so that the
+    full output can still be retrieved with `lines()` or `save()`. """
+
+    def __init__(self, max_lines: int):
+        self._lines: Deque[str] = deque(maxlen=max(1, max_lines))
+        self._spill_file: Optional[IO[str]] = None
+        self._spilled_count = 0
+
+    def __len__(self) -> int:
+        return self._spilled_count + len(self._lines)
+
+    @property
+    def max_lines(self) -> int:
+        return self._lines.maxlen
+
+    @property
+    def spilled_count(self) -> int:
+        return self._spilled_count
+
+    def append(self, line: str):
+        if len(self._lines) == self._lines.maxlen:
+            self._spill(self._lines[0])
+        self._lines.append(line)
+
+    def replace_last(self, line: str):
+        if not len(self._lines):
+            self.append(line)
+            return
+        self._lines[-1] = line
+
+    def _spill(self, line: str):
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile("w+", encoding="utf8", newline="\n")
+        self._spill_file.seek(0, 2)  # `lines()` may have left the read position elsewhere
+        self._spill_file.write(line)
+        self._spill_file.write("\n")
+        self._spilled_count += 1
+
+    def clear(self):
+        self._lines.clear()
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+        self._spilled_count = 0
+
+    def lines(self) -> Generator[str, None, None]:
+        if self._spill_file is not None:
+            self._spill_file.flush()
+            self._spill_file.seek(0)
+            for line in self._spill_file:
+                yield line[:-1]
+        yield from list(self._lines)
+
+    def recent_lines(self) -> Generator[str, None, None]:
+        """ Only the lines that are still held in memory. """
+        yield from self._lines
+
+    def save(self, fp: TextIO, line_separator: str = "\n"):
+        for line in self.lines():
+            fp.write(line)
+            fp.write(line_separator)
+
+    def text(self, line_separator: str = "\n") -> str:
+        return line_separator.join(self.lines())
+
+    def close(self):
+        self.clear()
+
+    def __del__(self):
+        if self._spill_file is not None:
+            self._spill_file.close()
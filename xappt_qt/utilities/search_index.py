@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import pathlib
+import re
+import time
+
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from xappt.config import log as logger
+
+from xappt_qt.constants import APP_CONFIG_PATH
+from xappt_qt.utilities.plugin_manifest import ToolManifestEntry
+
+SEARCH_INDEX_PATH = APP_CONFIG_PATH.joinpath("search_index.json")
+SEARCH_INDEX_FORMAT = 1
+
+# a match in a tool's name counts more than a match in its help
+FIELD_WEIGHTS = (
+    ("name", 4.0),
+    ("collection", 2.0),
+    ("parameters", 1.5),
+    ("help", 1.0),
+)
+MIN_SIMILARITY = 0.4  # of the trigrams of a misspelled word and the word it's matched with
+SHORT_TOKEN_LENGTH = 3  # shorter search terms are only matched as part of a word, they have too few trigrams
+
+RECENT_USE_WEIGHT = 0.5  # a tool that was used just now scores up to this much higher
+RECENT_USE_HALF_LIFE = 7 * 24 * 60 * 60  # seconds
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """ The lowercase words and numbers of `text`, names like "convert-x265" are split. """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(term: str, token: str) -> float:
+    """ How well `token` matches the search term, 1.0 for the same word. """
+    if term == token:
+        return 1.0
+    if token.startswith(term):
+        return 0.9
+    if term in token:
+        return 0.75
+    if len(term) < SHORT_TOKEN_LENGTH:
+        return 0.0
+    term_trigrams = trigrams(term)
+    token_trigrams = trigrams(token)
+    dice = 2.0 * len(term_trigrams & token_trigrams) / (len(term_trigrams) + len(token_trigrams))
+    return 0.7 * dice if dice >= MIN_SIMILARITY else 0.0
+
+
+def entry_fields(entry: ToolManifestEntry) -> Iterable[Tuple[str, str]]:
+    values = {
+        'name': entry.name,
+        'collection': entry.collection,
+        'parameters': entry.parameters,
+        'help': entry.search_text,
+    }
+    for field, _ in FIELD_WEIGHTS:
+        yield field, values[field]
+
+
+def index_key(entries: Sequence[ToolManifestEntry]) -> str:
+    data = [[text for _, text in entry_fields(entry)] for entry in entries]
+    return hashlib.sha1(json.dumps(data).encode("utf8")).hexdigest()
+
+
+def recency_boost(last_used: Optional[float], now: float) -> float:
+    if last_used is None:
+        return 1.0
+    age = max(0.0, now - last_used)
+    return 1.0 + RECENT_USE_WEIGHT * 0.5 ** (age / RECENT_USE_HALF_LIFE)
+
+
+class SearchIndex:
+    """ A token and trigram index of the tools in the browser, for ranked, typo tolerant
+    searches.
+
+    Every word of a tool's name, collection, parameters and help is a token. Each token
+    lists the tools it appears in with the weight of the most important field it was
+    found in, and each trigram lists the tokens it appears in, so a search term is only
+    compared with the tokens that share a trigram with it. A tool matches when every
+    search term matches one of its tokens, and scores the sum of the best match of each
+    term, boosted by how recently the tool was used.
+
+    Tools are numbered in the order of the entries the index was built from. The index
+    is saved next to the plugin manifest, and rebuilt when the entries change. """
+
+    def __init__(self, vocabulary: List[str], postings: List[List[List[float]]], trigram_map: Dict[str, List[int]]):
+        self.vocabulary = vocabulary
+        self.postings = postings  # per token, [[tool, weight], ...]
+        self.trigram_map = trigram_map
+        self._matches: Dict[str, List[Tuple[int, float]]] = {}
+
+    @classmethod
+    def build(cls, entries: Sequence[ToolManifestEntry]) -> "SearchIndex":
+        token_ids: Dict[str, int] = {}
+        postings: List[Dict[int, float]] = []
+        weights = dict(FIELD_WEIGHTS)
+        for row, entry in enumerate(entries):
+            for field, text in entry_fields(entry):
+                weight = weights[field]
+                for token in tokenize(text):
+                    token_id = token_ids.setdefault(token, len(token_ids))
+                    if token_id == len(postings):
+                        postings.append({})
+                    if postings[token_id].get(row, 0.0) < weight:
+                        postings[token_id][row] = weight
+
+        trigram_map: Dict[str, List[int]] = {}
+        for token, token_id in token_ids.items():
+            for trigram in trigrams(token):
+                trigram_map.setdefault(trigram, []).append(token_id)
+        vocabulary = sorted(token_ids, key=token_ids.get)
+        return cls(vocabulary, [[[row, weight] for row, weight in p.items()] for p in postings], trigram_map)
+
+    @classmethod
+    def load(cls, entries: Sequence[ToolManifestEntry], path: Optional[pathlib.Path] = None) -> "SearchIndex":
+        """ The saved index if it was built from `entries`, otherwise a new index that is
+        saved for the next start. """
+        path = SEARCH_INDEX_PATH if path is None else path
+        key = index_key(entries)
+        try:
+            with open(path, "r") as fp:
+                data = json.load(fp)
+            if data.get('format') == SEARCH_INDEX_FORMAT and data.get('key') == key:
+                return cls(data['vocabulary'], data['postings'], data['trigrams'])
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        index = cls.build(entries)
+        index.save(key, path)
+        return index
+
+    def save(self, key: str, path: pathlib.Path):
+        data = {
+            'format': SEARCH_INDEX_FORMAT,
+            'key': key,
+            'vocabulary': self.vocabulary,
+            'postings': self.postings,
+            'trigrams': self.trigram_map,
+        }
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "w") as fp:
+                json.dump(data, fp, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except OSError as err:
+            logger.warning(f"Could not save the search index: {err}")
+
+    def match_term(self, term: str) -> List[Tuple[int, float]]:
+        """ The tokens that match `term`, with their similarity. """
+        matches = self._matches.get(term)
+        if matches is not None:
+            return matches
+        if len(term) < SHORT_TOKEN_LENGTH:
+            candidates: Iterable[int] = range(len(self.vocabulary))
+        else:
+            candidates = set()
+            for trigram in trigrams(term):
+                candidates.update(self.trigram_map.get(trigram, ()))
+        matches = []
+        for token_id in candidates:
+            score = similarity(term, self.vocabulary[token_id])
+            if score > 0.0:
+                matches.append((token_id, score))
+        self._matches[term] = matches
+        return matches
+
+    def search(self, text: str, last_used: Optional[Dict[int, float]] = None) -> Optional[Dict[int, float]]:
+        """ The score of every tool that matches `text`, by tool number. None if `text`
+        has no words, which matches every tool. `last_used` has the time each tool was
+        last used. """
+        terms = tokenize(text)
+        if not len(terms):
+            return None
+        scores: Optional[Dict[int, float]] = None
+        for term in dict.fromkeys(terms):
+            term_scores: Dict[int, float] = {}
+            for token_id, token_similarity in self.match_term(term):
+                for row, weight in self.postings[token_id]:
+                    row = int(row)
+                    score = token_similarity * weight
+                    if score > term_scores.get(row, 0.0):
+                        term_scores[row] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {row: score + term_scores[row] for row, score in scores.items() if row in term_scores}
+            if not len(scores):
+                break
+
+        last_used = {} if last_used is None else last_used
+        now = time.time()
+        return {row: score * recency_boost(last_used.get(row), now) for row, score in scores.items()}
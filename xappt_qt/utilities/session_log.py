@@ -0,0 +1,159 @@
+import datetime
+import gzip
+import os
+import pathlib
+import shutil
+import threading
+
+from typing import BinaryIO, List, Union
+
+__all__ = [
+    'SessionLog',
+]
+
+
+class SessionLog:
+    """ Streams the output of a tool session to a log file, one timestamped line
+    per record.
+
+    Each session writes to its own file inside `directory`. When the file grows past
+    `max_bytes` it is moved aside as a numbered part (compressed with gzip in a
+    background thread if `compress` is set) and a new part is started. Only the
+    `backup_count` most recent files from previous sessions are kept. """
+
+    STREAM_NAMES = {
+        0: "stdout",
+        1: "stderr",
+    }
+
+    def __init__(self, directory: pathlib.Path, *, title: str = "", max_bytes: int = 0,
+                 backup_count: int = 0, compress: bool = True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.session_name = f"{datetime.datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+        self.path = self.directory.joinpath(f"{self.session_name}.log")
+        self._parts: List[pathlib.Path] = []  # rotated parts of this session, oldest first
+        self._compress_threads: List[threading.Thread] = []
+        self._size = 0
+        self._records = 0
+
+        self._fp = self.path.open("w", encoding="utf8", newline="\n")
+        if len(title):
+            self._write_record(f"=== {title} ===")
+            self._records = 0  # the title alone doesn't make the log worth keeping
+
+        self.prune()
+
+    @property
+    def closed(self) -> bool:
+        return self._fp is None
+
+    @property
+    def record_count(self) -> int:
+        return self._records
+
+    def write(self, text: str, stream: int = 0):
+        if self._fp is None or not len(text):
+            return
+        label = self.STREAM_NAMES.get(stream, str(stream))
+        for line in text.splitlines():
+            self._write_record(f"[{label}] {line}")
+        if 0 < self.max_bytes <= self._size:
+            self.rotate()
+
+    def write_stdout(self, text: str):
+        self.write(text, 0)
+
+    def write_stderr(self, text: str):
+        self.write(text, 1)
+
+    def _write_record(self, text: str):
+        record = f"{datetime.datetime.now().isoformat(sep=' ', timespec='milliseconds')} {text}\n"
+        self._fp.write(record)
+        self._size += len(record.encode("utf8"))  # max_bytes is in bytes, not characters
+        self._records += 1
+
+    def rotate(self):
+        if self._fp is None:
+            return
+        self._fp.close()
+
+        part_path = self.directory.joinpath(f"{self.session_name}.{len(self._parts) + 1:03d}.log")
+        self.path.rename(part_path)
+        if self.compress:
+            compressed_path = part_path.with_suffix(".log.gz")
+            self._parts.append(compressed_path)
+            thread = threading.Thread(target=self._compress_part, args=(part_path, compressed_path), daemon=True)
+            self._compress_threads.append(thread)
+            thread.start()
+        else:
+            self._parts.append(part_path)
+
+        self._fp = self.path.open("w", encoding="utf8", newline="\n")
+        self._size = 0
+
+    @staticmethod
+    def _compress_part(source: pathlib.Path, destination: pathlib.Path):
+        with source.open("rb") as fp_in, gzip.open(destination, "wb") as fp_out:
+            shutil.copyfileobj(fp_in, fp_out)
+        source.unlink()
+
+    def _wait_for_compression(self):
+        for thread in self._compress_threads:
+            thread.join()
+        self._compress_threads.clear()
+
+    def _session_files(self) -> List[pathlib.Path]:
+        return self._parts + [self.path]
+
+    def prune(self):
+        """ Remove the oldest log files of previous sessions. """
+        if self.backup_count <= 0:
+            return
+        own_files = set(self._session_files())
+        previous = [path for path in self.directory.iterdir()
+                    if path.is_file() and path not in own_files and path.name.endswith((".log", ".log.gz"))]
+        previous.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+        for path in previous[self.backup_count:]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def save(self, destination: Union[str, pathlib.Path]):
+        """ Copy the whole session, including rotated parts, to an uncompressed file. """
+        if self._fp is not None:
+            self._fp.flush()
+        self._wait_for_compression()
+        with open(destination, "wb") as fp_out:
+            for path in self._session_files():
+                if not path.is_file():
+                    continue
+                self._copy_part(path, fp_out)
+
+    @staticmethod
+    def _copy_part(path: pathlib.Path, fp_out: BinaryIO):
+        if path.suffix == ".gz":
+            with gzip.open(path, "rb") as fp_in:
+                shutil.copyfileobj(fp_in, fp_out)
+        else:
+            with path.open("rb") as fp_in:
+                shutil.copyfileobj(fp_in, fp_out)
+
+    def close(self):
+        if self._fp is None:
+            return
+        self._fp.close()
+        self._fp = None
+        self._wait_for_compression()
+        if self._records == 0 and not len(self._parts):
+            self.path.unlink()
+
+    def __del__(self):
+        if getattr(self, "_fp", None) is not None:
+            self._fp.close()
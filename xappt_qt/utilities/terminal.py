@@ -0,0 +1,270 @@
+import re
+
+from typing import List, NamedTuple, Optional, Tuple
+
+__all__ = [
+    'Color',
+    'DEFAULT_STYLE',
+    'TextStyle',
+    'TextRun',
+    'ParsedLine',
+    'TerminalLineParser',
+    'strip_ansi',
+    'split_output',
+]
+
+Color = Tuple[int, int, int]
+
+ANSI_COLORS: Tuple[Color, ...] = (
+    (0, 0, 0), (205, 49, 49), (13, 188, 121), (229, 229, 16),
+    (36, 114, 200), (188, 63, 188), (17, 168, 205), (229, 229, 229),
+    (102, 102, 102), (241, 76, 76), (35, 209, 139), (245, 245, 67),
+    (59, 142, 234), (214, 112, 214), (41, 184, 219), (255, 255, 255),
+)
+
+TOKEN_RE = re.compile(r"(\x1b\[[0-?]*[ -/]*[@-~]|\x1b[@-Z\\-_]|\r\n|\r|\n|\x08)")
+ANSI_ESCAPE_RE = re.compile(r"\x1b\[[0-?]*[ -/]*[@-~]|\x1b[@-Z\\-_]")
+INCOMPLETE_ESCAPE_RE = re.compile(r"\x1b(\[[0-?]*[ -/]*)?$")
+
+
+class TextStyle(NamedTuple):
+    foreground: Optional[Color] = None
+    background: Optional[Color] = None
+    bold: bool = False
+
+
+DEFAULT_STYLE = TextStyle()
+
+
+class TextRun(NamedTuple):
+    text: str
+    style: TextStyle
+
+
+class ParsedLine(NamedTuple):
+    runs: List[TextRun]
+    replaces_previous: bool  # this is an update of the last line returned by the parser
+    complete: bool  # False when the line is expected to be overwritten (it ended with a carriage return)
+
+    @property
+    def text(self) -> str:
+        return "".join(run.text for run in self.runs)
+
+
+def strip_ansi(text: str) -> str:
+    return ANSI_ESCAPE_RE.sub("", text)
+
+
+def split_output(text: str) -> Tuple[str, str]:
+    """ Split `text` after its last line break or carriage return, so that output read
+    in chunks can be written without breaking lines apart. Writes are treated as lines
+    of their own, so a line break at the end of the first part is removed. """
+    cut = max(text.rfind("\n"), text.rfind("\r"))
+    if cut < 0:
+        return "", text
+    complete, rest = text[:cut + 1], text[cut + 1:]
+    if complete.endswith("\r\n"):
+        complete = complete[:-2]
+    elif complete.endswith("\n"):
+        complete = complete[:-1]
+    return complete, rest
+
+
+def _color_256(index: int) -> Color:
+    if index < 16:
+        return ANSI_COLORS[index]
+    if index < 232:
+        index -= 16
+        levels = (0, 95, 135, 175, 215, 255)
+        return levels[index // 36], levels[(index // 6) % 6], levels[index % 6]
+    gray = 8 + (index - 232) * 10
+    return gray, gray, gray
+
+
+class TerminalLineParser:
+    """ Turns a stream of text into lines, handling carriage returns, backspaces and a
+    small subset of ANSI escape sequences (SGR colors and "erase in line").
+
+    Every call to `feed` is treated as if it ends with a line break, which matches how
+    tools and `CommandRunner` write output. There are two exceptions that allow a line
+    to be updated in place:
+
+    * text that ends with ``\\r`` leaves the line open, and the next write overwrites it.
+    * text that starts with ``\\r`` overwrites the line written by the previous call.
+    """
+
+    def __init__(self):
+        self.style = DEFAULT_STYLE
+        self._chars: List[str] = []
+        self._styles: List[TextStyle] = []
+        self._column = 0
+        self._emitted = False  # the current line was already returned once
+        self._soft_break = False  # the current line was only ended by the implicit line break
+        self._incomplete_escape = ""
+
+    def reset(self):
+        self.__init__()
+
+    def break_line(self):
+        """ Start a new line without returning the current one, e.g. because other output
+        was written after it and it can no longer be updated in place. """
+        self._new_line()
+
+    def _new_line(self):
+        self._chars = []
+        self._styles = []
+        self._column = 0
+        self._emitted = False
+        self._soft_break = False
+
+    def _write(self, text: str):
+        chars = self._chars
+        styles = self._styles
+        style = self.style
+        column = self._column
+        if column == len(chars):
+            chars.extend(text)
+            styles.extend([style] * len(text))
+            self._column = len(chars)
+            return
+        for char in text:
+            if column < len(chars):
+                chars[column] = char
+                styles[column] = style
+            else:
+                chars.append(char)
+                styles.append(style)
+            column += 1
+        self._column = column
+
+    def _erase_line(self, mode: int):
+        if mode == 0:  # cursor to end of line
+            del self._chars[self._column:]
+            del self._styles[self._column:]
+        elif mode == 1:  # start of line to cursor
+            count = min(self._column + 1, len(self._chars))
+            self._chars[:count] = [" "] * count
+            self._styles[:count] = [DEFAULT_STYLE] * count
+        elif mode == 2:  # entire line
+            self._chars = []
+            self._styles = []
+            self._column = 0
+
+    def _select_graphic_rendition(self, params: List[int]):
+        foreground, background, bold = self.style
+        if not len(params):
+            params = [0]
+        i = 0
+        while i < len(params):
+            code = params[i]
+            if code == 0:
+                foreground, background, bold = DEFAULT_STYLE
+            elif code == 1:
+                bold = True
+            elif code == 22:
+                bold = False
+            elif 30 <= code <= 37:
+                foreground = ANSI_COLORS[code - 30]
+            elif 90 <= code <= 97:
+                foreground = ANSI_COLORS[code - 90 + 8]
+            elif code == 39:
+                foreground = None
+            elif 40 <= code <= 47:
+                background = ANSI_COLORS[code - 40]
+            elif 100 <= code <= 107:
+                background = ANSI_COLORS[code - 100 + 8]
+            elif code == 49:
+                background = None
+            elif code in (38, 48):
+                color = None
+                if i + 2 < len(params) and params[i + 1] == 5:
+                    color = _color_256(params[i + 2] % 256)
+                    i += 2
+                elif i + 4 < len(params) and params[i + 1] == 2:
+                    color = tuple(max(0, min(255, c)) for c in params[i + 2:i + 5])
+                    i += 4
+                if code == 38:
+                    foreground = color
+                else:
+                    background = color
+            i += 1
+        self.style = TextStyle(foreground, background, bold)
+
+    def _escape_sequence(self, sequence: str) -> bool:
+        """ Apply a supported escape sequence, returns True if the line's text changed. """
+        if not sequence.startswith("\x1b["):
+            return False
+        command = sequence[-1]
+        if command not in "mK":
+            return False
+        try:
+            params = [int(p) if len(p) else 0 for p in sequence[2:-1].split(";")] if len(sequence) > 3 else []
+        except ValueError:
+            return False
+        if command == "m":
+            self._select_graphic_rendition(params)
+            return False
+        self._erase_line(params[0] if len(params) else 0)
+        return True
+
+    def _runs(self) -> List[TextRun]:
+        runs = []
+        start = 0
+        styles = self._styles
+        for i in range(1, len(styles) + 1):
+            if i == len(styles) or styles[i] != styles[start]:
+                runs.append(TextRun("".join(self._chars[start:i]), styles[start]))
+                start = i
+        return runs
+
+    def _emit(self, complete: bool) -> ParsedLine:
+        line = ParsedLine(self._runs(), self._emitted, complete)
+        self._emitted = True
+        return line
+
+    def feed(self, text: str) -> List[ParsedLine]:
+        lines: List[ParsedLine] = []
+        if not len(text):
+            return lines
+
+        text = self._incomplete_escape + text
+        self._incomplete_escape = ""
+        match = INCOMPLETE_ESCAPE_RE.search(text)
+        if match is not None:
+            self._incomplete_escape = match.group(0)
+            text = text[:match.start()]
+
+        if self._soft_break:
+            if text.startswith("\r") and not text.startswith("\r\n"):
+                self._soft_break = False
+            else:
+                self._new_line()
+
+        dirty = False
+        ends_open = False
+        for token in TOKEN_RE.split(text):
+            if not len(token):
+                continue
+            ends_open = False
+            if token in ("\n", "\r\n"):
+                lines.append(self._emit(complete=True))
+                self._new_line()
+                dirty = False
+            elif token == "\r":
+                self._column = 0
+                ends_open = True
+            elif token == "\x08":
+                self._column = max(0, self._column - 1)
+            elif token[0] == "\x1b":
+                dirty = self._escape_sequence(token) or dirty
+            else:
+                self._write(token)
+                dirty = True
+
+        if ends_open:
+            if dirty or self._emitted:
+                lines.append(self._emit(complete=False))
+        elif dirty:
+            lines.append(self._emit(complete=True))
+            self._soft_break = True
+        return lines
@@ -1,10 +1,8 @@
-import markdown
-
-
 def to_markdown(text: str):
     if len(text) == 0:
         return text
 
+    import markdown  # slow to import, and only needed once there's help text to show
     md = markdown.markdown(text)
     style = "".join((
         "code {background-color: #000; color: #ccc;}",
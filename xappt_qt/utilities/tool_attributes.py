@@ -1,9 +1,11 @@
 import importlib.resources
 import pathlib
 
-from typing import Type, Union
+from typing import Optional, Sequence, Type, Union
 
 from xappt import BaseTool
+from xappt_qt.constants import APP_CONFIG_PATH
+from xappt_qt.utilities.file_utils import safe_file_name
 from xappt_qt.utilities.text import to_markdown
 
 ICONS_MODULE = "xappt_qt.resources.icons"
@@ -33,6 +35,26 @@ def is_headless(tool: Union[Type[BaseTool], BaseTool]) -> bool:
     return getattr(tool, "headless", False)  # default: False
 
 
+def is_threaded(tool: Union[Type[BaseTool], BaseTool]) -> bool:
+    return getattr(tool, "threaded", False)  # default: False
+
+
+def is_isolated(tool: Union[Type[BaseTool], BaseTool]) -> bool:
+    return getattr(tool, "isolated", False)  # default: False
+
+
+def get_tool_data_keys(tool: Union[Type[BaseTool], BaseTool]) -> Optional[Sequence[str]]:
+    return getattr(tool, "tool_data_keys", None)  # default: None, the tool may depend on any key
+
+
+def is_cacheable(tool: Union[Type[BaseTool], BaseTool]) -> bool:
+    return getattr(tool, "cacheable", False)  # default: False
+
+
+def get_cache_outputs(tool: Union[Type[BaseTool], BaseTool]) -> Optional[Sequence[str]]:
+    return getattr(tool, "cache_outputs", None)  # default: None, every `file-save` parameter is an output
+
+
 def help_text(tool: Union[Type[BaseTool], BaseTool], **kwargs) -> str:
     process_markdown: bool = kwargs.get('process_markdown', True)
     include_name: bool = kwargs.get('include_name', False)
@@ -53,3 +75,7 @@ def help_text(tool: Union[Type[BaseTool], BaseTool], **kwargs) -> str:
 
 def can_auto_advance(tool: Union[Type[BaseTool], BaseTool]) -> bool:
     return getattr(tool, "auto_advance", False)
+
+
+def get_tool_log_directory(tool: Union[Type[BaseTool], BaseTool]) -> pathlib.Path:
+    return APP_CONFIG_PATH.joinpath("logs", safe_file_name(f"{tool.collection()}-{tool.name()}"))
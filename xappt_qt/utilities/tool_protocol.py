@@ -0,0 +1,98 @@
+import enum
+import json
+import struct
+
+from typing import Any, BinaryIO, List, Optional, Tuple
+
+__all__ = [
+    'FrameType',
+    'FrameDecoder',
+    'encode_frame',
+    'encode_json_frame',
+    'decode_json',
+    'read_frame',
+]
+
+# every frame is a one byte type, a four byte payload length and the payload
+HEADER = struct.Struct(">BI")
+
+
+class FrameType(enum.IntEnum):
+    # parent to child
+    RUN = 1  # json: {"module", "name", "parameters", "tool_data", "profile", "profile_memory"}
+    ANSWER = 2  # json: the reply to MESSAGE, WARNING, ERROR or ASK
+
+    # child to parent
+    STDOUT = 10  # text
+    STDERR = 11  # text
+    PROGRESS_START = 12
+    PROGRESS_UPDATE = 13  # json: [message, percent_complete]
+    PROGRESS_END = 14
+    MESSAGE = 15  # json: message
+    WARNING = 16  # json: message
+    ERROR = 17  # json: [message, details]
+    ASK = 18  # json: message
+    RESULT = 19  # json: {"exit_code", "tool_data"}, the value returned by `execute` and the tool_data after it
+    STATS = 20  # json: {"peak_rss"}, sent before RESULT
+
+
+Frame = Tuple[FrameType, bytes]
+
+
+def encode_frame(frame_type: FrameType, payload: bytes = b"") -> bytes:
+    return HEADER.pack(frame_type, len(payload)) + payload
+
+
+def encode_json_frame(frame_type: FrameType, value: Any) -> bytes:
+    return encode_frame(frame_type, json.dumps(value, default=str, separators=(",", ":")).encode("utf8"))
+
+
+def decode_json(payload: bytes) -> Any:
+    return json.loads(payload.decode("utf8"))
+
+
+class FrameDecoder:
+    """ Splits a byte stream into frames, keeping incomplete frames until the rest arrives. """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[Frame]:
+        buffer = self._buffer
+        buffer += data
+        frames = []
+        offset = 0
+        while len(buffer) - offset >= HEADER.size:
+            frame_type, length = HEADER.unpack_from(buffer, offset)
+            end = offset + HEADER.size + length
+            if end > len(buffer):
+                break
+            frames.append((FrameType(frame_type), bytes(buffer[offset + HEADER.size:end])))
+            offset = end
+        del buffer[:offset]
+        return frames
+
+    def clear(self):
+        self._buffer.clear()
+
+
+def _read_exactly(fp: BinaryIO, size: int) -> Optional[bytes]:
+    data = bytearray()
+    while len(data) < size:
+        chunk = fp.read(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return bytes(data)
+
+
+def read_frame(fp: BinaryIO) -> Optional[Frame]:
+    """ Block until a whole frame was read from `fp`, returns `None` at end of file. """
+    header = _read_exactly(fp, HEADER.size)
+    if header is None:
+        return None
+    frame_type, length = HEADER.unpack(header)
+    payload = _read_exactly(fp, length) if length else b""
+    if payload is None:
+        return None
+    return FrameType(frame_type), payload